@@ -0,0 +1,221 @@
+import os
+import torch
+import numpy as np
+from pathlib import Path
+from typing import Dict, Union
+
+from .hybrid_model import HybridModel
+from .multi_asset_model import MultiAssetModel
+
+CHECKPOINT_FORMAT = "hybrid-stock-model"
+CHECKPOINT_VERSION = 1
+MULTI_ASSET_FORMAT = "multi-asset-stock-model"
+MULTI_ASSET_VERSION = 1
+
+def _cast_weights(state_dict: Dict, dtype: torch.dtype) -> Dict:
+    """Cast floating point tensors of a state dict to the given dtype."""
+    return {
+        name: tensor.to(dtype) if tensor.is_floating_point() else tensor
+        for name, tensor in state_dict.items()
+    }
+
+def _scaler_tensors(preprocessor: Dict) -> Dict:
+    """Fitted scaler parameters of a preprocessor state as float64 tensors."""
+    # Scalers stay float64: they map predictions back to prices
+    return {
+        kind: {name: torch.from_numpy(np.asarray(value, dtype=np.float64))
+               for name, value in preprocessor[f'{kind}_scaler'].items()}
+        for kind in ['feature', 'target']
+    }
+
+def _scaler_arrays(scalers: Dict) -> Dict:
+    """Inverse of _scaler_tensors, keyed like TimeSeriesPreprocessor.get_state."""
+    return {f'{kind}_scaler': {name: value.numpy() for name, value in scalers[kind].items()}
+            for kind in ['feature', 'target']}
+
+def _load_versioned(path: Union[str, Path], map_location: str, fmt: str, version: int) -> Dict:
+    """Memory-mapped, weights-only load that checks the format and version."""
+    checkpoint = torch.load(path, map_location=map_location, mmap=True, weights_only=True)
+
+    if checkpoint.get('format') != fmt:
+        raise ValueError(f"{path} is not a {fmt} checkpoint")
+    if checkpoint['version'] > version:
+        raise ValueError(
+            f"Checkpoint version {checkpoint['version']} is newer than the "
+            f"supported version {version}"
+        )
+    return checkpoint
+
+def _write_atomically(checkpoint: Dict, path: Union[str, Path]):
+    """Save via a temporary file: the previous checkpoint may still be memory-mapped."""
+    tmp_path = Path(f"{path}.tmp")
+    torch.save(checkpoint, tmp_path)
+    os.replace(tmp_path, path)
+
+def save_checkpoint(model: HybridModel, path: Union[str, Path], half: bool = False):
+    """
+    Save a trained hybrid model as a single versioned checkpoint.
+
+    The file bundles the NumericalModel and fusion weights, the fitted
+    scaler parameters as arrays, the feature column list and the sequence
+    length, so inference never has to refit anything.
+
+    Args:
+        model (HybridModel): Trained model
+        path (Union[str, Path]): Destination file
+        half (bool): Store network weights as float16 to halve the file size
+    """
+    state = model.state_dict()
+    preprocessor = state['preprocessor']
+    dtype = torch.float16 if half else torch.float32
+
+    checkpoint = {
+        'format': CHECKPOINT_FORMAT,
+        'version': CHECKPOINT_VERSION,
+        'dtype': str(dtype).replace('torch.', ''),
+        'input_size': state['input_size'],
+        'hidden_size': state['hidden_size'],
+        'horizons': state['horizons'],
+        'long_context': state['long_context'],
+        'attention_window': state['attention_window'],
+        'sequence_length': preprocessor['sequence_length'],
+        'feature_columns': preprocessor['feature_columns'],
+        'numerical_model': _cast_weights(state['numerical_model'], dtype),
+        'fusion_layer': _cast_weights(state['fusion_layer'], dtype),
+        'scalers': _scaler_tensors(preprocessor)
+    }
+
+    _write_atomically(checkpoint, path)
+
+def load_checkpoint(path: Union[str, Path], map_location: str = "cpu") -> HybridModel:
+    """
+    Rebuild a ready-to-predict HybridModel from a checkpoint.
+
+    The file is memory-mapped and loaded with weights_only, and the FinBERT
+    analyzer is not created, so transformers is never imported.
+
+    Args:
+        path (Union[str, Path]): Checkpoint written by save_checkpoint
+        map_location (str): Device to map the tensors to
+
+    Returns:
+        HybridModel: Model with weights and fitted scalers restored
+    """
+    checkpoint = _load_versioned(path, map_location, CHECKPOINT_FORMAT, CHECKPOINT_VERSION)
+
+    model = HybridModel(
+        input_size=checkpoint['input_size'],
+        hidden_size=checkpoint['hidden_size'],
+        sequence_length=checkpoint['sequence_length'],
+        feature_columns=checkpoint['feature_columns'],
+        long_context=checkpoint.get('long_context', False),
+        attention_window=checkpoint.get('attention_window'),
+        horizons=checkpoint.get('horizons', 1)
+    )
+
+    # load_state_dict copies float16 weights into the float32 parameters
+    model.load_state_dict({
+        'numerical_model': checkpoint['numerical_model'],
+        'fusion_layer': checkpoint['fusion_layer'],
+        'preprocessor': {
+            'sequence_length': checkpoint['sequence_length'],
+            'feature_columns': checkpoint['feature_columns'],
+            'horizons': checkpoint.get('horizons', 1),
+            **_scaler_arrays(checkpoint['scalers'])
+        }
+    })
+
+    return model
+
+def save_multi_asset_checkpoint(model: MultiAssetModel, path: Union[str, Path], half: bool = False):
+    """
+    Save a trained multi-asset model as a single versioned checkpoint.
+
+    Besides the shared weights the file keeps the symbol universe (whose
+    order defines the embedding ids) and every symbol's fitted scalers, so
+    MultiAssetModel.predict works on the restored model.
+
+    Args:
+        model (MultiAssetModel): Trained model
+        path (Union[str, Path]): Destination file
+        half (bool): Store network weights as float16 to halve the file size
+    """
+    state = model.state_dict()
+    dtype = torch.float16 if half else torch.float32
+
+    checkpoint = {
+        'format': MULTI_ASSET_FORMAT,
+        'version': MULTI_ASSET_VERSION,
+        'dtype': str(dtype).replace('torch.', ''),
+        **{key: state[key] for key in ['symbols', 'input_size', 'hidden_size', 'sequence_length',
+                                       'symbol_embedding_dim', 'feature_columns', 'horizons']},
+        'model': _cast_weights(state['model'], dtype),
+        'scalers': {symbol: _scaler_tensors(preprocessor)
+                    for symbol, preprocessor in state['preprocessors'].items()}
+    }
+
+    _write_atomically(checkpoint, path)
+
+def load_multi_asset_checkpoint(path: Union[str, Path], map_location: str = "cpu") -> MultiAssetModel:
+    """
+    Rebuild a ready-to-predict MultiAssetModel from a checkpoint.
+
+    Args:
+        path (Union[str, Path]): Checkpoint written by save_multi_asset_checkpoint
+        map_location (str): Device to map the tensors to
+
+    Returns:
+        MultiAssetModel: Model with weights and every symbol's fitted scalers restored
+    """
+    checkpoint = _load_versioned(path, map_location, MULTI_ASSET_FORMAT, MULTI_ASSET_VERSION)
+
+    model = MultiAssetModel(
+        checkpoint['symbols'],
+        input_size=checkpoint['input_size'],
+        hidden_size=checkpoint['hidden_size'],
+        sequence_length=checkpoint['sequence_length'],
+        symbol_embedding_dim=checkpoint['symbol_embedding_dim'],
+        feature_columns=checkpoint['feature_columns'],
+        horizons=checkpoint['horizons']
+    )
+
+    model.load_state_dict({
+        'model': checkpoint['model'],
+        'preprocessors': {
+            symbol: {
+                'sequence_length': checkpoint['sequence_length'],
+                'feature_columns': checkpoint['feature_columns'],
+                'horizons': checkpoint['horizons'],
+                **_scaler_arrays(scalers)
+            }
+            for symbol, scalers in checkpoint['scalers'].items()
+        }
+    })
+
+    return model
+
+if __name__ == "__main__":
+    # Example usage: round-trip a model and time the cold load
+    import sys
+    import tempfile
+    import time
+
+    model = HybridModel(input_size=13, hidden_size=64)
+    preprocessor = model.numerical_model.preprocessor
+    preprocessor.feature_scaler.fit(np.random.rand(100, 13))
+    preprocessor.target_scaler.fit(np.random.rand(100, 1) * 200)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'model.pt'
+        save_checkpoint(model, path, half=True)
+        print(f"Checkpoint size: {path.stat().st_size / 1024:.1f} KiB")
+
+        start = time.perf_counter()
+        restored = load_checkpoint(path)
+        print(f"Load time: {(time.perf_counter() - start) * 1000:.1f} ms")
+        print("transformers imported:", 'transformers' in sys.modules)
+
+        X = np.random.rand(4, 10, 13)
+        sentiment = np.zeros((4, 1))
+        print("Max difference after fp16 round-trip:",
+              np.abs(model.predict(X, sentiment) - restored.predict(X, sentiment)).max())
@@ -1,14 +1,35 @@
+import hashlib
 import torch
 import torch.nn as nn
 import numpy as np
 from typing import Dict, List, Tuple
 import pandas as pd
 
-from .numerical_model import PricePredictionModel
-from .sentiment_model import SentimentAnalyzer
+from .numerical_model import SCALER_ATTRIBUTES, PricePredictionModel
+from .sentiment_aggregator import SentimentAggregator
+
+def empty_article_scores() -> pd.DataFrame:
+    """
+    SentimentAnalyzer.score_articles' result for no news.
+    
+    Built here so offline runs and days without news never load FinBERT
+    (and transformers) just to score nothing.
+    """
+    return pd.DataFrame({
+        'positive': pd.Series(dtype=np.float64),
+        'negative': pd.Series(dtype=np.float64),
+        'neutral': pd.Series(dtype=np.float64),
+        'date': pd.Series(dtype='datetime64[ns]'),
+        'source': pd.Series(dtype=object),
+        'sentiment_score': pd.Series(dtype=np.float64),
+        'copies': pd.Series(dtype=np.int64)
+    })
 
 class HybridModel:
-    def __init__(self, input_size: int, hidden_size: int, sequence_length: int = 10):
+    def __init__(self, input_size: int, hidden_size: int, sequence_length: int = 10,
+                 sentiment_aggregator: SentimentAggregator = None, feature_columns: List[str] = None,
+                 long_context: bool = False, attention_window: int = None,
+                 checkpoint_segment: int = 0, horizons: int = 1):
         """
         Initialize the hybrid model combining numerical and sentiment analysis.
         
@@ -16,56 +37,182 @@ class HybridModel:
             input_size (int): Number of numerical features
             hidden_size (int): Size of hidden layers
             sequence_length (int): Length of input sequences
+            sentiment_aggregator (SentimentAggregator): Time-decayed, source-weighted
+                sentiment (default: unweighted mean of same-day articles)
+            feature_columns (List[str]): Numerical input columns (default: FEATURE_COLUMNS)
+            long_context (bool): Last-step fused attention for long lookbacks
+            attention_window (int): Attend over only the last N steps
+            checkpoint_segment (int): LSTM gradient-checkpointing segment length
+            horizons (int): Future steps predicted at once by the numerical
+                and fusion heads
         """
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.numerical_model = PricePredictionModel(input_size, hidden_size, sequence_length)
-        self.sentiment_analyzer = SentimentAnalyzer()
+        self.input_size = input_size
+        self.hidden_size = hidden_size
+        self.horizons = horizons
+        self.numerical_model = PricePredictionModel(
+            input_size, hidden_size, sequence_length,
+            feature_columns=feature_columns,
+            long_context=long_context,
+            attention_window=attention_window,
+            checkpoint_segment=checkpoint_segment,
+            horizons=horizons
+        )
+        self._sentiment_analyzer = None
+        self.sentiment_aggregator = sentiment_aggregator
+        self._version = None
         
-        # Fusion layer
+        # Fusion layer: every horizon's numerical prediction plus sentiment in,
+        # every horizon out
         self.fusion_layer = nn.Sequential(
-            nn.Linear(2, hidden_size),
+            nn.Linear(horizons + 1, hidden_size),
             nn.ReLU(),
             nn.Dropout(0.2),
-            nn.Linear(hidden_size, 1)
+            nn.Linear(hidden_size, horizons)
         ).to(self.device)
         
         self.optimizer = torch.optim.Adam(self.fusion_layer.parameters())
+        # Multi-horizon loss: MSE averaged over all horizons
         self.criterion = nn.MSELoss()
         
-    def prepare_data(self, stock_data: pd.DataFrame, news_data: List[Dict]) -> Tuple:
+    @property
+    def sentiment_analyzer(self):
+        """
+        FinBERT sentiment analyzer, loaded on first use.
+        
+        Inference from a checkpoint only needs the numerical and fusion
+        weights, so transformers is not imported until news is scored.
+        """
+        if self._sentiment_analyzer is None:
+            from .sentiment_model import SentimentAnalyzer
+            self._sentiment_analyzer = SentimentAnalyzer()
+        return self._sentiment_analyzer
+    
+    @sentiment_analyzer.setter
+    def sentiment_analyzer(self, analyzer):
+        self._sentiment_analyzer = analyzer
+        
+    @property
+    def version(self) -> str:
+        """
+        Short hash of the current weights and fitted scalers, used to key
+        cached predictions (the target scaler shapes predict's output).
+        
+        Recomputed after train, load_state_dict and prepare_data refitting
+        the scalers; call invalidate_version after changing either any
+        other way.
+        """
+        if self._version is None:
+            digest = hashlib.sha1()
+            for module in (self.numerical_model.model, self.fusion_layer):
+                for name, tensor in module.state_dict().items():
+                    digest.update(name.encode())
+                    digest.update(tensor.detach().cpu().numpy().tobytes())
+            preprocessor = self.numerical_model.preprocessor
+            for scaler in (preprocessor.feature_scaler, preprocessor.target_scaler):
+                for name in SCALER_ATTRIBUTES:
+                    # Unfitted scalers have no parameters yet
+                    if hasattr(scaler, name):
+                        digest.update(name.encode())
+                        digest.update(np.asarray(getattr(scaler, name), dtype=np.float64).tobytes())
+            self._version = digest.hexdigest()[:12]
+        return self._version
+    
+    def invalidate_version(self):
+        """Mark the weights or scalers as changed."""
+        self._version = None
+        
+    def state_dict(self) -> Dict:
+        """
+        Collect everything needed to rebuild the trained model.
+        
+        Returns:
+            Dict: Model sizes, attention mode, network weights and preprocessor state
+        """
+        numerical = self.numerical_model.model
+        return {
+            'input_size': self.input_size,
+            'hidden_size': self.hidden_size,
+            'horizons': self.horizons,
+            'long_context': numerical.long_context,
+            'attention_window': numerical.attention_window,
+            'numerical_model': self.numerical_model.model.state_dict(),
+            'fusion_layer': self.fusion_layer.state_dict(),
+            'preprocessor': self.numerical_model.preprocessor.get_state()
+        }
+    
+    def load_state_dict(self, state: Dict):
+        """
+        Restore weights and fitted scalers produced by state_dict.
+        
+        Args:
+            state (Dict): State produced by state_dict
+        """
+        self.numerical_model.model.load_state_dict(state['numerical_model'])
+        self.fusion_layer.load_state_dict(state['fusion_layer'])
+        self.numerical_model.preprocessor.set_state(state['preprocessor'])
+        self.invalidate_version()
+        
+    def prepare_data(self, stock_data: pd.DataFrame, news_data: List[Dict], fit: bool = True,
+                     articles: pd.DataFrame = None) -> Tuple:
         """
         Prepare both numerical and sentiment data.
         
         Args:
             stock_data (pd.DataFrame): Historical stock data
             news_data (List[Dict]): News articles data
+            fit (bool): Refit the scalers (False when fine-tuning a restored model)
+            articles (pd.DataFrame): news_data already scored by
+                SentimentAnalyzer.score_articles (scored here when None)
             
         Returns:
             Tuple: Processed numerical and sentiment features
         """
         # Process numerical data
-        features, targets = self.numerical_model.preprocessor.prepare_data(stock_data)
+        features, targets = self.numerical_model.preprocessor.prepare_data(stock_data, fit)
+        if fit:
+            # Refitted scalers change predict's output
+            self.invalidate_version()
         X, y = self.numerical_model.preprocessor.create_sequences(features, targets)
         
-        # Process sentiment data
-        sentiment_df = self.sentiment_analyzer.process_news_data(news_data)
-        
         # Align sentiment data with stock data
-        sentiment_scores = []
-        for date in stock_data.index[self.numerical_model.preprocessor.sequence_length:]:
-            date_sentiment = sentiment_df[
-                sentiment_df['date'] == pd.to_datetime(date).date()
-            ]['sentiment_score'].values
-            
-            if len(date_sentiment) > 0:
-                sentiment_scores.append(date_sentiment[0])
-            else:
-                sentiment_scores.append(0.0)  # Neutral sentiment if no news
+        sequence_length = self.numerical_model.preprocessor.sequence_length
+        bar_dates = stock_data.index[sequence_length:sequence_length + len(X)]
         
-        sentiment_scores = np.array(sentiment_scores).reshape(-1, 1)
+        if articles is None:
+            articles = (self.sentiment_analyzer.score_articles(news_data) if news_data
+                        else empty_article_scores())
+        
+        if self.sentiment_aggregator is not None:
+            self.sentiment_aggregator.reset()
+            self.sentiment_aggregator.update(
+                articles['date'], articles['sentiment_score'].to_numpy(), articles['source']
+            )
+            sentiment_scores = self.sentiment_aggregator.aggregate(self._bar_close_times(bar_dates))
+        else:
+            # Unweighted mean of each day's articles, as SentimentAnalyzer.process_news_data
+            daily_sentiment = articles.groupby(articles['date'].dt.date)['sentiment_score'].mean()
+            # Neutral sentiment if no news
+            sentiment_scores = daily_sentiment.reindex(pd.DatetimeIndex(bar_dates).date,
+                                                       fill_value=0.0).to_numpy()
+        
+        sentiment_scores = np.asarray(sentiment_scores, dtype=np.float64).reshape(-1, 1)
         
         return X, sentiment_scores, y
     
+    @staticmethod
+    def _bar_close_times(bar_dates: pd.Index) -> pd.DatetimeIndex:
+        """
+        Timestamps at which each bar's sentiment is read.
+        
+        Daily bars are stamped at midnight, so they are moved to the end of
+        their day to include that day's news; intraday bars are used as-is.
+        """
+        bar_dates = pd.DatetimeIndex(bar_dates)
+        if len(bar_dates) and (bar_dates == bar_dates.normalize()).all():
+            return bar_dates + pd.Timedelta(days=1) - pd.Timedelta(1, unit='ns')
+        return bar_dates
+    
     def train(self, train_data: Tuple, val_data: Tuple, epochs: int = 100) -> List[float]:
         """
         Train the hybrid model.
@@ -80,6 +227,7 @@ class HybridModel:
         """
         X_train, sentiment_train, y_train = train_data
         X_val, sentiment_val, y_val = val_data
+        self.invalidate_version()
         
         # Convert to tensors
         X_train = torch.FloatTensor(X_train).to(self.device)
@@ -138,7 +286,7 @@ class HybridModel:
             sentiment_scores (np.ndarray): Sentiment scores
             
         Returns:
-            np.ndarray: Final predictions
+            np.ndarray: Final predictions, one column per horizon
         """
         self.fusion_layer.eval()
         
@@ -162,6 +310,65 @@ class HybridModel:
             final_pred = self.numerical_model.preprocessor.inverse_transform_predictions(final_pred)
             
             return final_pred
+    
+    def predict_with_uncertainty(self, X: np.ndarray, sentiment_scores: np.ndarray,
+                                 samples: int = 100,
+                                 quantiles: Tuple[float, ...] = (0.05, 0.5, 0.95),
+                                 batch_size: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Point predictions plus Monte-Carlo dropout quantiles.
+        
+        Every dropout layer (LSTM, attention, prediction head and fusion
+        layer) stays active while everything else runs in eval mode. The
+        batch is tiled `samples` times and pushed through once, so each copy
+        draws its own dropout masks in the same forward pass instead of
+        `samples` separate calls.
+        
+        Args:
+            X (np.ndarray): Numerical features
+            sentiment_scores (np.ndarray): Sentiment scores
+            samples (int): Dropout samples per window
+            quantiles (Tuple[float, ...]): Quantiles of the sampled predictions
+            batch_size (int): Tiled rows per forward pass, bounding memory for
+                large inputs
+            
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: predict's output and the quantiles,
+                of shape (len(quantiles), len(X), horizons), in original scale
+        """
+        point = self.predict(X, sentiment_scores)
+        
+        model = self.numerical_model.model
+        for module in (model, self.fusion_layer):
+            module.eval()
+            for layer in module.modules():
+                if isinstance(layer, (nn.Dropout, nn.LSTM, nn.MultiheadAttention)):
+                    layer.train()
+        
+        X_tensor = torch.FloatTensor(X).to(self.device)
+        sentiment_tensor = torch.FloatTensor(sentiment_scores).to(self.device)
+        windows_per_pass = max(batch_size // samples, 1)
+        
+        sampled = []
+        try:
+            with torch.no_grad():
+                for start in range(0, len(X_tensor), windows_per_pass):
+                    X_chunk = X_tensor[start:start + windows_per_pass]
+                    sentiment_chunk = sentiment_tensor[start:start + windows_per_pass]
+                    
+                    # (samples * n) rows: sample-major copies of the chunk
+                    numerical_pred = model(X_chunk.repeat(samples, 1, 1))
+                    combined_input = torch.cat([numerical_pred, sentiment_chunk.repeat(samples, 1)], dim=1)
+                    final_pred = self.fusion_layer(combined_input)
+                    sampled.append(final_pred.view(samples, len(X_chunk), -1).cpu().numpy())
+        finally:
+            model.eval()
+            self.fusion_layer.eval()
+        
+        sampled = self.numerical_model.preprocessor.inverse_transform_predictions(
+            np.concatenate(sampled, axis=1)
+        )
+        return point, np.quantile(sampled, quantiles, axis=0)
 
 class EnsemblePredictor:
     def __init__(self, model: HybridModel, window_size: int = 5):
@@ -169,64 +376,84 @@ class EnsemblePredictor:
         Initialize the ensemble predictor for multiple time horizons.
         
         Args:
-            model (HybridModel): Trained hybrid model
+            model (HybridModel): Trained hybrid model with at least
+                window_size horizons
             window_size (int): Number of future time steps to predict
         """
+        if model.horizons < window_size:
+            raise ValueError(
+                f"Model predicts {model.horizons} horizon(s) but window_size is {window_size}; "
+                f"train it with horizons >= {window_size}"
+            )
         self.model = model
         self.window_size = window_size
         
     def predict_sequence(self, initial_X: np.ndarray, 
                         initial_sentiment: np.ndarray) -> np.ndarray:
         """
-        Make sequential predictions for multiple time steps.
+        Predictions for the next window_size time steps.
         
-        Args:
-            initial_X (np.ndarray): Initial numerical features
-            initial_sentiment (np.ndarray): Initial sentiment scores
-            
-        Returns:
-            np.ndarray: Sequence of predictions
-        """
-        predictions = []
-        current_X = initial_X.copy()
-        current_sentiment = initial_sentiment.copy()
-        
-        for _ in range(self.window_size):
-            # Make prediction for current step
-            pred = self.model.predict(current_X, current_sentiment)
-            predictions.append(pred[0])
-            
-            # Update features for next prediction
-            current_X = self._update_features(current_X, pred)
-            
-        return np.array(predictions)
-    
-    def _update_features(self, X: np.ndarray, new_pred: np.ndarray) -> np.ndarray:
-        """
-        Update feature window with new prediction.
+        All horizons come from one forward pass of the direct multi-horizon
+        head, so latency does not grow with the window and no step is
+        predicted from stale indicators of an earlier prediction.
         
         Args:
-            X (np.ndarray): Current feature window
-            new_pred (np.ndarray): New prediction to incorporate
+            initial_X (np.ndarray): Numerical features of the latest window
+            initial_sentiment (np.ndarray): Sentiment scores
             
         Returns:
-            np.ndarray: Updated feature window
+            np.ndarray: Sequence of predictions of shape (window_size, 1)
         """
-        # Shift window and add new prediction
-        updated_X = X.copy()
-        updated_X = np.roll(updated_X, -1, axis=0)
-        updated_X[-1, 3] = new_pred[0]  # Update Close price
-        
-        return updated_X
+        predictions = self.model.predict(initial_X[-1:], initial_sentiment[-1:])
+        return predictions[0, :self.window_size].reshape(-1, 1)
+
+def _benchmark_mc_dropout(sample_counts: List[int], window_counts: List[int] = (1, 32),
+                          repeats: int = 5):
+    """Windows per second of tiled Monte-Carlo dropout against one call per sample."""
+    import time
+    
+    model = HybridModel(input_size=13, hidden_size=128, horizons=5)
+    model.numerical_model.preprocessor.target_scaler.fit(np.random.rand(100, 1) * 200)
+    
+    def looped(X, sentiment, samples):
+        # The naive alternative: `samples` separate dropout-on forward passes
+        numerical = model.numerical_model.model.train()
+        model.fusion_layer.train()
+        with torch.no_grad():
+            X_tensor, sentiment_tensor = torch.FloatTensor(X), torch.FloatTensor(sentiment)
+            for _ in range(samples):
+                model.fusion_layer(torch.cat([numerical(X_tensor), sentiment_tensor], dim=1))
+    
+    print(f"{'windows':>8}{'samples':>8}{'looped ms':>12}{'tiled ms':>12}{'speed-up':>10}{'windows/s':>12}")
+    for n_windows in window_counts:
+        X = np.random.randn(n_windows, 10, 13)
+        sentiment = np.random.randn(n_windows, 1)
+        for samples in sample_counts:
+            timings = []
+            for run in (looped, model.predict_with_uncertainty):
+                run(X, sentiment, samples)
+                start = time.perf_counter()
+                for _ in range(repeats):
+                    run(X, sentiment, samples)
+                timings.append((time.perf_counter() - start) / repeats)
+            print(f"{n_windows:>8}{samples:>8}{timings[0] * 1000:>12.1f}{timings[1] * 1000:>12.1f}"
+                  f"{timings[0] / timings[1]:>9.1f}x{n_windows / timings[1]:>12,.0f}")
 
 if __name__ == "__main__":
+    import sys
+    
+    if sys.argv[1:2] == ['benchmark']:
+        # python -m models.hybrid_model benchmark
+        _benchmark_mc_dropout([32, 64, 128, 256])
+        sys.exit()
+    
     # Example usage
     import numpy as np
     
     # Create dummy data
     X = np.random.randn(100, 10, 13)  # 100 samples, 10 time steps, 13 features
     sentiment = np.random.randn(100, 1)  # 100 sentiment scores
-    y = np.random.randn(100, 1)  # 100 targets
+    y = np.random.randn(100, 5)  # 100 targets, 5 horizons each
     
     # Split data
     train_idx = int(0.8 * len(X))
@@ -234,7 +461,7 @@ if __name__ == "__main__":
     val_data = (X[train_idx:], sentiment[train_idx:], y[train_idx:])
     
     # Initialize and train model
-    model = HybridModel(input_size=13, hidden_size=64)
+    model = HybridModel(input_size=13, hidden_size=64, horizons=5)
     history = model.train(train_data, val_data, epochs=10)
     print("Training completed")
     
@@ -0,0 +1,297 @@
+import torch
+import torch.nn as nn
+import numpy as np
+from typing import Dict, List, Tuple
+import pandas as pd
+
+from .numerical_model import NumericalModel, TimeSeriesPreprocessor
+
+class MultiAssetModel:
+    def __init__(self, symbols: List[str], input_size: int, hidden_size: int,
+                 sequence_length: int = 10, symbol_embedding_dim: int = 8,
+                 feature_columns: List[str] = None, learning_rate: float = 0.001,
+                 horizons: int = 1):
+        """
+        Initialize a single numerical model shared across many symbols.
+
+        Every symbol keeps its own preprocessor (and therefore its own
+        feature and target scalers); the windows of all symbols are stacked
+        into one dataset and told apart by a learned symbol embedding.
+
+        Args:
+            symbols (List[str]): Stock symbols in the training universe
+            input_size (int): Number of numerical features
+            hidden_size (int): Size of hidden layers
+            sequence_length (int): Length of input sequences
+            symbol_embedding_dim (int): Size of the learned symbol embedding
+            feature_columns (List[str]): Columns used as model input
+            learning_rate (float): Adam learning rate
+            horizons (int): Future steps predicted at once by the output head
+        """
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.symbols = list(symbols)
+        self.symbol_index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.input_size = input_size
+        self.hidden_size = hidden_size
+        self.sequence_length = sequence_length
+        self.symbol_embedding_dim = symbol_embedding_dim
+        self.horizons = horizons
+
+        self.model = NumericalModel(
+            input_size, hidden_size,
+            num_symbols=len(self.symbols),
+            symbol_embedding_dim=symbol_embedding_dim,
+            horizons=horizons
+        ).to(self.device)
+        self.preprocessors = {
+            symbol: TimeSeriesPreprocessor(sequence_length, feature_columns, horizons)
+            for symbol in self.symbols
+        }
+
+        self.criterion = nn.MSELoss()
+        self.optimizer = torch.optim.Adam(self.model.parameters(), lr=learning_rate)
+
+    def state_dict(self) -> Dict:
+        """
+        Collect everything needed to rebuild the trained model.
+
+        Returns:
+            Dict: Model sizes, symbol universe, network weights and the state of
+                every fitted preprocessor (symbols skipped in training have none)
+        """
+        return {
+            'symbols': list(self.symbols),
+            'input_size': self.input_size,
+            'hidden_size': self.hidden_size,
+            'sequence_length': self.sequence_length,
+            'symbol_embedding_dim': self.symbol_embedding_dim,
+            'feature_columns': self.preprocessors[self.symbols[0]].feature_columns,
+            'horizons': self.horizons,
+            'model': self.model.state_dict(),
+            'preprocessors': {
+                symbol: preprocessor.get_state()
+                for symbol, preprocessor in self.preprocessors.items()
+                if hasattr(preprocessor.target_scaler, 'scale_')
+            }
+        }
+
+    def load_state_dict(self, state: Dict):
+        """
+        Restore weights and fitted scalers produced by state_dict.
+
+        Args:
+            state (Dict): State produced by state_dict
+        """
+        self.model.load_state_dict(state['model'])
+        for symbol, preprocessor_state in state['preprocessors'].items():
+            self.preprocessors[symbol].set_state(preprocessor_state)
+
+    def prepare_data(self, stock_data: Dict[str, pd.DataFrame]) -> Tuple:
+        """
+        Scale each symbol separately and stack all windows into one dataset.
+
+        Args:
+            stock_data (Dict[str, pd.DataFrame]): Historical stock data per symbol
+
+        Returns:
+            Tuple: Stacked sequences, symbol ids and targets
+        """
+        parts = [self.prepare_symbol(symbol, df) for symbol, df in stock_data.items()]
+        parts = [part for part in parts if part is not None]
+
+        if not parts:
+            raise ValueError("No symbol has enough data to build a sequence")
+
+        return tuple(np.concatenate(arrays) for arrays in zip(*parts))
+
+    def prepare_symbol(self, symbol: str, df: pd.DataFrame) -> Tuple:
+        """
+        Scale one symbol and build its windows.
+
+        Args:
+            symbol (str): Symbol the data belongs to
+            df (pd.DataFrame): Its historical stock data
+
+        Returns:
+            Tuple: Sequences, symbol ids and targets (None if too short)
+        """
+        preprocessor = self.preprocessors[symbol]
+
+        # Indicator warm-up rows are NaN and would poison the shared loss
+        df = df.dropna()
+        if len(df) < self.sequence_length + self.horizons:
+            print(f"Skipping {symbol}: not enough rows for a full window")
+            return None
+
+        features, targets = preprocessor.prepare_data(df)
+        X, y = preprocessor.create_sequences(features, targets)
+
+        return (X.astype(np.float32), np.full(len(X), self.symbol_index[symbol], dtype=np.int64),
+                y.astype(np.float32))
+
+    def split_data(self, X: np.ndarray, symbol_ids: np.ndarray, y: np.ndarray,
+                   validation_size: float = 0.2) -> Tuple[Tuple, Tuple]:
+        """
+        Split stacked data chronologically within each symbol.
+
+        Args:
+            X (np.ndarray): Stacked sequences
+            symbol_ids (np.ndarray): Symbol id of each sequence
+            y (np.ndarray): Stacked targets
+            validation_size (float): Fraction of each symbol's windows held out
+
+        Returns:
+            Tuple[Tuple, Tuple]: Training and validation (X, symbol_ids, y)
+        """
+        train_mask = np.zeros(len(X), dtype=bool)
+
+        for symbol_id in np.unique(symbol_ids):
+            positions = np.flatnonzero(symbol_ids == symbol_id)
+            cutoff = int((1 - validation_size) * len(positions))
+            train_mask[positions[:cutoff]] = True
+
+        train_data = (X[train_mask], symbol_ids[train_mask], y[train_mask])
+        val_data = (X[~train_mask], symbol_ids[~train_mask], y[~train_mask])
+
+        return train_data, val_data
+
+    def _make_loader(self, data: Tuple, batch_size: int,
+                     shuffle: bool) -> torch.utils.data.DataLoader:
+        X, symbol_ids, y = data
+        dataset = torch.utils.data.TensorDataset(
+            torch.from_numpy(X), torch.from_numpy(symbol_ids), torch.from_numpy(y)
+        )
+        return torch.utils.data.DataLoader(dataset, batch_size=batch_size, shuffle=shuffle)
+
+    def train(self, train_data: Tuple, val_data: Tuple, epochs: int = 100,
+              batch_size: int = 512) -> List[float]:
+        """
+        Train the shared model over all symbols in large batches.
+
+        Args:
+            train_data (Tuple): Training data (X, symbol_ids, y)
+            val_data (Tuple): Validation data (X, symbol_ids, y)
+            epochs (int): Number of training epochs
+            batch_size (int): Number of windows per batch, drawn across symbols
+
+        Returns:
+            List[float]: Training history (validation losses)
+        """
+        val_losses = []
+
+        for epoch in range(epochs):
+            self.train_pass(train_data, batch_size)
+            val_loss = self.evaluate(val_data, batch_size)
+            val_losses.append(val_loss)
+
+            if (epoch + 1) % 10 == 0:
+                print(f'Epoch [{epoch+1}/{epochs}], Validation Loss: {val_loss:.4f}')
+
+        return val_losses
+
+    def train_pass(self, train_data: Tuple, batch_size: int = 512):
+        """
+        One shuffled pass over some training windows.
+
+        Also used to train on each symbol's windows as soon as they are
+        prepared, while other symbols are still being fetched.
+
+        Args:
+            train_data (Tuple): Training data (X, symbol_ids, y)
+            batch_size (int): Number of windows per batch
+        """
+        self.model.train()
+        for batch_x, batch_ids, batch_y in self._make_loader(train_data, batch_size, shuffle=True):
+            batch_x = batch_x.to(self.device)
+            batch_ids = batch_ids.to(self.device)
+            batch_y = batch_y.to(self.device)
+
+            self.optimizer.zero_grad()
+            outputs = self.model(batch_x, batch_ids)
+            loss = self.criterion(outputs, batch_y)
+            loss.backward()
+            self.optimizer.step()
+
+    def evaluate(self, val_data: Tuple, batch_size: int = 512) -> float:
+        """
+        Mean validation loss over batches.
+
+        Args:
+            val_data (Tuple): Validation data (X, symbol_ids, y)
+            batch_size (int): Number of windows per batch
+
+        Returns:
+            float: Validation loss
+        """
+        val_loader = self._make_loader(val_data, batch_size, shuffle=False)
+
+        self.model.eval()
+        val_loss = 0
+        with torch.no_grad():
+            for batch_x, batch_ids, batch_y in val_loader:
+                batch_x = batch_x.to(self.device)
+                batch_ids = batch_ids.to(self.device)
+                batch_y = batch_y.to(self.device)
+
+                outputs = self.model(batch_x, batch_ids)
+                val_loss += self.criterion(outputs, batch_y).item()
+
+        return val_loss / max(len(val_loader), 1)
+
+    def predict(self, symbol: str, X: np.ndarray) -> np.ndarray:
+        """
+        Make predictions for a single symbol.
+
+        Args:
+            symbol (str): Symbol the windows belong to
+            X (np.ndarray): Scaled feature windows for that symbol
+
+        Returns:
+            np.ndarray: Predictions in the symbol's original price scale
+        """
+        self.model.eval()
+
+        with torch.no_grad():
+            X_tensor = torch.as_tensor(X, dtype=torch.float32, device=self.device)
+            symbol_ids = torch.full((len(X_tensor),), self.symbol_index[symbol],
+                                    dtype=torch.long, device=self.device)
+            predictions = self.model(X_tensor, symbol_ids).cpu().numpy()
+
+        return self.preprocessors[symbol].inverse_transform_predictions(predictions)
+
+if __name__ == "__main__":
+    # Throughput comparison: one shared batched model vs. per-symbol runs
+    import time
+    import torch.utils.data as data
+    from .numerical_model import PricePredictionModel
+
+    n_symbols, n_windows, seq_len, n_features = 20, 500, 10, 13
+    symbols = [f"SYM{i}" for i in range(n_symbols)]
+
+    X = np.random.randn(n_symbols * n_windows, seq_len, n_features).astype(np.float32)
+    y = np.random.randn(n_symbols * n_windows, 1).astype(np.float32)
+    symbol_ids = np.repeat(np.arange(n_symbols), n_windows)
+
+    # Per-symbol baseline: one model and one pass per symbol
+    start = time.perf_counter()
+    for i in range(n_symbols):
+        rows = slice(i * n_windows, (i + 1) * n_windows)
+        dataset = data.TensorDataset(torch.from_numpy(X[rows]), torch.from_numpy(y[rows]))
+        loader = data.DataLoader(dataset, batch_size=32, shuffle=True)
+        PricePredictionModel(input_size=n_features, hidden_size=64).train(loader, loader, epochs=1)
+    per_symbol_time = time.perf_counter() - start
+
+    # Multi-asset: a single model over all symbols in large batches
+    model = MultiAssetModel(symbols, input_size=n_features, hidden_size=64)
+    train_data, val_data = model.split_data(X, symbol_ids, y, validation_size=0.0)
+    start = time.perf_counter()
+    model.train(train_data, train_data, epochs=1, batch_size=512)
+    multi_asset_time = time.perf_counter() - start
+
+    total = len(X)
+    print(f"Per-symbol runs: {total / per_symbol_time:,.0f} windows/s")
+    print(f"Multi-asset run: {total / multi_asset_time:,.0f} windows/s")
+
+    # Per-symbol inference goes through that symbol's own target scaler
+    model.preprocessors["SYM0"].target_scaler.fit(y[:n_windows])
+    print("Prediction for SYM0:", model.predict("SYM0", X[:1]).ravel())
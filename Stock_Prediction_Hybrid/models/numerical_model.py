@@ -1,45 +1,112 @@
+import math
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
+import torch.distributed as dist
+from torch.utils.checkpoint import checkpoint
+from torch.nn.parallel import DistributedDataParallel
+from torch.utils.data.distributed import DistributedSampler
 import numpy as np
-from typing import Tuple, List
+from typing import Callable, Dict, Tuple, List
 import pandas as pd
 from sklearn.preprocessing import MinMaxScaler
 
+from utils.indicators import BASE_COLUMNS, INDICATOR_COLUMNS
+
+# Default model inputs; a config 'features' section can declare others
+FEATURE_COLUMNS = BASE_COLUMNS + INDICATOR_COLUMNS
+
+# Fitted MinMaxScaler attributes that fully determine transform/inverse_transform
+SCALER_ATTRIBUTES = ['min_', 'scale_', 'data_min_', 'data_max_', 'data_range_']
+
 class TimeSeriesPreprocessor:
-    def __init__(self, sequence_length: int = 10):
+    def __init__(self, sequence_length: int = 10, feature_columns: List[str] = None,
+                 horizons: int = 1):
         """
         Initialize the preprocessor.
         
         Args:
             sequence_length (int): Number of time steps to use for prediction
+            feature_columns (List[str]): Columns used as model input
+            horizons (int): Number of future steps each window is labelled with
         """
         self.sequence_length = sequence_length
+        self.feature_columns = list(feature_columns or FEATURE_COLUMNS)
+        self.horizons = horizons
         self.feature_scaler = MinMaxScaler()
         self.target_scaler = MinMaxScaler()
         
-    def prepare_data(self, df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray]:
+    def prepare_data(self, df: pd.DataFrame, fit: bool = True) -> Tuple[np.ndarray, np.ndarray]:
         """
         Prepare data for time series prediction.
         
         Args:
             df (pd.DataFrame): Input DataFrame with features
+            fit (bool): Refit the scalers (False keeps a restored model's scaling)
             
         Returns:
             Tuple[np.ndarray, np.ndarray]: Scaled features and targets
         """
-        # Select features for prediction
-        feature_columns = ['Open', 'High', 'Low', 'Close', 'Volume', 
-                         'MA5', 'MA20', 'RSI', 'MACD', 'Signal_Line',
-                         'BB_middle', 'BB_upper', 'BB_lower']
+        if not fit:
+            return self.transform(df), self.target_scaler.transform(df[['Close']].to_numpy())
         
-        # Scale features
-        features = self.feature_scaler.fit_transform(df[feature_columns])
+        # Scale features (fitted on plain arrays so a restored scaler matches)
+        features = self.feature_scaler.fit_transform(df[self.feature_columns].to_numpy())
         
         # Scale target (Close price)
-        targets = self.target_scaler.fit_transform(df[['Close']])
+        targets = self.target_scaler.fit_transform(df[['Close']].to_numpy())
         
         return features, targets
     
+    def transform(self, df: pd.DataFrame) -> np.ndarray:
+        """
+        Scale new data with the already fitted feature scaler.
+        
+        Args:
+            df (pd.DataFrame): Input DataFrame with features
+            
+        Returns:
+            np.ndarray: Scaled features
+        """
+        return self.feature_scaler.transform(df[self.feature_columns].to_numpy())
+    
+    def get_state(self) -> Dict:
+        """
+        Export the fitted scalers as plain arrays.
+        
+        Returns:
+            Dict: Sequence length, feature columns, horizons and scaler parameters
+        """
+        return {
+            'sequence_length': self.sequence_length,
+            'feature_columns': list(self.feature_columns),
+            'horizons': self.horizons,
+            'feature_scaler': {
+                name: getattr(self.feature_scaler, name) for name in SCALER_ATTRIBUTES
+            },
+            'target_scaler': {
+                name: getattr(self.target_scaler, name) for name in SCALER_ATTRIBUTES
+            }
+        }
+    
+    def set_state(self, state: Dict):
+        """
+        Restore fitted scalers exported by get_state without refitting.
+        
+        Args:
+            state (Dict): State produced by get_state
+        """
+        self.sequence_length = int(state['sequence_length'])
+        self.feature_columns = list(state['feature_columns'])
+        self.horizons = int(state.get('horizons', 1))
+        
+        for scaler, params in [(self.feature_scaler, state['feature_scaler']),
+                               (self.target_scaler, state['target_scaler'])]:
+            for name in SCALER_ATTRIBUTES:
+                setattr(scaler, name, np.asarray(params[name], dtype=np.float64))
+            scaler.n_features_in_ = len(scaler.min_)
+            scaler.n_samples_seen_ = 0
+    
     def create_sequences(self, features: np.ndarray, targets: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
         """
         Create sequences for time series prediction.
@@ -49,40 +116,84 @@ class TimeSeriesPreprocessor:
             targets (np.ndarray): Scaled targets
             
         Returns:
-            Tuple[np.ndarray, np.ndarray]: Sequence data for training
+            Tuple[np.ndarray, np.ndarray]: Sequence data for training; y has
+                one column per horizon, column h being the target h + 1 steps
+                after the window
         """
-        X, y = [], []
-        
-        for i in range(len(features) - self.sequence_length):
-            X.append(features[i:(i + self.sequence_length)])
-            y.append(targets[i + self.sequence_length])
+        # Strided view over the feature matrix instead of a Python loop;
+        # window i covers features[i:i + sequence_length]
+        windows = np.lib.stride_tricks.sliding_window_view(
+            features, self.sequence_length, axis=0
+        )
+        # Only windows followed by all horizons are labelled
+        n_windows = max(len(features) - self.sequence_length - self.horizons + 1, 0)
+        X = windows[:n_windows].transpose(0, 2, 1)
+        y = np.lib.stride_tricks.sliding_window_view(
+            np.asarray(targets)[self.sequence_length:, 0], self.horizons
+        )[:n_windows]
             
-        return np.array(X), np.array(y)
+        return np.ascontiguousarray(X), np.ascontiguousarray(y)
     
     def inverse_transform_predictions(self, predictions: np.ndarray) -> np.ndarray:
         """
         Convert scaled predictions back to original scale.
         
         Args:
-            predictions (np.ndarray): Scaled predictions
+            predictions (np.ndarray): Scaled predictions, one column per horizon
             
         Returns:
             np.ndarray: Predictions in original scale
         """
-        return self.target_scaler.inverse_transform(predictions)
+        predictions = np.asarray(predictions)
+        # Every horizon is a Close price, scaled by the single target scaler
+        return self.target_scaler.inverse_transform(predictions.reshape(-1, 1)).reshape(predictions.shape)
 
 class NumericalModel(nn.Module):
-    def __init__(self, input_size: int, hidden_size: int, num_layers: int = 2):
+    def __init__(self, input_size: int, hidden_size: int, num_layers: int = 2,
+                 num_symbols: int = 0, symbol_embedding_dim: int = 8,
+                 long_context: bool = False, attention_window: int = None,
+                 checkpoint_segment: int = 0, horizons: int = 1):
         """
         Initialize the numerical prediction model.
         
+        Only the last time step feeds the prediction head, so the long-context
+        mode attends from that step alone with fused scaled_dot_product_attention
+        (O(L) instead of O(L^2) memory) using the same attention weights; its
+        output equals the full attention at the last step.
+        
         Args:
             input_size (int): Number of input features
             hidden_size (int): Size of hidden layers
             num_layers (int): Number of LSTM layers
+            num_symbols (int): Number of symbols for multi-asset training
+                (0 disables the symbol embedding)
+            symbol_embedding_dim (int): Size of the learned symbol embedding
+            long_context (bool): Attend from the last step only
+            attention_window (int): Attend over only the last N steps
+                (long-context mode; None attends over the whole sequence)
+            checkpoint_segment (int): Recompute the LSTM in segments of this many
+                steps during backward instead of storing its activations (0 = off)
+            horizons (int): Future steps predicted at once by the output head
         """
         super().__init__()
         
+        self.horizons = horizons
+        self.long_context = long_context
+        self.attention_window = attention_window
+        self.checkpoint_segment = checkpoint_segment
+        # Set by SeedEnsemble: torch.func.vmap has no batching rule for aten::lstm
+        self.unroll_lstm = False
+        # Set by SeedEnsemble: nor for the fused CPU attention kernel behind
+        # scaled_dot_product_attention, which would run member by member
+        self.explicit_attention = False
+        self.num_symbols = num_symbols
+        if num_symbols > 0:
+            # Learned per-symbol vector appended to every time step
+            self.symbol_embedding = nn.Embedding(num_symbols, symbol_embedding_dim)
+            input_size = input_size + symbol_embedding_dim
+        else:
+            self.symbol_embedding = None
+        
         self.lstm = nn.LSTM(input_size, hidden_size, 
                            num_layers=num_layers, 
                            batch_first=True,
@@ -100,37 +211,138 @@ class NumericalModel(nn.Module):
             nn.Dropout(0.2),
             nn.Linear(hidden_size // 2, hidden_size // 4),
             nn.ReLU(),
-            nn.Linear(hidden_size // 4, 1)
+            nn.Linear(hidden_size // 4, horizons)
         )
         
-    def forward(self, x: torch.Tensor) -> torch.Tensor:
+    def forward(self, x: torch.Tensor, symbol_ids: torch.Tensor = None) -> torch.Tensor:
         """
         Forward pass of the model.
         
         Args:
             x (torch.Tensor): Input tensor of shape (batch_size, seq_len, input_size)
+            symbol_ids (torch.Tensor): Symbol indices of shape (batch_size,),
+                required when the model was built with num_symbols > 0
             
         Returns:
-            torch.Tensor: Predictions
+            torch.Tensor: Predictions of shape (batch_size, horizons)
         """
-        # LSTM layer
-        lstm_out, _ = self.lstm(x)
+        if self.symbol_embedding is not None:
+            if symbol_ids is None:
+                raise ValueError("symbol_ids are required for a multi-asset model")
+            embedded = self.symbol_embedding(symbol_ids)
+            embedded = embedded.unsqueeze(1).expand(-1, x.size(1), -1)
+            x = torch.cat([x, embedded], dim=2)
         
-        # Self-attention
-        attn_out, _ = self.attention(lstm_out, lstm_out, lstm_out)
-        
-        # Combine LSTM and attention outputs
-        combined = lstm_out + attn_out
+        # LSTM layer
+        lstm_out = self._run_lstm(x)
         
-        # Get last sequence for prediction
-        last_hidden = combined[:, -1, :]
+        if self.long_context:
+            last_hidden = lstm_out[:, -1, :] + self._last_step_attention(lstm_out)
+        else:
+            # Self-attention
+            attn_out, _ = self.attention(lstm_out, lstm_out, lstm_out)
+            
+            # Combine LSTM and attention outputs
+            combined = lstm_out + attn_out
+            
+            # Get last sequence for prediction
+            last_hidden = combined[:, -1, :]
         
         # Final prediction
         out = self.fc_layers(last_hidden)
         return out
+    
+    def _run_lstm(self, x: torch.Tensor) -> torch.Tensor:
+        """LSTM outputs, checkpointed over time segments when enabled and training."""
+        if self.unroll_lstm:
+            return self._unrolled_lstm(x)
+        if not (self.checkpoint_segment and self.training and torch.is_grad_enabled()):
+            return self.lstm(x)[0]
+        
+        # The hidden state carries across segments, so the result is the same LSTM
+        batch_size = x.size(0)
+        state_shape = (self.lstm.num_layers, batch_size, self.lstm.hidden_size)
+        h, c = x.new_zeros(state_shape), x.new_zeros(state_shape)
+        
+        outputs = []
+        for segment in x.split(self.checkpoint_segment, dim=1):
+            out, h, c = checkpoint(self._lstm_segment, segment, h, c, use_reentrant=False)
+            outputs.append(out)
+        return torch.cat(outputs, dim=1)
+    
+    def _lstm_segment(self, segment: torch.Tensor, h: torch.Tensor, c: torch.Tensor):
+        out, (h, c) = self.lstm(segment, (h, c))
+        return out, h, c
+    
+    def _unrolled_lstm(self, x: torch.Tensor) -> torch.Tensor:
+        """
+        The nn.LSTM forward written out step by step from its own weights.
+        
+        Same equations and parameters as the fused kernel, but built from
+        matmuls and pointwise ops that torch.func.vmap can batch across
+        stacked models.
+        """
+        lstm = self.lstm
+        out = x
+        for layer in range(lstm.num_layers):
+            w_ih = getattr(lstm, f'weight_ih_l{layer}')
+            w_hh = getattr(lstm, f'weight_hh_l{layer}')
+            bias = getattr(lstm, f'bias_ih_l{layer}') + getattr(lstm, f'bias_hh_l{layer}')
+            
+            # Input projections of all steps at once; only the recurrence is sequential
+            gates_in = F.linear(out, w_ih, bias)
+            h = c = x.new_zeros(x.size(0), lstm.hidden_size)
+            steps = []
+            # unbind rather than indexing: its backward is one stack, not a zeroed copy per step
+            for step_gates in gates_in.unbind(1):
+                i, f, g, o = (step_gates + F.linear(h, w_hh)).chunk(4, dim=1)
+                c = torch.sigmoid(f) * c + torch.sigmoid(i) * torch.tanh(g)
+                h = torch.sigmoid(o) * torch.tanh(c)
+                steps.append(h)
+            out = torch.stack(steps, dim=1)
+            
+            if layer < lstm.num_layers - 1:
+                out = F.dropout(out, lstm.dropout, lstm.training)
+        return out
+    
+    def _last_step_attention(self, lstm_out: torch.Tensor) -> torch.Tensor:
+        """
+        Multi-head attention from the last step over the (windowed) sequence.
+        
+        Reuses the nn.MultiheadAttention projections, so weights trained in
+        either mode load into the other.
+        """
+        keys = lstm_out if self.attention_window is None else lstm_out[:, -self.attention_window:]
+        batch_size, length, hidden = keys.shape
+        heads = self.attention.num_heads
+        
+        w_q, w_k, w_v = self.attention.in_proj_weight.chunk(3)
+        b_q, b_k, b_v = self.attention.in_proj_bias.chunk(3)
+        
+        def split_heads(t: torch.Tensor) -> torch.Tensor:
+            return t.view(batch_size, -1, heads, hidden // heads).transpose(1, 2)
+        
+        q = split_heads(F.linear(lstm_out[:, -1:], w_q, b_q))
+        k = split_heads(F.linear(keys, w_k, b_k))
+        v = split_heads(F.linear(keys, w_v, b_v))
+        
+        dropout = self.attention.dropout if self.attention.training else 0.0
+        if self.explicit_attention:
+            # softmax(q k^T / sqrt(d)) v from batchable ops; the score matrix is
+            # only (1 x L) per head, so skipping the fused kernel costs little
+            weights = torch.softmax(q @ k.transpose(-2, -1) / math.sqrt(q.shape[-1]), dim=-1)
+            context = F.dropout(weights, dropout, self.attention.training) @ v
+        else:
+            context = F.scaled_dot_product_attention(q, k, v, dropout_p=dropout)
+        context = context.transpose(1, 2).reshape(batch_size, hidden)
+        
+        return self.attention.out_proj(context)
 
 class PricePredictionModel:
-    def __init__(self, input_size: int, hidden_size: int, sequence_length: int = 10):
+    def __init__(self, input_size: int, hidden_size: int, sequence_length: int = 10,
+                 learning_rate: float = 0.001, feature_columns: List[str] = None,
+                 long_context: bool = False, attention_window: int = None,
+                 checkpoint_segment: int = 0, horizons: int = 1):
         """
         Initialize the price prediction model.
         
@@ -138,58 +350,137 @@ class PricePredictionModel:
             input_size (int): Number of input features
             hidden_size (int): Size of hidden layers
             sequence_length (int): Length of input sequences
+            learning_rate (float): Adam learning rate
+            feature_columns (List[str]): Columns used as model input
+            long_context (bool): Last-step fused attention (see NumericalModel)
+            attention_window (int): Attend over only the last N steps
+            checkpoint_segment (int): LSTM gradient-checkpointing segment length
+            horizons (int): Future steps predicted at once
         """
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model = NumericalModel(input_size, hidden_size).to(self.device)
-        self.preprocessor = TimeSeriesPreprocessor(sequence_length)
+        self.model = NumericalModel(
+            input_size, hidden_size,
+            long_context=long_context,
+            attention_window=attention_window,
+            checkpoint_segment=checkpoint_segment,
+            horizons=horizons
+        ).to(self.device)
+        self.preprocessor = TimeSeriesPreprocessor(sequence_length, feature_columns, horizons)
+        # Multi-horizon loss: the mean over (batch, horizon) weighs every horizon equally
         self.criterion = nn.MSELoss()
-        self.optimizer = torch.optim.Adam(self.model.parameters())
+        self.optimizer = torch.optim.Adam(self.model.parameters(), lr=learning_rate)
+        self._ddp_model = None
+        
+    @property
+    def is_distributed(self) -> bool:
+        """Whether training runs inside an initialized process group."""
+        return dist.is_available() and dist.is_initialized()
+    
+    @property
+    def rank(self) -> int:
+        """Global rank of this process (0 when not distributed)."""
+        return dist.get_rank() if self.is_distributed else 0
+    
+    def _training_model(self) -> nn.Module:
+        """Return the module to train, wrapped in DDP when distributed."""
+        if not self.is_distributed:
+            return self.model
+        if self._ddp_model is None:
+            # DDP all-reduces (averages) gradients across ranks during backward
+            device_ids = [self.device.index] if self.device.type == "cuda" else None
+            self._ddp_model = DistributedDataParallel(self.model, device_ids=device_ids)
+        return self._ddp_model
+        
+    def save_checkpoint(self, path: str):
+        """
+        Save the model weights; only rank 0 writes when distributed.
+        
+        Args:
+            path (str): Destination file
+        """
+        if self.rank == 0:
+            torch.save(self.model.state_dict(), path)
         
     def train(self, train_loader: torch.utils.data.DataLoader, 
               val_loader: torch.utils.data.DataLoader,
-              epochs: int = 100) -> List[float]:
+              epochs: int = 100,
+              checkpoint_path: str = None,
+              epoch_callback: Callable[[int, float], bool] = None) -> List[float]:
         """
         Train the model.
         
+        When a torch.distributed process group is initialized, the model is
+        wrapped in DistributedDataParallel, loaders built with a
+        DistributedSampler are reshuffled every epoch, and rank 0 validates on
+        the whole (unsharded) val_loader and broadcasts the loss, so every rank
+        returns the history a single-process run would report.
+        
         Args:
             train_loader (DataLoader): Training data loader
-            val_loader (DataLoader): Validation data loader
+            val_loader (DataLoader): Validation data loader (the full set, not
+                sharded, in distributed runs)
             epochs (int): Number of training epochs
+            checkpoint_path (str): Optional file to save weights to after
+                every epoch (written by rank 0 only)
+            epoch_callback (Callable[[int, float], bool]): Optional hook called
+                with (epoch, validation loss) after every epoch; returning True
+                stops training early
             
         Returns:
             List[float]: Training history (validation losses)
         """
+        model = self._training_model()
         val_losses = []
         
+        if self.model.long_context:
+            # Gradients fading back through long LSTM sequences turn denormal,
+            # which slows CPU kernels by an order of magnitude
+            torch.set_flush_denormal(True)
+        
         for epoch in range(epochs):
+            if isinstance(train_loader.sampler, DistributedSampler):
+                train_loader.sampler.set_epoch(epoch)
+            
             # Training
-            self.model.train()
+            model.train()
             for batch_x, batch_y in train_loader:
                 batch_x = batch_x.to(self.device).float()
                 batch_y = batch_y.to(self.device).float()
                 
                 self.optimizer.zero_grad()
-                outputs = self.model(batch_x)
+                outputs = model(batch_x)
                 loss = self.criterion(outputs, batch_y)
                 loss.backward()
                 self.optimizer.step()
             
-            # Validation
+            # Validation: a sharded sampler would pad with duplicates, so rank 0
+            # scores every window once and the other ranks receive its loss
             self.model.eval()
             val_loss = 0
-            with torch.no_grad():
-                for batch_x, batch_y in val_loader:
-                    batch_x = batch_x.to(self.device).float()
-                    batch_y = batch_y.to(self.device).float()
-                    
-                    outputs = self.model(batch_x)
-                    val_loss += self.criterion(outputs, batch_y).item()
-            
-            val_loss /= len(val_loader)
+            if self.rank == 0:
+                with torch.no_grad():
+                    for batch_x, batch_y in val_loader:
+                        batch_x = batch_x.to(self.device).float()
+                        batch_y = batch_y.to(self.device).float()
+                        
+                        outputs = self.model(batch_x)
+                        val_loss += self.criterion(outputs, batch_y).item()
+                val_loss /= max(len(val_loader), 1)
+            
+            if self.is_distributed:
+                loss = torch.tensor([val_loss], dtype=torch.float64)
+                dist.broadcast(loss, src=0)
+                val_loss = loss.item()
             val_losses.append(val_loss)
             
-            if (epoch + 1) % 10 == 0:
+            if checkpoint_path is not None:
+                self.save_checkpoint(checkpoint_path)
+            
+            if (epoch + 1) % 10 == 0 and self.rank == 0:
                 print(f'Epoch [{epoch+1}/{epochs}], Validation Loss: {val_loss:.4f}')
+            
+            if epoch_callback is not None and epoch_callback(epoch, val_loss):
+                break
         
         return val_losses
     
@@ -209,7 +500,59 @@ class PricePredictionModel:
             predictions = self.model(X)
             return predictions.cpu().numpy()
 
+def _benchmark_long_context(lengths: List[int], batch_size: int = 32, input_size: int = 13,
+                            hidden_size: int = 64, steps: int = 3):
+    """
+    Activation memory and training step time per sequence length and mode.
+    
+    Memory is the total size of tensors autograd saves for backward, which
+    is what grows with the lookback.
+    """
+    import time
+    
+    torch.set_flush_denormal(True)
+    modes = {
+        'full attention': {},
+        'long context': {'long_context': True},
+        'long + window 64': {'long_context': True, 'attention_window': 64},
+        'long + checkpoint 64': {'long_context': True, 'checkpoint_segment': 64}
+    }
+    
+    print(f"{'length':>6}  {'mode':<22}{'saved MB':>10}{'step ms':>10}")
+    for length in lengths:
+        X = torch.randn(batch_size, length, input_size)
+        y = torch.randn(batch_size, 1)
+        for label, options in modes.items():
+            torch.manual_seed(0)
+            model = NumericalModel(input_size, hidden_size, **options)
+            optimizer = torch.optim.Adam(model.parameters())
+            
+            saved = [0]
+            def pack(tensor):
+                saved[0] += tensor.numel() * tensor.element_size()
+                return tensor
+            
+            with torch.autograd.graph.saved_tensors_hooks(pack, lambda tensor: tensor):
+                loss = nn.functional.mse_loss(model(X), y)
+            loss.backward()
+            
+            start = time.perf_counter()
+            for _ in range(steps):
+                optimizer.zero_grad()
+                nn.functional.mse_loss(model(X), y).backward()
+                optimizer.step()
+            step_ms = (time.perf_counter() - start) / steps * 1000
+            
+            print(f"{length:>6}  {label:<22}{saved[0] / 2**20:>10.1f}{step_ms:>10.1f}")
+
 if __name__ == "__main__":
+    import sys
+    
+    if sys.argv[1:2] == ['benchmark']:
+        # python -m models.numerical_model benchmark
+        _benchmark_long_context([10, 64, 256, 1024])
+        sys.exit()
+    
     # Example usage
     import torch.utils.data as data
     
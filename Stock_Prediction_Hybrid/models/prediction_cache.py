@@ -0,0 +1,162 @@
+import threading
+import time
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable
+
+from .hybrid_model import EnsemblePredictor, HybridModel
+
+class PredictionCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Bounded LRU cache of prediction arrays with a time-to-live.
+
+        Safe to share between threads (e.g. dashboard request handlers).
+
+        Args:
+            maxsize (int): Entries kept before the least recently used is evicted
+            ttl (float): Seconds an entry stays valid
+            clock (Callable[[], float]): Time source in seconds
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Cached value for key, computing and storing it on a miss.
+
+        Args:
+            key (Hashable): Cache key
+            compute (Callable[[], np.ndarray]): Produces the value on a miss
+
+        Returns:
+            np.ndarray: A copy of the cached value
+        """
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, value = entry
+                if now < expires:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value.copy()
+                del self._entries[key]
+                self.expirations += 1
+            self.misses += 1
+
+        # Run the model outside the lock so other keys are not blocked
+        value = np.asarray(compute())
+
+        with self._lock:
+            self._entries[key] = (self.clock() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+        return value.copy()
+
+    def clear(self):
+        """Drop every entry (statistics are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit-rate metrics since the cache was created."""
+        with self._lock:
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'size': len(self._entries)
+            }
+
+class CachedPredictor:
+    def __init__(self, model: HybridModel, cache: PredictionCache = None, window_size: int = None):
+        """
+        HybridModel and EnsemblePredictor front end that reuses recent results.
+
+        Requests are keyed by symbol, the timestamp of the last bar in the
+        input window, the sentiment value and the model version, so a new
+        bar, new sentiment or retrained weights never return a stale result.
+
+        Args:
+            model (HybridModel): Trained hybrid model
+            cache (PredictionCache): Shared cache (default: a new one)
+            window_size (int): Steps predicted by predict_sequence (default: all horizons)
+        """
+        self.model = model
+        self.cache = cache or PredictionCache()
+        self.ensemble = EnsemblePredictor(model, window_size or model.horizons)
+
+    def _key(self, kind: str, symbol: str, last_bar, sentiment: np.ndarray) -> tuple:
+        return (kind, symbol, pd.Timestamp(last_bar), tuple(np.asarray(sentiment, dtype=np.float64).ravel()),
+                self.model.version, self.ensemble.window_size if kind == 'sequence' else None)
+
+    def predict(self, symbol: str, last_bar, X: np.ndarray, sentiment_scores: np.ndarray) -> np.ndarray:
+        """
+        HybridModel.predict for one symbol's latest window, cached.
+
+        Args:
+            symbol (str): Stock symbol
+            last_bar: Timestamp of the last bar in X
+            X (np.ndarray): Numerical features
+            sentiment_scores (np.ndarray): Sentiment scores
+
+        Returns:
+            np.ndarray: Predictions
+        """
+        return self.cache.get_or_compute(
+            self._key('predict', symbol, last_bar, sentiment_scores),
+            lambda: self.model.predict(X, sentiment_scores)
+        )
+
+    def predict_sequence(self, symbol: str, last_bar, initial_X: np.ndarray,
+                         initial_sentiment: np.ndarray) -> np.ndarray:
+        """
+        EnsemblePredictor.predict_sequence for one symbol's latest window, cached.
+
+        Args:
+            symbol (str): Stock symbol
+            last_bar: Timestamp of the last bar in initial_X
+            initial_X (np.ndarray): Initial numerical features
+            initial_sentiment (np.ndarray): Initial sentiment scores
+
+        Returns:
+            np.ndarray: Sequence of predictions
+        """
+        return self.cache.get_or_compute(
+            self._key('sequence', symbol, last_bar, initial_sentiment),
+            lambda: self.ensemble.predict_sequence(initial_X, initial_sentiment)
+        )
+
+if __name__ == "__main__":
+    # Example usage: a dashboard polling the same latest window
+    X = np.random.randn(1, 10, 13)
+    sentiment = np.array([[0.2]])
+
+    model = HybridModel(input_size=13, hidden_size=64, horizons=5)
+    model.numerical_model.preprocessor.target_scaler.fit(np.random.randn(100, 1))
+    predictor = CachedPredictor(model, PredictionCache(maxsize=256, ttl=30))
+
+    start = time.perf_counter()
+    for _ in range(200):
+        predictor.predict_sequence('AAPL', '2024-03-14', X, sentiment)
+    print(f"200 polls in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(predictor.cache.stats())
@@ -0,0 +1,209 @@
+import copy
+import torch
+import torch.nn as nn
+import numpy as np
+from torch.func import functional_call, stack_module_state, vmap
+from typing import List, Tuple
+
+from .numerical_model import NumericalModel, TimeSeriesPreprocessor
+
+class SeedEnsemble:
+    def __init__(self, input_size: int, hidden_size: int, num_models: int = 5,
+                 sequence_length: int = 10, learning_rate: float = 0.001,
+                 feature_columns: List[str] = None, seeds: List[int] = None,
+                 long_context: bool = False, attention_window: int = None,
+                 horizons: int = 1):
+        """
+        Initialize K NumericalModels with different seeds, trained as one.
+
+        The members' parameters are stacked along a leading model dimension
+        and every batch runs through all of them in one vmapped
+        functional_call, so K models cost one batched forward/backward
+        instead of K sequential training runs. Each member only sees the
+        gradient of its own loss and Adam's state is per element, so the
+        members train exactly as independent models would.
+
+        Args:
+            input_size (int): Number of input features
+            hidden_size (int): Size of hidden layers
+            num_models (int): Ensemble size K (ignored when seeds are given)
+            sequence_length (int): Length of input sequences
+            learning_rate (float): Adam learning rate
+            feature_columns (List[str]): Columns used as model input
+            seeds (List[int]): Initialization seed of every member (default: 0..K-1)
+            long_context (bool): Last-step fused attention (see NumericalModel)
+            attention_window (int): Attend over only the last N steps
+            horizons (int): Future steps predicted at once by each member
+        """
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.seeds = list(seeds) if seeds is not None else list(range(num_models))
+
+        members = []
+        for seed in self.seeds:
+            torch.manual_seed(seed)
+            members.append(NumericalModel(
+                input_size, hidden_size,
+                long_context=long_context,
+                attention_window=attention_window,
+                horizons=horizons
+            ).to(self.device))
+        self.params, self.buffers = stack_module_state(members)
+
+        # Stateless template the stacked parameters are swapped into
+        self.model = copy.deepcopy(members[0]).to('meta')
+        self.model.unroll_lstm = True
+        # Last-step attention equals the full attention where the head reads it;
+        # computed explicitly, it batches under vmap where neither the fused MHA
+        # nor the fused CPU SDPA kernel does
+        self.model.long_context = True
+        self.model.explicit_attention = True
+        self.long_context = long_context
+        self.horizons = horizons
+
+        self.preprocessor = TimeSeriesPreprocessor(sequence_length, feature_columns, horizons)
+        self.optimizer = torch.optim.Adam(self.params.values(), lr=learning_rate)
+
+    @property
+    def num_models(self) -> int:
+        """Number of ensemble members."""
+        return len(self.seeds)
+
+    def _forward(self, x: torch.Tensor) -> torch.Tensor:
+        """Predictions of every member, shape (K, batch_size, horizons)."""
+        def member(params, buffers, x):
+            return functional_call(self.model, (params, buffers), (x,))
+        # Each member draws its own dropout masks
+        return vmap(member, in_dims=(0, 0, None), randomness='different')(self.params, self.buffers, x)
+
+    def train(self, train_loader: torch.utils.data.DataLoader,
+              val_loader: torch.utils.data.DataLoader,
+              epochs: int = 100) -> List[float]:
+        """
+        Train all members together.
+
+        Args:
+            train_loader (DataLoader): Training data loader
+            val_loader (DataLoader): Validation data loader
+            epochs (int): Number of training epochs
+
+        Returns:
+            List[float]: Training history (validation loss of the ensemble mean);
+                per-member validation losses are kept in self.member_history
+        """
+        val_losses = []
+        self.member_history = []
+
+        for epoch in range(epochs):
+            # Training
+            self.model.train()
+            for batch_x, batch_y in train_loader:
+                batch_x = batch_x.to(self.device).float()
+                batch_y = batch_y.to(self.device).float()
+
+                self.optimizer.zero_grad()
+                outputs = self._forward(batch_x)
+                # Sum of the members' own losses: member k's gradient is that of its loss alone
+                loss = ((outputs - batch_y) ** 2).mean(dim=(1, 2)).sum()
+                loss.backward()
+                self.optimizer.step()
+
+            # Validation
+            self.model.eval()
+            val_loss = 0
+            member_loss = torch.zeros(self.num_models)
+            with torch.no_grad():
+                for batch_x, batch_y in val_loader:
+                    batch_x = batch_x.to(self.device).float()
+                    batch_y = batch_y.to(self.device).float()
+
+                    outputs = self._forward(batch_x)
+                    member_loss += ((outputs - batch_y) ** 2).mean(dim=(1, 2)).cpu()
+                    val_loss += ((outputs.mean(dim=0) - batch_y) ** 2).mean().item()
+
+            val_loss /= len(val_loader)
+            val_losses.append(val_loss)
+            self.member_history.append((member_loss / len(val_loader)).numpy())
+
+            if (epoch + 1) % 10 == 0:
+                print(f'Epoch [{epoch+1}/{epochs}], Validation Loss: {val_loss:.4f} '
+                      f'(members {self.member_history[-1].min():.4f}-{self.member_history[-1].max():.4f})')
+
+        return val_losses
+
+    def predict_members(self, X: torch.Tensor) -> np.ndarray:
+        """
+        Predictions of every member.
+
+        Args:
+            X (torch.Tensor): Input data
+
+        Returns:
+            np.ndarray: Predicted values of shape (K, len(X), horizons)
+        """
+        self.model.eval()
+        with torch.no_grad():
+            return self._forward(X.to(self.device).float()).cpu().numpy()
+
+    def predict(self, X: torch.Tensor) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Ensemble mean and spread.
+
+        Args:
+            X (torch.Tensor): Input data
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Mean and standard deviation of the
+                member predictions, each of shape (len(X), horizons), in the scaled
+                target space like PricePredictionModel.predict
+        """
+        predictions = self.predict_members(X)
+        return predictions.mean(axis=0), predictions.std(axis=0)
+
+    def member(self, index: int) -> NumericalModel:
+        """
+        One member as a standalone NumericalModel (e.g. to checkpoint or serve it).
+
+        Args:
+            index (int): Member position
+
+        Returns:
+            NumericalModel: Model holding a copy of that member's weights
+        """
+        model = copy.deepcopy(self.model).to_empty(device=self.device)
+        model.unroll_lstm = False
+        model.explicit_attention = False
+        model.long_context = self.long_context
+        state = {name: value[index].detach().clone() for name, value in self.params.items()}
+        state.update({name: value[index].clone() for name, value in self.buffers.items()})
+        model.load_state_dict(state)
+        return model
+
+if __name__ == "__main__":
+    # Wall time: K sequential PricePredictionModel runs vs. one vmapped ensemble
+    import sys
+    import time
+    import torch.utils.data as data
+    from .numerical_model import PricePredictionModel
+
+    num_models = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    X = np.random.randn(2000, 10, 13).astype(np.float32)
+    y = np.random.randn(2000, 1).astype(np.float32)
+    dataset = data.TensorDataset(torch.from_numpy(X), torch.from_numpy(y))
+    loader = data.DataLoader(dataset, batch_size=64, shuffle=True)
+
+    start = time.perf_counter()
+    PricePredictionModel(input_size=13, hidden_size=64).train(loader, loader, epochs=2)
+    single_time = time.perf_counter() - start
+    print(f"1 model:              {single_time:6.2f}s")
+    print(f"{num_models} sequential models:  {single_time * num_models:6.2f}s (extrapolated)")
+
+    ensemble = SeedEnsemble(input_size=13, hidden_size=64, num_models=num_models)
+    start = time.perf_counter()
+    ensemble.train(loader, loader, epochs=2)
+    ensemble_time = time.perf_counter() - start
+    print(f"{num_models}-model ensemble:    {ensemble_time:6.2f}s "
+          f"({ensemble_time / single_time:.1f}x one model)")
+
+    mean, spread = ensemble.predict(torch.from_numpy(X[:5]))
+    for m, s in zip(mean.ravel(), spread.ravel()):
+        print(f"  {m:+.4f} +/- {s:.4f}")
@@ -5,18 +5,46 @@ import numpy as np
 from typing import List, Dict, Union
 import pandas as pd
 
+from utils.dedup import NearDuplicateDetector
+from utils.token_store import TokenStore
+
 class SentimentAnalyzer:
-    def __init__(self, model_name: str = "ProsusAI/finbert"):
+    def __init__(self, model_name: str = "ProsusAI/finbert", deduplicate: bool = True,
+                 token_store_path: str = None, max_length: int = 512):
         """
         Initialize the sentiment analyzer with a pre-trained model.
         
         Args:
             model_name (str): Name of the pre-trained model to use
+            deduplicate (bool): Score each cluster of near-identical articles once
+            token_store_path (str): Directory of a TokenStore; articles are
+                tokenized once and read back from it afterwards
+            max_length (int): Maximum tokens per article
         """
         self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.model = AutoModelForSequenceClassification.from_pretrained(model_name)
         self.model.to(self.device)
+        self.deduplicator = NearDuplicateDetector() if deduplicate else None
+        self.max_length = max_length
+        self.token_store = (TokenStore(token_store_path, model_name, len(self.tokenizer), max_length)
+                            if token_store_path else None)
+        
+    def _encode(self, texts: List[str]) -> Dict[str, torch.Tensor]:
+        """
+        Padded model inputs for a list of texts.
+        
+        With a token store, only texts not seen before are tokenized; the
+        rest are gathered from the memory-mapped store.
+        """
+        if self.token_store is None:
+            inputs = self.tokenizer(texts, return_tensors="pt", truncation=True,
+                                    max_length=self.max_length, padding=True)
+        else:
+            self.token_store.add(texts, self.tokenizer)
+            inputs = {k: torch.from_numpy(v) for k, v in
+                      self.token_store.collate(texts, self.tokenizer.pad_token_id).items()}
+        return {k: v.to(self.device) for k, v in inputs.items()}
         
     def analyze_text(self, text: str) -> Dict[str, float]:
         """
@@ -28,8 +56,7 @@ class SentimentAnalyzer:
         Returns:
             Dict[str, float]: Dictionary containing sentiment scores
         """
-        inputs = self.tokenizer(text, return_tensors="pt", truncation=True, max_length=512)
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        inputs = self._encode([text])
         
         with torch.no_grad():
             outputs = self.model(**inputs)
@@ -59,9 +86,7 @@ class SentimentAnalyzer:
             return []
         
         # Tokenize all texts
-        inputs = self.tokenizer(texts, return_tensors="pt", truncation=True, 
-                              max_length=512, padding=True)
-        inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        inputs = self._encode(texts)
         
         # Get predictions
         with torch.no_grad():
@@ -79,6 +104,45 @@ class SentimentAnalyzer:
             
         return results
     
+    def score_articles(self, news_data: List[Dict]) -> pd.DataFrame:
+        """
+        Score every article individually, keeping its timestamp and source.
+        
+        Syndicated copies of a story published within the deduplicator's
+        time span are collapsed before FinBERT runs, so each story is
+        scored once and counted once, at its earliest copy.
+        
+        Args:
+            news_data (List[Dict]): List of news articles
+            
+        Returns:
+            pd.DataFrame: One row per story with date, source, class
+                probabilities, sentiment_score (positive - negative) and
+                the number of copies found
+        """
+        # Earliest copy first, so it becomes the cluster representative
+        news_data = sorted(news_data, key=lambda article: pd.Timestamp(article['date']))
+        
+        # Combine title and description for better context
+        texts = [f"{article['title']} {article['description']}" for article in news_data]
+        
+        dates = pd.to_datetime([article['date'] for article in news_data])
+        
+        if self.deduplicator is not None:
+            # Copies are only merged within the detector's time span
+            keep, inverse = self.deduplicator.deduplicate(texts, dates)
+        else:
+            keep, inverse = np.arange(len(texts)), np.arange(len(texts))
+        
+        df = pd.DataFrame(self.analyze_batch([texts[i] for i in keep]),
+                          columns=['positive', 'negative', 'neutral'])
+        df['date'] = dates[keep]
+        df['source'] = [news_data[i].get('source', 'Unknown') for i in keep]
+        df['sentiment_score'] = df['positive'] - df['negative']
+        df['copies'] = np.bincount(inverse, minlength=len(keep))
+        
+        return df
+    
     def process_news_data(self, news_data: List[Dict]) -> pd.DataFrame:
         """
         Process a list of news articles and return sentiment scores.
@@ -89,22 +153,7 @@ class SentimentAnalyzer:
         Returns:
             pd.DataFrame: DataFrame with sentiment scores for each article
         """
-        # Extract texts to analyze
-        texts = []
-        dates = []
-        for article in news_data:
-            # Combine title and description for better context
-            text = f"{article['title']} {article['description']}"
-            texts.append(text)
-            dates.append(article['date'])
-        
-        # Get sentiment scores
-        sentiments = self.analyze_batch(texts)
-        
-        # Create DataFrame
-        df = pd.DataFrame(sentiments)
-        df['date'] = dates
-        df['date'] = pd.to_datetime(df['date'])
+        df = self.score_articles(news_data)
         
         # Calculate aggregate daily sentiment
         daily_sentiment = df.groupby(df['date'].dt.date).agg({
@@ -10,17 +10,51 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
 
-from models.hybrid_model import HybridModel, EnsemblePredictor
+from models.hybrid_model import HybridModel, EnsemblePredictor, empty_article_scores
+from models.sentiment_aggregator import SentimentAggregator
+from models.checkpoint import load_checkpoint, save_checkpoint, save_multi_asset_checkpoint
+from models.multi_asset_model import MultiAssetModel
+from models.seed_ensemble import SeedEnsemble
 from utils.data_collector import DataCollector
+from utils.indicators import FeaturePipeline
+from utils.intraday import IntradayStore, SessionCalendar
+from utils.sensex import SensexDataCollector
+from utils.distributed import train_distributed
+from utils.batch_scoring import score_universe
+from utils.incremental import DatasetStore, incremental_update
+from utils.pipeline import Stage, StagedPipeline, Timeline
+from utils.sweep import run_sweep
 
 def load_config(config_path: str) -> dict:
     """Load configuration from YAML file."""
     with open(config_path, 'r') as f:
         return yaml.safe_load(f)
 
-def prepare_data(symbol: str, start_date: str, end_date: str = None) -> tuple:
+def configure_features(config: dict) -> FeaturePipeline:
+    """Build the declared feature pipeline and derive the model input size from it."""
+    pipeline = FeaturePipeline.from_config(config)
+    
+    configured = config['model'].get('input_size')
+    if configured is not None and configured != pipeline.input_size:
+        raise ValueError(
+            f"model.input_size is {configured} but the declared features give "
+            f"{pipeline.input_size}; remove input_size to derive it"
+        )
+    config['model']['input_size'] = pipeline.input_size
+    config['model']['feature_columns'] = pipeline.feature_columns
+    
+    return pipeline
+
+def make_collector(symbol: str, offline_csv: str = None, feature_pipeline: FeaturePipeline = None,
+                   config: dict = None):
+    """Live collector, or the stored SENSEX history to train fully offline with the same indicators."""
+    return (SensexDataCollector(offline_csv, feature_pipeline) if offline_csv
+            else DataCollector.from_config(symbol, config or {}, feature_pipeline))
+
+def prepare_data(symbol: str, start_date: str, end_date: str = None,
+                 offline_csv: str = None, feature_pipeline: FeaturePipeline = None) -> tuple:
     """Prepare data for training."""
-    collector = DataCollector(symbol)
+    collector = make_collector(symbol, offline_csv, feature_pipeline)
     
     # Get stock data
     stock_data = collector.get_stock_data(start_date, end_date)
@@ -31,6 +65,284 @@ def prepare_data(symbol: str, start_date: str, end_date: str = None) -> tuple:
     
     return stock_data, news_data
 
+def fetch_and_score(model: HybridModel, config: dict, feature_pipeline: FeaturePipeline,
+                    timeline: Timeline) -> tuple:
+    """
+    Fetch prices and news concurrently and score the news in chunks as it arrives.
+    
+    FinBERT runs while the price download is still in flight instead of
+    after it. Chunks are cut from date-ordered articles, so syndicated
+    copies (published close together) are still mostly scored once.
+    
+    Returns:
+        tuple: Stock data, raw articles and their score_articles frame
+    """
+    pipeline_config = config.get('pipeline', {})
+    chunk_size = pipeline_config.get('news_chunk_size', 256)
+    collector = make_collector(config['symbol'], config.get('offline_csv'), feature_pipeline, config)
+    days_of_news = (pd.to_datetime(config['end_date']) - pd.to_datetime(config['start_date'])).days
+    
+    def fetch(job):
+        if job == 'prices':
+            yield job, collector.get_stock_data(config['start_date'], config['end_date'])
+        else:
+            yield job, collector.get_news_data(days=days_of_news)
+    
+    def score(item):
+        job, data = item
+        yield item
+        if job == 'news':
+            articles = sorted(data, key=lambda article: pd.Timestamp(article['date']))
+            for start in range(0, len(articles), chunk_size):
+                yield 'scored', model.sentiment_analyzer.score_articles(articles[start:start + chunk_size])
+    
+    pipeline = StagedPipeline([
+        Stage('fetch', fetch, workers=2),
+        Stage('score', score, label=lambda item: item[0])
+    ], queue_size=pipeline_config.get('queue_size', 4), timeline=timeline)
+    
+    results = {'scored': []}
+    for job, data in pipeline.run(['prices', 'news'], consumer='prepare'):
+        if job == 'scored':
+            results['scored'].append(data)
+        else:
+            results[job] = data
+    
+    scored = results['scored']
+    # No news (offline, no API key or a failed request) never loads FinBERT
+    articles = pd.concat(scored, ignore_index=True) if scored else empty_article_scores()
+    return results['prices'], results['news'], articles
+
+def configure_sentiment(model: HybridModel, config: dict):
+    """Attach the configured sentiment aggregator and token-store analyzer to a model."""
+    sentiment_config = config.get('sentiment', {})
+    
+    # Time-decayed, source-weighted sentiment when a half-life is configured
+    if sentiment_config.get('half_life_hours'):
+        model.sentiment_aggregator = SentimentAggregator(
+            half_life_hours=sentiment_config['half_life_hours'],
+            source_weights=sentiment_config.get('source_weights'),
+            default_weight=sentiment_config.get('default_source_weight', 1.0)
+        )
+    if sentiment_config.get('token_store'):
+        from models.sentiment_model import SentimentAnalyzer
+        model.sentiment_analyzer = SentimentAnalyzer(
+            sentiment_config.get('model_name', 'ProsusAI/finbert'),
+            token_store_path=sentiment_config['token_store'],
+            max_length=sentiment_config.get('max_length', 512)
+        )
+
+def retrain_incremental(config: dict, output_dir: Path, feature_pipeline: FeaturePipeline) -> bool:
+    """
+    Warm-start the last checkpoint on the bars and news since the previous run.
+    
+    Returns:
+        bool: False when a full retrain is needed (no previous run or drift)
+    """
+    checkpoint_path = output_dir / 'model.pt'
+    store = DatasetStore(output_dir / 'dataset')
+    if not checkpoint_path.exists() or store.last_bar is None:
+        print("No previous model or dataset found; running a full retrain")
+        return False
+    
+    model = load_checkpoint(checkpoint_path)
+    configure_sentiment(model, config)
+    
+    # Refetch from the last stored bar; the store keeps only what is new
+    new_bars, new_news = prepare_data(
+        config['symbol'],
+        store.last_bar.strftime('%Y-%m-%d'),
+        config['end_date'],
+        offline_csv=config.get('offline_csv'),
+        feature_pipeline=feature_pipeline
+    )
+    result = incremental_update(model, store, new_bars, new_news, feature_pipeline,
+                                config.get('incremental'))
+    if result['drift']:
+        print("Drift detected, running a full retrain: " + "; ".join(result['drift']))
+        return False
+    if not result['new_bars']:
+        print(f"No bars after {store.last_bar}; keeping the current model "
+              f"({result['new_news']} new articles stored)")
+        return True
+    
+    save_checkpoint(
+        model,
+        checkpoint_path,
+        half=config.get('checkpoint', {}).get('half_precision', False)
+    )
+    print(f"Fine-tuned on {result['buffer_size']} windows "
+          f"({result['new_bars']} new bars, {result['new_news']} new articles), "
+          f"validation loss {result['history'][-1]:.4f}")
+    return True
+
+def train_multi_asset(config: dict, output_dir: Path):
+    """Train one shared NumericalModel across all symbols in the config."""
+    symbols = config['symbols']
+    multi_config = config.get('multi_asset', {})
+    pipeline_config = config.get('pipeline', {})
+    feature_pipeline = FeaturePipeline.from_config(config)
+    validation_size = config['preprocessing']['validation_size']
+    batch_size = multi_config.get('batch_size', 512)
+    
+    model = MultiAssetModel(
+        symbols,
+        input_size=config['model']['input_size'],
+        hidden_size=config['model']['hidden_size'],
+        sequence_length=config['model']['sequence_length'],
+        symbol_embedding_dim=multi_config.get('symbol_embedding_dim', 8),
+        feature_columns=config['model']['feature_columns'],
+        learning_rate=config['training'].get('learning_rate', 0.001),
+        horizons=config['model'].get('horizons', 1)
+    )
+    
+    # Symbols are downloaded on several threads, windowed one at a time and
+    # trained on (first epoch) as soon as they are ready
+    def fetch(symbol):
+        yield symbol, DataCollector.from_config(symbol, config, feature_pipeline).get_stock_data(
+            config['start_date'], config['end_date'])
+    
+    def build(item):
+        symbol, df = item
+        part = model.prepare_symbol(symbol, df)
+        if part is not None:
+            yield symbol, model.split_data(*part, validation_size=validation_size)
+    
+    timeline = Timeline()
+    pipeline = StagedPipeline([
+        Stage('fetch', fetch, workers=pipeline_config.get('fetch_workers', 4)),
+        Stage('features', build, label=lambda item: item[0])
+    ], queue_size=pipeline_config.get('queue_size', 4), timeline=timeline)
+    
+    print(f"Starting multi-asset training on {len(symbols)} symbols...")
+    train_parts, val_parts = [], []
+    for symbol, (train_part, val_part) in pipeline.run(symbols, consumer='train'):
+        with timeline.span('train', label=symbol):
+            model.train_pass(train_part, batch_size)
+        train_parts.append(train_part)
+        val_parts.append(val_part)
+    
+    if not train_parts:
+        raise ValueError("No symbol has enough data to build a sequence")
+    train_data = tuple(np.concatenate(arrays) for arrays in zip(*train_parts))
+    val_data = tuple(np.concatenate(arrays) for arrays in zip(*val_parts))
+    
+    # The streamed pass was the first epoch; the rest run over all symbols at once
+    with timeline.span('train', label='remaining epochs'):
+        history = [model.evaluate(val_data, batch_size)] + model.train(
+            train_data,
+            val_data,
+            epochs=config['training']['epochs'] - 1,
+            batch_size=batch_size
+        )
+    report_timeline(timeline, output_dir)
+    
+    plot_training_history(history, output_dir / 'training_history.png')
+    # Weights, symbol ids and every symbol's scalers (load_multi_asset_checkpoint)
+    save_multi_asset_checkpoint(
+        model,
+        output_dir / 'multi_asset_model.pt',
+        half=config.get('checkpoint', {}).get('half_precision', False)
+    )
+    
+    print("Multi-asset training completed successfully!")
+
+def report_timeline(timeline: Timeline, output_dir: Path):
+    """Print per-stage utilization and save the trace for chrome://tracing."""
+    print("Pipeline timeline ('#' busy, '.' waiting):")
+    print(timeline.render())
+    timeline.save_chrome_trace(output_dir / 'pipeline_trace.json')
+
+def sweep(config: dict, output_dir: Path, n_trials: int, max_workers: int = None):
+    """Search hyperparameters of the numerical model and write a leaderboard."""
+    collector = DataCollector(config['symbol'], FeaturePipeline.from_config(config))
+    stock_data = collector.get_stock_data(config['start_date'], config['end_date'])
+    
+    leaderboard = run_sweep(stock_data, config, output_dir,
+                            n_trials=n_trials, max_workers=max_workers)
+    print("Leaderboard:")
+    print(leaderboard.head(10).to_string(index=False))
+    
+    best = leaderboard.iloc[0]
+    best_params = {name: best[name].item() if hasattr(best[name], 'item') else best[name]
+                   for name in ['hidden_size', 'sequence_length', 'learning_rate', 'batch_size']}
+    save_metrics(best_params, output_dir / 'best_params.yaml')
+    print("Best parameters:", best_params)
+
+def score(config: dict, output_dir: Path, checkpoint: str = None, output: str = None,
+          max_workers: int = None):
+    """Score every symbol in the intraday store with a trained checkpoint."""
+    store = IntradayStore(config.get('intraday', {}).get('store', 'data/intraday'))
+    if not store.symbols():
+        # Only intraday fetches (interval other than 1d) fill the store
+        print(f"No symbols in the intraday store {store.root}; fetch minute bars first by "
+              f"training with an intraday interval (e.g. interval: 5m)")
+        return
+    result = score_universe(
+        checkpoint or output_dir / 'model.pt',
+        store,
+        output or output_dir / 'scores.parquet',
+        interval=config.get('interval', '1d'),
+        calendar=SessionCalendar.from_config(config),
+        pipeline=FeaturePipeline.from_config(config),
+        settings=config.get('scoring'),
+        max_workers=max_workers
+    )
+    print(f"Scored {result['symbols']} symbols ({result['rows']} rows) in {result['seconds']:.1f}s")
+    if result['skipped']:
+        print(f"Skipped {len(result['skipped'])} symbols without enough bars: "
+              f"{', '.join(result['skipped'][:10])}{' ...' if len(result['skipped']) > 10 else ''}")
+    if result['out_of_range']:
+        print(f"Skipped {len(result['out_of_range'])} symbols outside the checkpoint's feature range: "
+              f"{', '.join(result['out_of_range'][:10])}{' ...' if len(result['out_of_range']) > 10 else ''}")
+
+def train_seed_ensemble(X: np.ndarray, y: np.ndarray, config: dict, num_models: int,
+                        output_dir: Path) -> dict:
+    """
+    Train num_models seeds of the numerical model as one vmapped ensemble.
+
+    Args:
+        X (np.ndarray): Sequence array
+        y (np.ndarray): Target array
+        config (dict): Full run configuration
+        num_models (int): Ensemble size
+        output_dir (Path): Where the members' validation losses are written
+
+    Returns:
+        dict: State dict of the member with the lowest validation loss
+    """
+    model_config = config['model']
+    ensemble = SeedEnsemble(
+        input_size=model_config['input_size'],
+        hidden_size=model_config['hidden_size'],
+        num_models=num_models,
+        sequence_length=model_config['sequence_length'],
+        feature_columns=model_config.get('feature_columns'),
+        long_context=model_config.get('long_context', False),
+        attention_window=model_config.get('attention_window'),
+        horizons=model_config.get('horizons', 1)
+    )
+
+    split = int((1 - config['preprocessing']['validation_size']) * len(X))
+    batch_size = config['training']['batch_size']
+    train_loader = DataLoader(TensorDataset(torch.FloatTensor(X[:split]), torch.FloatTensor(y[:split])),
+                              batch_size=batch_size, shuffle=True)
+    val_loader = DataLoader(TensorDataset(torch.FloatTensor(X[split:]), torch.FloatTensor(y[split:])),
+                            batch_size=batch_size)
+    ensemble.train(train_loader, val_loader, epochs=config['training']['epochs'])
+
+    member_loss = ensemble.member_history[-1]
+    _, spread = ensemble.predict(torch.FloatTensor(X[split:]))
+    best = int(member_loss.argmin())
+    print(f"Seed ensemble: member losses {member_loss.min():.4f}-{member_loss.max():.4f}, "
+          f"mean spread {spread.mean():.4f}; keeping seed {ensemble.seeds[best]}")
+    save_metrics({
+        'seeds': ensemble.seeds,
+        'member_val_loss': member_loss.tolist(),
+        'mean_spread': float(spread.mean())
+    }, output_dir / 'seed_ensemble.yaml')
+    return ensemble.member(best).state_dict()
+
 def create_dataloaders(X: np.ndarray, sentiment: np.ndarray, y: np.ndarray, 
                       batch_size: int) -> tuple:
     """Create train and validation dataloaders."""
@@ -78,9 +390,9 @@ def evaluate_model(model: HybridModel, X_val: np.ndarray,
     mae = np.mean(np.abs(predictions - y_val))
     mape = np.mean(np.abs((y_val - predictions) / y_val)) * 100
     
-    # Calculate directional accuracy
-    actual_direction = np.diff(y_val.flatten()) > 0
-    pred_direction = np.diff(predictions.flatten()) > 0
+    # Calculate directional accuracy of the next-step forecast
+    actual_direction = np.diff(y_val[:, 0]) > 0
+    pred_direction = np.diff(predictions[:, 0]) > 0
     directional_accuracy = np.mean(actual_direction == pred_direction) * 100
     
     return {
@@ -98,31 +410,101 @@ def save_metrics(metrics: dict, save_path: str):
 def main():
     parser = argparse.ArgumentParser(description='Train hybrid stock prediction model')
     parser.add_argument('--config', type=str, required=True, help='Path to config file')
+    parser.add_argument('--multi-asset', action='store_true',
+                        help='Train one shared model over all symbols in config["symbols"]')
+    parser.add_argument('--nproc', type=int, default=0,
+                        help='Train the numerical model data-parallel over this many local workers')
+    parser.add_argument('--nnodes', type=int, default=1, help='Number of nodes for --nproc')
+    parser.add_argument('--node-rank', type=int, default=0, help='Index of this node')
+    parser.add_argument('--master-addr', type=str, default='127.0.0.1', help='Address of node 0')
+    parser.add_argument('--master-port', type=int, default=29500, help='Free TCP port on node 0')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Fine-tune the last checkpoint on new data; full retrain only on drift')
+    parser.add_argument('--ensemble', type=int, default=0,
+                        help='Train this many seeds of the numerical model as one vmapped ensemble '
+                             'and keep the best before fusion')
+    
+    subparsers = parser.add_subparsers(dest='command')
+    sweep_parser = subparsers.add_parser('sweep', help='Run a hyperparameter sweep')
+    sweep_parser.add_argument('--trials', type=int, default=20, help='Number of trials')
+    sweep_parser.add_argument('--workers', type=int, default=None,
+                              help='Parallel trial processes (default: CPU count)')
+    score_parser = subparsers.add_parser('score', help='Batch-score every symbol in the intraday store')
+    score_parser.add_argument('--checkpoint', type=str, default=None,
+                              help='Trained checkpoint (default: <output_dir>/model.pt)')
+    score_parser.add_argument('--output', type=str, default=None,
+                              help='Parquet file to write (default: <output_dir>/scores.parquet)')
+    score_parser.add_argument('--workers', type=int, default=None,
+                              help='Scoring processes (default: CPU count)')
     args = parser.parse_args()
     
     # Load configuration
     config = load_config(args.config)
+    feature_pipeline = configure_features(config)
     
     # Create output directory
     output_dir = Path(config['output_dir'])
     output_dir.mkdir(parents=True, exist_ok=True)
     
-    # Prepare data
-    stock_data, news_data = prepare_data(
-        config['symbol'],
-        config['start_date'],
-        config['end_date']
-    )
+    if args.command == 'sweep':
+        sweep(config, output_dir, args.trials, args.workers)
+        return
+    
+    if args.command == 'score':
+        score(config, output_dir, args.checkpoint, args.output, args.workers)
+        return
+    
+    if args.multi_asset:
+        train_multi_asset(config, output_dir)
+        return
+    
+    if args.incremental and retrain_incremental(config, output_dir, feature_pipeline):
+        return
     
     # Initialize model
     model = HybridModel(
         input_size=config['model']['input_size'],
         hidden_size=config['model']['hidden_size'],
-        sequence_length=config['model']['sequence_length']
+        sequence_length=config['model']['sequence_length'],
+        feature_columns=feature_pipeline.feature_columns,
+        long_context=config['model'].get('long_context', False),
+        attention_window=config['model'].get('attention_window'),
+        checkpoint_segment=config['model'].get('checkpoint_segment', 0),
+        horizons=config['model'].get('horizons', 1)
     )
+    configure_sentiment(model, config)
+    
+    # Prepare data: prices and news download together, news is scored as it arrives
+    timeline = Timeline()
+    stock_data, news_data, articles = fetch_and_score(model, config, feature_pipeline, timeline)
+    
+    # Prepare features (indicator warm-up rows are NaN and would poison the loss)
+    with timeline.span('features'):
+        X, sentiment, y = model.prepare_data(stock_data.dropna(), news_data, articles=articles)
     
-    # Prepare features
-    X, sentiment, y = model.prepare_data(stock_data, news_data)
+    # Optionally train the numerical model data-parallel before fusion
+    if args.nproc > 0:
+        print(f"Training numerical model on {args.nproc * args.nnodes} workers...")
+        checkpoint_path = output_dir / 'numerical_model.pth'
+        train_distributed(
+            X, y,
+            config['model'],
+            config['training'],
+            checkpoint_path,
+            args.nproc,
+            validation_size=config['preprocessing']['validation_size'],
+            nnodes=args.nnodes,
+            node_rank=args.node_rank,
+            master_addr=args.master_addr,
+            master_port=args.master_port
+        )
+        if args.node_rank != 0:
+            return
+        model.numerical_model.model.load_state_dict(torch.load(checkpoint_path))
+    elif args.ensemble > 0:
+        print(f"Training a {args.ensemble}-seed numerical model ensemble...")
+        model.numerical_model.model.load_state_dict(
+            train_seed_ensemble(X, y, config, args.ensemble, output_dir))
     
     # Create dataloaders
     train_data = (X[:int(0.8*len(X))], 
@@ -134,11 +516,13 @@ def main():
     
     # Train model
     print("Starting training...")
-    history = model.train(
-        train_data,
-        val_data,
-        epochs=config['training']['epochs']
-    )
+    with timeline.span('train'):
+        history = model.train(
+            train_data,
+            val_data,
+            epochs=config['training']['epochs']
+        )
+    report_timeline(timeline, output_dir)
     
     # Plot training history
     plot_training_history(history, output_dir / 'training_history.png')
@@ -151,8 +535,19 @@ def main():
     # Save metrics
     save_metrics(metrics, output_dir / 'metrics.yaml')
     
-    # Save model
-    torch.save(model.state_dict(), output_dir / 'model.pth')
+    # Save model, scalers and feature layout as one checkpoint
+    save_checkpoint(
+        model,
+        output_dir / 'model.pt',
+        half=config.get('checkpoint', {}).get('half_precision', False)
+    )
+    
+    # Keep the raw data and this run's loss for later --incremental runs
+    store = DatasetStore(output_dir / 'dataset')
+    store.bars, store.news, store.scores = None, [], articles
+    store.append(stock_data, news_data, feature_pipeline)
+    store.record_full_train(history[-1])
+    store.save()
     
     # Make future predictions
     print("Generating future predictions...")
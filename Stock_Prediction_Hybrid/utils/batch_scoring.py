@@ -0,0 +1,278 @@
+import copy
+import os
+import time
+import numpy as np
+import pandas as pd
+import torch
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Union
+
+from models.checkpoint import load_checkpoint
+from utils.incremental import INCREMENTAL_DEFAULTS, out_of_range
+from utils.indicators import FeaturePipeline, add_technical_indicators
+from utils.intraday import IntradayBars, IntradayStore, SessionCalendar, resample_bars
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+SCORING_DEFAULTS = {
+    'lookback_days': 400,       # Calendar days of minute bars loaded per symbol (indicator warm-up)
+    'windows_per_symbol': 1,    # Latest windows scored per symbol
+    'chunk_size': 64,           # Symbols per task; one model batch per task
+    # The checkpoint's scalers were fitted on its training symbol. By default
+    # every symbol is scaled on its own lookback instead, as each symbol of
+    # a MultiAssetModel has its own preprocessor. Without it, symbols whose
+    # features fall outside the checkpoint's range are skipped.
+    'symbol_scaling': True,
+    'feature_tolerance': INCREMENTAL_DEFAULTS['feature_tolerance'],
+    'max_out_of_range': INCREMENTAL_DEFAULTS['max_out_of_range']
+}
+
+# Set once per worker process by _init_worker
+_worker = {}
+
+def _score_schema():
+    return pa.schema([
+        ('symbol', pa.dictionary(pa.int32(), pa.string())),
+        ('date', pa.timestamp('ns', tz='UTC')),
+        ('horizon', pa.int16()),
+        ('prediction', pa.float32())
+    ])
+
+def _init_worker(checkpoint_path: str, store_root: str, interval: str, calendar: SessionCalendar,
+                 pipeline: FeaturePipeline, settings: Dict, num_threads: int):
+    """Load the checkpoint once per process; its weights are memory-mapped and shared."""
+    torch.set_num_threads(num_threads)
+    _worker.update(
+        model=load_checkpoint(checkpoint_path),
+        store=IntradayStore(store_root),
+        interval=interval,
+        calendar=calendar,
+        pipeline=pipeline,
+        settings=settings
+    )
+
+def score_symbols(symbols: List[str]) -> Dict[str, np.ndarray]:
+    """
+    Score the latest windows of some symbols in one model batch.
+
+    Runs in a worker set up by _init_worker. Only the trailing lookback of
+    each symbol's memory-mapped minute bars is read, so the cost per
+    symbol does not grow with its stored history. With symbol_scaling the
+    scalers are refitted on that lookback per symbol and predictions are
+    mapped back to the symbol's own price level.
+
+    Args:
+        symbols (List[str]): Symbols of this task
+
+    Returns:
+        Dict[str, np.ndarray]: Columns symbol, date, horizon and prediction
+            (one row per window and horizon), plus the symbols skipped for
+            too few bars and those outside the checkpoint's feature range
+    """
+    model, store, settings = _worker['model'], _worker['store'], _worker['settings']
+    preprocessor = model.numerical_model.preprocessor
+    sequence_length = preprocessor.sequence_length
+    n_windows = settings['windows_per_symbol']
+    lookback = settings['lookback_days'] * 24 * 60 * 60 * 10**9
+
+    windows, window_symbols, window_dates, skipped, out_of_range_symbols = [], [], [], [], []
+    # Per-window target scaling (MinMax: scaled = price * scale + min)
+    target_scale, target_min = [], []
+    for symbol in symbols:
+        bars = store.load(symbol)
+        if len(bars) == 0:
+            skipped.append(symbol)
+            continue
+        start = np.searchsorted(bars.timestamps, bars.timestamps[-1] - lookback)
+        recent = IntradayBars(bars.timestamps[start:],
+                              {name: values[start:] for name, values in bars.columns.items()})
+
+        resampled = resample_bars(recent, _worker['interval'], _worker['calendar'])
+        if len(resampled) < sequence_length + n_windows - 1:
+            skipped.append(symbol)
+            continue
+        df = add_technical_indicators(resampled.to_frame(), _worker['pipeline']).dropna()
+        if len(df) < sequence_length + n_windows - 1:
+            skipped.append(symbol)
+            continue
+
+        if settings['symbol_scaling']:
+            symbol_preprocessor = copy.deepcopy(preprocessor)
+            features, _ = symbol_preprocessor.prepare_data(df, fit=True)
+            features = features[-(sequence_length + n_windows - 1):]
+            target_scaler = symbol_preprocessor.target_scaler
+        else:
+            features = preprocessor.transform(df.iloc[-(sequence_length + n_windows - 1):])
+            if out_of_range(features, settings['feature_tolerance']) > settings['max_out_of_range']:
+                out_of_range_symbols.append(symbol)
+                continue
+            target_scaler = preprocessor.target_scaler
+        target_scale.extend([target_scaler.scale_[0]] * n_windows)
+        target_min.extend([target_scaler.min_[0]] * n_windows)
+        windows.append(np.lib.stride_tricks.sliding_window_view(
+            features, sequence_length, axis=0).transpose(0, 2, 1))
+        window_symbols.extend([symbol] * n_windows)
+        window_dates.append(df.index[-n_windows:].asi8)
+
+    if not windows:
+        return {'symbol': np.array([], dtype=object), 'date': np.array([], dtype=np.int64),
+                'horizon': np.array([], dtype=np.int16), 'prediction': np.array([], dtype=np.float32),
+                'skipped': skipped, 'out_of_range': out_of_range_symbols}
+
+    X = np.concatenate(windows).astype(np.float32)
+    # The batch runs without news; neutral sentiment as in offline training
+    predictions = model.predict(X, np.zeros((len(X), 1), dtype=np.float32))
+    horizons = predictions.shape[1]
+    # predict maps back with the checkpoint's target scaler; redo it per window
+    checkpoint_scaler = preprocessor.target_scaler
+    scaled = predictions * checkpoint_scaler.scale_[0] + checkpoint_scaler.min_[0]
+    predictions = (scaled - np.array(target_min)[:, None]) / np.array(target_scale)[:, None]
+
+    return {
+        'symbol': np.repeat(np.array(window_symbols, dtype=object), horizons),
+        'date': np.repeat(np.concatenate(window_dates), horizons),
+        'horizon': np.tile(np.arange(1, horizons + 1, dtype=np.int16), len(X)),
+        'prediction': predictions.astype(np.float32).ravel(),
+        'skipped': skipped,
+        'out_of_range': out_of_range_symbols
+    }
+
+def score_universe(checkpoint_path: Union[str, Path], store: IntradayStore,
+                   output_path: Union[str, Path], interval: str = '1d',
+                   calendar: SessionCalendar = None, pipeline: FeaturePipeline = None,
+                   symbols: List[str] = None, settings: Dict = None,
+                   max_workers: int = None) -> Dict:
+    """
+    Score every stored symbol with a checkpoint and stream the results to Parquet.
+
+    Symbols are split into chunks scored by a process pool, one torch
+    thread per worker, so throughput grows with cores. Only the intraday
+    store is read: it fills when bars are fetched with an interval other
+    than '1d', so a store never filled that way scores nothing. At most two chunks
+    per worker are in flight and each finished chunk is written as its own
+    row group, so memory is bounded by the chunk size whatever the
+    universe size.
+
+    Args:
+        checkpoint_path (Union[str, Path]): Checkpoint written by save_checkpoint
+        store (IntradayStore): Local minute-bar cache
+        output_path (Union[str, Path]): Parquet file with columns symbol,
+            date (window's last bar), horizon (steps ahead) and prediction
+        interval (str): Bar size the model was trained on
+        calendar (SessionCalendar): Trading sessions (default: NYSE)
+        pipeline (FeaturePipeline): Indicators the model was trained with
+        symbols (List[str]): Symbols to score (default: every stored symbol)
+        settings (Dict): Overrides of SCORING_DEFAULTS
+        max_workers (int): Worker processes (default: CPU count)
+
+    Returns:
+        Dict: Rows written, symbols scored, skipped (too few bars) and
+            out of range (without symbol_scaling), and seconds taken
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("Batch scoring writes Parquet and requires pyarrow (pip install pyarrow)")
+
+    start = time.perf_counter()
+    settings = {**SCORING_DEFAULTS, **(settings or {})}
+    symbols = symbols or store.symbols()
+    max_workers = max_workers or os.cpu_count() or 1
+    chunks = [symbols[i:i + settings['chunk_size']] for i in range(0, len(symbols), settings['chunk_size'])]
+
+    output_path = Path(output_path)
+    tmp_path = Path(f"{output_path}.tmp")
+    rows, skipped, outside = 0, [], []
+
+    with ProcessPoolExecutor(
+        max_workers=max_workers, initializer=_init_worker,
+        initargs=(str(checkpoint_path), str(store.root), interval, calendar or SessionCalendar(),
+                  pipeline, settings, 1)
+    ) as executor, pq.ParquetWriter(tmp_path, _score_schema()) as writer:
+        pending, queued = set(), iter(chunks)
+        while True:
+            # Bounded submission: results are written as fast as they arrive
+            for chunk in queued:
+                pending.add(executor.submit(score_symbols, chunk))
+                if len(pending) >= 2 * max_workers:
+                    break
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                skipped.extend(result['skipped'])
+                outside.extend(result['out_of_range'])
+                if len(result['prediction']):
+                    writer.write_table(pa.table({
+                        'symbol': pa.array(result['symbol'], pa.string()).dictionary_encode(),
+                        'date': pa.array(result['date'], pa.timestamp('ns', tz='UTC')),
+                        'horizon': result['horizon'],
+                        'prediction': result['prediction']
+                    }, schema=_score_schema()))
+                    rows += len(result['prediction'])
+
+    # Readers only ever see a complete file
+    os.replace(tmp_path, output_path)
+
+    return {
+        'rows': rows,
+        'symbols': len(symbols) - len(skipped) - len(outside),
+        'skipped': skipped,
+        'out_of_range': outside,
+        'seconds': time.perf_counter() - start
+    }
+
+if __name__ == "__main__":
+    # Throughput with 1..N workers on a synthetic universe of stored minute bars
+    import sys
+    import tempfile
+    from models.checkpoint import save_checkpoint
+    from models.hybrid_model import HybridModel
+    from utils.intraday import NS_PER_DAY, NS_PER_MINUTE
+
+    n_symbols = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+    calendar = SessionCalendar()
+    rng = np.random.default_rng(0)
+
+    days = np.arange(np.datetime64('2023-01-01'), np.datetime64('2024-01-01'))
+    days = days[(days.astype(np.int64) + 3) % 7 < 5]
+    local = (days.astype(np.int64)[:, None] * NS_PER_DAY
+             + (calendar.open_minute + np.arange(calendar.session_minutes)) * NS_PER_MINUTE).ravel()
+    timestamps = (pd.DatetimeIndex(local.view('datetime64[ns]')).tz_localize(calendar.timezone)
+                  .tz_convert('UTC').tz_localize(None).asi8)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = IntradayStore(Path(tmp_dir) / 'store')
+        for i in range(n_symbols):
+            # Price levels far apart, as in a real universe
+            level = rng.uniform(5, 500)
+            close = (level * np.exp(np.cumsum(rng.normal(0, 5e-4, len(timestamps))))).astype(np.float32)
+            store.append(f'SYM{i:04d}', IntradayBars(timestamps, {
+                'Open': close, 'High': close * 1.001, 'Low': close * 0.999, 'Close': close,
+                'Volume': np.full(len(close), 1000, dtype=np.float32)
+            }))
+
+        model = HybridModel(input_size=13, hidden_size=64, horizons=5)
+        preprocessor = model.numerical_model.preprocessor
+        preprocessor.feature_scaler.fit(rng.random((100, 13)) * 100)
+        preprocessor.target_scaler.fit(rng.random((100, 1)) * 100)
+        checkpoint_path = Path(tmp_dir) / 'model.pt'
+        save_checkpoint(model, checkpoint_path)
+
+        for workers in sorted({1, os.cpu_count() or 1}):
+            result = score_universe(checkpoint_path, store, Path(tmp_dir) / 'scores.parquet',
+                                    calendar=calendar, max_workers=workers)
+            print(f"{workers} worker(s): {result['symbols']} symbols, {result['rows']} rows "
+                  f"in {result['seconds']:.2f}s ({result['symbols'] / result['seconds']:.0f} symbols/s)")
+
+        print(pd.read_parquet(Path(tmp_dir) / 'scores.parquet').head(10))
+
+        result = score_universe(checkpoint_path, store, Path(tmp_dir) / 'scores.parquet',
+                                calendar=calendar, settings={'symbol_scaling': False})
+        print(f"with the checkpoint's scalers: {len(result['out_of_range'])} of {n_symbols} symbols "
+              f"outside the fitted feature range (skipped)")
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+TRADING_DAYS = 252
+
+class CrashScanner:
+    def __init__(self, crash_threshold: float = 0.20, return_horizons: List[int] = None,
+                 volatility_window: int = 21, regime_quantiles: List[float] = None):
+        """
+        Vectorized O(n) drawdown, crash and volatility-regime scanner.
+
+        Args:
+            crash_threshold (float): Peak-to-trough loss that counts as a crash
+            return_horizons (List[int]): N-day return horizons to compute
+            volatility_window (int): Window of the rolling volatility
+            regime_quantiles (List[float]): Volatility quantiles separating regimes
+        """
+        self.crash_threshold = crash_threshold
+        self.return_horizons = return_horizons or [1, 5, 21]
+        self.volatility_window = volatility_window
+        self.regime_quantiles = regime_quantiles or [0.5, 0.9]
+
+    def drawdown(self, close: np.ndarray) -> np.ndarray:
+        """Loss from the running peak at every bar (0 at new highs)."""
+        close = np.asarray(close, dtype=np.float64)
+        return close / np.maximum.accumulate(close) - 1
+
+    def n_day_returns(self, close: np.ndarray, n: int) -> np.ndarray:
+        """Return over the previous n bars (NaN for the first n bars)."""
+        close = np.asarray(close, dtype=np.float64)
+        returns = np.full(len(close), np.nan)
+        returns[n:] = close[n:] / close[:-n] - 1
+        return returns
+
+    def rolling_volatility(self, close: np.ndarray) -> np.ndarray:
+        """
+        Annualized rolling volatility of log returns from cumulative sums.
+
+        Every window costs O(1), so the whole series is O(n) regardless of
+        the window length.
+        """
+        close = np.asarray(close, dtype=np.float64)
+        w = self.volatility_window
+        log_returns = np.diff(np.log(close), prepend=np.nan)
+        log_returns[0] = 0.0
+
+        s1 = np.concatenate([[0.0], np.cumsum(log_returns)])
+        s2 = np.concatenate([[0.0], np.cumsum(log_returns ** 2)])
+
+        volatility = np.full(len(close), np.nan)
+        if len(close) > w:
+            total = s1[w + 1:] - s1[1:-w]
+            total_sq = s2[w + 1:] - s2[1:-w]
+            variance = (total_sq - total ** 2 / w) / (w - 1)
+            volatility[w:] = np.sqrt(np.maximum(variance, 0) * TRADING_DAYS)
+        return volatility
+
+    def volatility_regimes(self, volatility: np.ndarray) -> np.ndarray:
+        """Regime id per bar: 0 = calm ... len(regime_quantiles) = stressed, -1 = unknown."""
+        valid = ~np.isnan(volatility)
+        regimes = np.full(len(volatility), -1, dtype=np.int8)
+        if valid.any():
+            edges = np.quantile(volatility[valid], self.regime_quantiles)
+            regimes[valid] = np.digitize(volatility[valid], edges)
+        return regimes
+
+    def crash_episodes(self, dates: np.ndarray, close: np.ndarray) -> pd.DataFrame:
+        """
+        Peak-to-trough episodes deeper than the crash threshold.
+
+        Bars between two new highs form one episode; its trough is found for
+        all episodes at once with a segmented minimum (np.minimum.reduceat).
+
+        Args:
+            dates (np.ndarray): Bar dates
+            close (np.ndarray): Closing prices
+
+        Returns:
+            pd.DataFrame: Peak, trough and recovery dates, depth and durations
+        """
+        close = np.asarray(close, dtype=np.float64)
+        peak = np.maximum.accumulate(close)
+        starts = np.flatnonzero(close >= peak)
+
+        troughs = np.minimum.reduceat(close, starts)
+        depth = troughs / close[starts] - 1
+        crashes = np.flatnonzero(depth <= -self.crash_threshold)
+
+        # Index of the trough inside each crash episode
+        ends = np.append(starts[1:], len(close))
+        trough_idx = np.array([s + np.argmin(close[s:e])
+                               for s, e in zip(starts[crashes], ends[crashes])], dtype=np.int64)
+        recovered = ends[crashes] < len(close)
+        recovery_idx = np.where(recovered, ends[crashes], len(close) - 1)
+
+        return pd.DataFrame({
+            'peak_date': dates[starts[crashes]],
+            'trough_date': dates[trough_idx] if len(trough_idx) else dates[:0],
+            'recovery_date': np.where(recovered, dates[recovery_idx], np.datetime64('NaT')),
+            'depth': depth[crashes],
+            'days_to_trough': trough_idx - starts[crashes],
+            'days_to_recover': np.where(recovered, recovery_idx - starts[crashes], -1)
+        })
+
+    def scan(self, dates: np.ndarray, close: np.ndarray) -> Dict:
+        """
+        Run every scanner over a price series.
+
+        Args:
+            dates (np.ndarray): Bar dates
+            close (np.ndarray): Closing prices
+
+        Returns:
+            Dict: 'features' frame (drawdown, returns, volatility, regime) and
+                'episodes' frame of crashes
+        """
+        volatility = self.rolling_volatility(close)
+        features = {'Drawdown': self.drawdown(close)}
+        for n in self.return_horizons:
+            features[f'Return_{n}d'] = self.n_day_returns(close, n)
+        features['Volatility'] = volatility
+        features['Vol_Regime'] = self.volatility_regimes(volatility)
+
+        return {
+            'features': pd.DataFrame(features, index=pd.DatetimeIndex(dates, name='Date')),
+            'episodes': self.crash_episodes(dates, close)
+        }
+
+if __name__ == "__main__":
+    # Example usage on the stored SENSEX history
+    from utils.sensex import load_sensex
+
+    history = load_sensex()
+    result = CrashScanner().scan(history.dates, history['Close'])
+
+    print("Crashes deeper than 20%:")
+    print(result['episodes'].to_string(index=False))
+    print(result['features'].tail())
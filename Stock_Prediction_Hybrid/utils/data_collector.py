@@ -9,18 +9,41 @@ import os
 from dotenv import load_dotenv
 import time
 
+from utils.indicators import FeaturePipeline, add_technical_indicators
+from utils.intraday import PRICE_COLUMNS, IntradayBars, IntradayStore, SessionCalendar, resample_bars
+
 load_dotenv()
 
 class DataCollector:
-    def __init__(self, symbol: str):
+    def __init__(self, symbol: str, feature_pipeline: FeaturePipeline = None, interval: str = '1d',
+                 calendar: SessionCalendar = None, intraday_store: IntradayStore = None):
         """
         Initialize the DataCollector with a stock symbol.
         
         Args:
             symbol (str): Stock symbol (e.g., 'AAPL' for Apple)
+            feature_pipeline (FeaturePipeline): Declared indicators (default set if None)
+            interval (str): Bar size of get_stock_data: '1d', or an intraday size
+                ('5m', '15m', '1h', ...) resampled from minute bars
+            calendar (SessionCalendar): Trading sessions for intraday bars (default: NYSE)
+            intraday_store (IntradayStore): Where fetched minute bars accumulate
         """
         self.symbol = symbol
+        self.feature_pipeline = feature_pipeline
+        self.interval = interval
+        self.calendar = calendar or SessionCalendar()
+        self.intraday_store = intraday_store
         self.news_api_key = os.getenv('NEWS_API_KEY')
+    
+    @classmethod
+    def from_config(cls, symbol: str, config: Dict,
+                    feature_pipeline: FeaturePipeline = None) -> 'DataCollector':
+        """Collector using the config's interval and intraday sections."""
+        store = config.get('intraday', {}).get('store')
+        return cls(symbol, feature_pipeline,
+                   interval=config.get('interval', '1d'),
+                   calendar=SessionCalendar.from_config(config),
+                   intraday_store=IntradayStore(store) if store else None)
         
     def get_stock_data(self, start_date: str, end_date: str = None) -> pd.DataFrame:
         """
@@ -31,16 +54,60 @@ class DataCollector:
             end_date (str): End date in 'YYYY-MM-DD' format (default: today)
             
         Returns:
-            pd.DataFrame: Historical stock data with technical indicators
+            pd.DataFrame: Historical stock data with technical indicators, one
+                row per bar of self.interval (indicator windows count bars)
         """
-        stock = yf.Ticker(self.symbol)
-        df = stock.history(start=start_date, end=end_date)
+        if self.interval == '1d':
+            stock = yf.Ticker(self.symbol)
+            df = stock.history(start=start_date, end=end_date)
+        else:
+            bars = resample_bars(self.get_intraday_bars(start_date, end_date), self.interval, self.calendar)
+            df = bars.to_frame(self.calendar.timezone)
         
         # Add technical indicators
         df = self._add_technical_indicators(df)
         
         return df
     
+    def get_intraday_bars(self, start_date: str, end_date: str = None) -> IntradayBars:
+        """
+        Fetch minute bars from Yahoo Finance.
+        
+        Yahoo serves one-minute bars for the last 30 days only, at most 7
+        days per request. With an intraday_store the fetched bars are
+        appended to it and the stored history is returned, so it grows
+        beyond that limit when fetched regularly.
+        
+        Args:
+            start_date (str): Start date in 'YYYY-MM-DD' format
+            end_date (str): End date in 'YYYY-MM-DD' format (default: now)
+            
+        Returns:
+            IntradayBars: Minute bars between the dates
+        """
+        start = pd.Timestamp(start_date)
+        end = pd.Timestamp(end_date) if end_date else pd.Timestamp.now().normalize() + pd.Timedelta(days=1)
+        
+        stock = yf.Ticker(self.symbol)
+        frames = []
+        # Older minute bars are not served; skip requests that would fail
+        chunk_start = max(start, pd.Timestamp.now().normalize() - pd.Timedelta(days=29))
+        while chunk_start < end:
+            chunk_end = min(chunk_start + pd.Timedelta(days=7), end)
+            frames.append(stock.history(start=chunk_start.strftime('%Y-%m-%d'),
+                                        end=chunk_end.strftime('%Y-%m-%d'), interval='1m'))
+            chunk_start = chunk_end
+        frames = [frame for frame in frames if len(frame)]
+        bars = IntradayBars.from_frame(pd.concat(frames)) if frames else IntradayBars.empty()
+        
+        if self.intraday_store is not None:
+            self.intraday_store.append(self.symbol, bars)
+            bars = self.intraday_store.load(self.symbol)
+        
+        # Keep [start, end) of the (possibly longer) history
+        lo, hi = np.searchsorted(bars.timestamps, [start.value, end.value])
+        return IntradayBars(bars.timestamps[lo:hi], {name: bars[name][lo:hi] for name in PRICE_COLUMNS})
+    
     def _add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Add technical indicators to the stock data.
@@ -51,29 +118,7 @@ class DataCollector:
         Returns:
             pd.DataFrame: DataFrame with additional technical indicators
         """
-        # Moving averages
-        df['MA5'] = df['Close'].rolling(window=5).mean()
-        df['MA20'] = df['Close'].rolling(window=20).mean()
-        
-        # Relative Strength Index (RSI)
-        delta = df['Close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df['RSI'] = 100 - (100 / (1 + rs))
-        
-        # MACD
-        exp1 = df['Close'].ewm(span=12, adjust=False).mean()
-        exp2 = df['Close'].ewm(span=26, adjust=False).mean()
-        df['MACD'] = exp1 - exp2
-        df['Signal_Line'] = df['MACD'].ewm(span=9, adjust=False).mean()
-        
-        # Bollinger Bands
-        df['BB_middle'] = df['Close'].rolling(window=20).mean()
-        df['BB_upper'] = df['BB_middle'] + 2 * df['Close'].rolling(window=20).std()
-        df['BB_lower'] = df['BB_middle'] - 2 * df['Close'].rolling(window=20).std()
-        
-        return df
+        return add_technical_indicators(df, self.feature_pipeline)
     
     def get_news_data(self, days: int = 7) -> List[Dict]:
         """
@@ -0,0 +1,176 @@
+import os
+import numpy as np
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from torch.utils.data import DataLoader, TensorDataset
+from torch.utils.data.distributed import DistributedSampler
+from typing import Callable, Dict, Tuple
+
+from models.numerical_model import PricePredictionModel
+
+def setup_process_group(rank: int, world_size: int,
+                        master_addr: str = "127.0.0.1", master_port: int = 29500):
+    """
+    Join the gloo process group (works on CPU-only machines).
+
+    Args:
+        rank (int): Global rank of this process
+        world_size (int): Total number of processes across all nodes
+        master_addr (str): Address of the rank 0 node
+        master_port (int): Free TCP port on the rank 0 node
+    """
+    os.environ.setdefault("MASTER_ADDR", master_addr)
+    os.environ.setdefault("MASTER_PORT", str(master_port))
+    dist.init_process_group("gloo", rank=rank, world_size=world_size)
+
+def cleanup_process_group():
+    """Leave the process group if one is active."""
+    if dist.is_available() and dist.is_initialized():
+        dist.destroy_process_group()
+
+def make_distributed_loader(dataset: torch.utils.data.Dataset, batch_size: int,
+                            shuffle: bool = True) -> DataLoader:
+    """
+    Create a loader that only yields this rank's shard of the dataset.
+
+    Args:
+        dataset (Dataset): Full dataset, identical on every rank
+        batch_size (int): Per-rank batch size
+        shuffle (bool): Whether to reshuffle the shards every epoch
+
+    Returns:
+        DataLoader: Sharded data loader
+    """
+    sampler = DistributedSampler(dataset, shuffle=shuffle)
+    return DataLoader(dataset, batch_size=batch_size, sampler=sampler)
+
+def _worker_entry(local_rank: int, fn: Callable, nproc: int, nnodes: int,
+                  node_rank: int, master_addr: str, master_port: int, args: Tuple):
+    rank = node_rank * nproc + local_rank
+    world_size = nnodes * nproc
+
+    # Split the node's cores between its workers to avoid oversubscription
+    torch.set_num_threads(max(1, (os.cpu_count() or 1) // nproc))
+
+    setup_process_group(rank, world_size, master_addr, master_port)
+    try:
+        fn(rank, world_size, *args)
+    finally:
+        cleanup_process_group()
+
+def launch_workers(fn: Callable, nproc: int, args: Tuple = (), nnodes: int = 1,
+                   node_rank: int = 0, master_addr: str = "127.0.0.1",
+                   master_port: int = 29500):
+    """
+    Spawn this node's worker processes and run fn(rank, world_size, *args).
+
+    Run the same command on every node with its own node_rank and the
+    address of node 0; with nnodes=1 all workers run on the local machine.
+
+    Args:
+        fn (Callable): Module-level function executed by every worker
+        nproc (int): Number of workers on this node
+        args (Tuple): Extra arguments passed to fn
+        nnodes (int): Number of participating nodes
+        node_rank (int): Index of this node
+        master_addr (str): Address of node 0
+        master_port (int): Free TCP port on node 0
+    """
+    mp.spawn(
+        _worker_entry,
+        args=(fn, nproc, nnodes, node_rank, master_addr, master_port, args),
+        nprocs=nproc,
+        join=True
+    )
+
+def train_worker(rank: int, world_size: int, X: np.ndarray, y: np.ndarray,
+                 model_config: Dict, training_config: Dict, checkpoint_path: str,
+                 validation_size: float = 0.2):
+    """
+    Train a PricePredictionModel on this rank's shard of the sequences.
+
+    Args:
+        rank (int): Global rank of this process
+        world_size (int): Total number of processes
+        X (np.ndarray): Full sequence array (sharded by the sampler)
+        y (np.ndarray): Full target array
+        model_config (Dict): The 'model' section of the config
+        training_config (Dict): The 'training' section of the config
+        checkpoint_path (str): Where rank 0 writes the trained weights
+        validation_size (float): Trailing fraction of sequences held out
+    """
+    # Identical initial weights on every rank (DDP also broadcasts rank 0's)
+    torch.manual_seed(0)
+
+    split = int((1 - validation_size) * len(X))
+    train_data = TensorDataset(torch.FloatTensor(X[:split]), torch.FloatTensor(y[:split]))
+    val_data = TensorDataset(torch.FloatTensor(X[split:]), torch.FloatTensor(y[split:]))
+
+    # Keep the global batch size of a single-process run
+    batch_size = max(1, training_config['batch_size'] // world_size)
+    train_loader = make_distributed_loader(train_data, batch_size)
+    # Unsharded: rank 0 validates on every window, batched as in a single-process run
+    val_loader = DataLoader(val_data, batch_size=training_config['batch_size'])
+
+    model = PricePredictionModel(
+        input_size=model_config['input_size'],
+        hidden_size=model_config['hidden_size'],
+        sequence_length=model_config['sequence_length'],
+        feature_columns=model_config.get('feature_columns'),
+        long_context=model_config.get('long_context', False),
+        attention_window=model_config.get('attention_window'),
+        checkpoint_segment=model_config.get('checkpoint_segment', 0),
+        horizons=model_config.get('horizons', 1)
+    )
+    model.train(train_loader, val_loader,
+                epochs=training_config['epochs'],
+                checkpoint_path=checkpoint_path)
+
+def train_distributed(X: np.ndarray, y: np.ndarray, model_config: Dict,
+                      training_config: Dict, checkpoint_path: str, nproc: int,
+                      validation_size: float = 0.2, **launch_kwargs):
+    """
+    Data-parallel training of the numerical model over nproc local workers.
+
+    Args:
+        X (np.ndarray): Sequence array
+        y (np.ndarray): Target array
+        model_config (Dict): The 'model' section of the config
+        training_config (Dict): The 'training' section of the config
+        checkpoint_path (str): Where rank 0 writes the trained weights
+        nproc (int): Number of workers on this node
+        validation_size (float): Trailing fraction of sequences held out
+        **launch_kwargs: Multi-node settings forwarded to launch_workers
+    """
+    launch_workers(
+        train_worker, nproc,
+        args=(X, y, model_config, training_config, str(checkpoint_path), validation_size),
+        **launch_kwargs
+    )
+
+if __name__ == "__main__":
+    # Speedup check: python -m utils.distributed [max_workers]
+    import sys
+    import tempfile
+    import time
+
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+
+    X = np.random.randn(8192, 10, 13).astype(np.float32)
+    y = np.random.randn(8192, 1).astype(np.float32)
+    model_config = {'input_size': 13, 'hidden_size': 64, 'sequence_length': 10}
+    training_config = {'batch_size': 256, 'epochs': 3}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        baseline = None
+        nproc = 1
+        while nproc <= max_workers:
+            start = time.perf_counter()
+            train_distributed(X, y, model_config, training_config,
+                              os.path.join(tmp_dir, 'numerical_model.pth'), nproc,
+                              master_port=29500 + nproc)
+            elapsed = time.perf_counter() - start
+            baseline = baseline or elapsed
+            print(f"{nproc} worker(s): {elapsed:.2f}s, speedup {baseline / elapsed:.2f}x")
+            nproc *= 2
@@ -0,0 +1,362 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+import torch
+from pathlib import Path
+from torch.utils.data import DataLoader, TensorDataset
+from typing import Dict, List, Union
+
+from models.hybrid_model import HybridModel, empty_article_scores
+from utils.indicators import FeaturePipeline
+
+# Used for keys missing from the config's incremental section
+INCREMENTAL_DEFAULTS = {
+    'epochs': 5,                # Fine-tuning epochs on the replay buffer
+    'learning_rate': 0.0001,    # Fine-tuning learning rate
+    'batch_size': 32,
+    'recent_windows': 60,       # Newest windows always in the buffer (at least all new ones)
+    'history_ratio': 1.0,       # Sampled historical windows per recent window
+    'error_ratio': 2.0,         # Full retrain when the new-window loss exceeds this x baseline
+    'feature_tolerance': 0.1,   # Allowed overshoot of the fitted [0, 1] feature range
+    'max_out_of_range': 0.05,   # Full retrain when more new feature values fall outside it
+    'max_age_days': 90          # Full retrain at least this often
+}
+
+class DatasetStore:
+    def __init__(self, path: Union[str, Path]):
+        """
+        Raw bars and news accumulated across training runs.
+
+        Only price columns are stored; indicators are recomputed over the
+        whole history so appended bars get correctly warmed-up values.
+        Articles are kept with their FinBERT scores, so each one is scored
+        once, on the run that first sees it.
+        state.json records the last full training (its date and validation
+        loss), which the drift check compares against.
+
+        Args:
+            path (Union[str, Path]): Store directory (created if missing)
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        bars_path = self.path / 'bars.pkl'
+        self.bars = pd.read_pickle(bars_path) if bars_path.exists() else None
+
+        news_path = self.path / 'news.json'
+        self.news = []
+        if news_path.exists():
+            with open(news_path, 'r') as f:
+                self.news = json.load(f)
+
+        # score_articles output for self.news (None: never scored, e.g. an older store)
+        scores_path = self.path / 'scores.pkl'
+        self.scores = pd.read_pickle(scores_path) if scores_path.exists() else None
+
+        state_path = self.path / 'state.json'
+        self.state = {}
+        if state_path.exists():
+            with open(state_path, 'r') as f:
+                self.state = json.load(f)
+
+    @property
+    def last_bar(self) -> pd.Timestamp:
+        """Timestamp of the newest stored bar (None when empty)."""
+        return None if self.bars is None or not len(self.bars) else self.bars.index[-1]
+
+    def append(self, bars: pd.DataFrame, news: List[Dict], pipeline: FeaturePipeline = None) -> Dict:
+        """
+        Add bars newer than the stored ones and articles not seen before.
+
+        Args:
+            bars (pd.DataFrame): Price bars (indicator columns are dropped)
+            news (List[Dict]): Articles as returned by DataCollector.get_news_data
+            pipeline (FeaturePipeline): Feature set whose indicator columns to drop
+
+        Returns:
+            Dict: Number of new bars and articles, and the new articles
+                themselves ('articles', still to be scored)
+        """
+        indicator_columns = [spec['name'] for spec in (pipeline or FeaturePipeline()).indicators]
+        bars = bars.drop(columns=indicator_columns, errors='ignore')
+        if self.last_bar is not None:
+            bars = bars[bars.index > self.last_bar]
+        self.bars = bars if self.bars is None else pd.concat([self.bars, bars])
+
+        # Syndicated feeds repeat articles; keep the first copy of each URL or title
+        seen = {article.get('url') or article['title'] for article in self.news}
+        new_news = []
+        for article in news:
+            key = article.get('url') or article['title']
+            if key not in seen:
+                seen.add(key)
+                new_news.append(article)
+        self.news.extend(new_news)
+
+        return {'bars': len(bars), 'news': len(new_news), 'articles': new_news}
+
+    def add_scores(self, scores: pd.DataFrame):
+        """Keep the score_articles frame of newly appended articles."""
+        self.scores = scores if self.scores is None else pd.concat([self.scores, scores], ignore_index=True)
+
+    def stock_data(self, pipeline: FeaturePipeline = None) -> pd.DataFrame:
+        """Stored bars with indicators recomputed over the full history."""
+        return (pipeline or FeaturePipeline()).compute(self.bars.copy())
+
+    def save(self):
+        """Write bars, news and state (each file replaced atomically)."""
+        def replace(name: str, write):
+            tmp_path = self.path / f'{name}.tmp'
+            write(tmp_path)
+            os.replace(tmp_path, self.path / name)
+
+        def dump_json(data):
+            def write(path):
+                with open(path, 'w') as f:
+                    json.dump(data, f, default=str)
+            return write
+
+        replace('bars.pkl', self.bars.to_pickle)
+        replace('news.json', dump_json(self.news))
+        if self.scores is not None:
+            replace('scores.pkl', self.scores.to_pickle)
+        replace('state.json', dump_json(self.state))
+
+    def record_full_train(self, val_loss: float):
+        """Remember the baseline of a completed full training."""
+        self.state.update({
+            'full_train_bar': str(self.last_bar),
+            'full_train_time': pd.Timestamp.now().isoformat(),
+            'baseline_loss': float(val_loss)
+        })
+
+def _scaled_loss(model: HybridModel, X: np.ndarray, sentiment: np.ndarray, y: np.ndarray) -> float:
+    """Fusion-layer MSE in the scaled target space the validation loss is measured in."""
+    scaler = model.numerical_model.preprocessor.target_scaler
+    predictions = model.predict(X, sentiment)
+    scaled = scaler.transform(predictions.reshape(-1, 1)).reshape(predictions.shape)
+    return float(np.mean((scaled - y) ** 2))
+
+def out_of_range(scaled: np.ndarray, tolerance: float) -> float:
+    """Share of scaled feature values outside the fitted [0, 1] range plus a tolerance."""
+    return float(np.nanmean((scaled < -tolerance) | (scaled > 1 + tolerance)))
+
+def check_drift(model: HybridModel, stock_data: pd.DataFrame, new_bars: int, X_new: np.ndarray,
+                sentiment_new: np.ndarray, y_new: np.ndarray, state: Dict, settings: Dict) -> List[str]:
+    """
+    Reasons a full retrain is needed instead of fine-tuning (empty when none).
+
+    Args:
+        model (HybridModel): Restored model
+        stock_data (pd.DataFrame): Full history with indicators
+        new_bars (int): Bars appended since the last run
+        X_new (np.ndarray): Windows labelled by the new bars
+        sentiment_new (np.ndarray): Their sentiment scores
+        y_new (np.ndarray): Their scaled targets
+        state (Dict): DatasetStore state of the last full training
+        settings (Dict): Incremental settings (see INCREMENTAL_DEFAULTS)
+
+    Returns:
+        List[str]: Human-readable reasons
+    """
+    reasons = []
+    if not np.isfinite(state.get('baseline_loss', np.nan)):
+        return ['no valid full training recorded']
+
+    age = pd.Timestamp.now() - pd.Timestamp(state['full_train_time'])
+    if age > pd.Timedelta(days=settings['max_age_days']):
+        reasons.append(f"last full training is {age.days} days old")
+
+    # The scalers were fitted on the old history; prices far outside it need a refit
+    if new_bars:
+        scaled = model.numerical_model.preprocessor.transform(stock_data.tail(new_bars))
+        outside = out_of_range(scaled, settings['feature_tolerance'])
+        if outside > settings['max_out_of_range']:
+            reasons.append(f"{outside:.1%} of new feature values are outside the fitted range")
+
+    if len(X_new):
+        loss = _scaled_loss(model, X_new, sentiment_new, y_new)
+        if loss > settings['error_ratio'] * state['baseline_loss']:
+            reasons.append(f"loss on new windows {loss:.4f} exceeds "
+                           f"{settings['error_ratio']}x baseline {state['baseline_loss']:.4f}")
+
+    return reasons
+
+def replay_indices(n_windows: int, n_new: int, recent_windows: int, history_ratio: float,
+                   seed: int = 0) -> Dict[str, np.ndarray]:
+    """
+    Window indices of the fine-tuning replay buffer.
+
+    The newest max(n_new, recent_windows) windows are always included; the
+    same number times history_ratio is sampled uniformly from the older
+    windows, so fine-tuning adapts to recent bars without forgetting the
+    rest of the history.
+
+    Args:
+        n_windows (int): Labelled windows in the full history
+        n_new (int): Windows labelled by newly appended bars
+        recent_windows (int): Minimum number of newest windows to include
+        history_ratio (float): Historical windows sampled per recent window
+        seed (int): Sampling seed
+
+    Returns:
+        Dict[str, np.ndarray]: 'recent' and 'history' index arrays
+    """
+    split = max(n_windows - max(n_new, recent_windows), 0)
+    recent = np.arange(split, n_windows)
+
+    rng = np.random.default_rng(seed)
+    n_history = min(int(round(len(recent) * history_ratio)), split)
+    history = np.sort(rng.choice(split, n_history, replace=False))
+
+    return {'recent': recent, 'history': history}
+
+def fine_tune(model: HybridModel, X: np.ndarray, sentiment: np.ndarray, y: np.ndarray,
+              buffer: Dict[str, np.ndarray], settings: Dict) -> List[float]:
+    """
+    Continue training a restored model on a replay buffer.
+
+    Both the numerical model and the fusion layer start from their current
+    weights at the fine-tuning learning rate; the recent windows double as
+    the validation set.
+
+    Args:
+        model (HybridModel): Restored model
+        X (np.ndarray): All windows
+        sentiment (np.ndarray): Their sentiment scores
+        y (np.ndarray): Their scaled targets
+        buffer (Dict[str, np.ndarray]): Indices from replay_indices
+        settings (Dict): Incremental settings (see INCREMENTAL_DEFAULTS)
+
+    Returns:
+        List[float]: Fusion validation losses
+    """
+    train_idx = np.concatenate([buffer['history'], buffer['recent']])
+    val_idx = buffer['recent']
+
+    numerical = model.numerical_model
+    for optimizer in (numerical.optimizer, model.optimizer):
+        for group in optimizer.param_groups:
+            group['lr'] = settings['learning_rate']
+
+    def loader(idx, shuffle):
+        dataset = TensorDataset(torch.FloatTensor(X[idx]), torch.FloatTensor(y[idx]))
+        return DataLoader(dataset, batch_size=settings['batch_size'], shuffle=shuffle)
+
+    numerical.train(loader(train_idx, True), loader(val_idx, False), epochs=settings['epochs'])
+    return model.train(
+        (X[train_idx], sentiment[train_idx], y[train_idx]),
+        (X[val_idx], sentiment[val_idx], y[val_idx]),
+        epochs=settings['epochs']
+    )
+
+def incremental_update(model: HybridModel, store: DatasetStore, new_bars: pd.DataFrame,
+                       new_news: List[Dict], pipeline: FeaturePipeline = None,
+                       settings: Dict = None) -> Dict:
+    """
+    Append new data to the store and fine-tune the model unless it drifted.
+
+    The model keeps its fitted scalers; nothing is written when a full
+    retrain is needed, so the caller can fall back to it. Only articles
+    not seen before are scored. Without new bars there are no new windows,
+    so the model is left as it is: rerunning on the same day must not keep
+    fine-tuning on the same recent windows.
+
+    Args:
+        model (HybridModel): Model restored from the last checkpoint
+        store (DatasetStore): Accumulated training data
+        new_bars (pd.DataFrame): Freshly fetched bars (may overlap the store)
+        new_news (List[Dict]): Freshly fetched articles
+        pipeline (FeaturePipeline): Declared feature set
+        settings (Dict): Overrides of INCREMENTAL_DEFAULTS
+
+    Returns:
+        Dict: 'drift' reasons (empty when fine-tuned), counts of new bars,
+            articles and windows, buffer size and the fine-tuning history
+            (empty when there were no new bars)
+    """
+    settings = {**INCREMENTAL_DEFAULTS, **(settings or {})}
+
+    added = store.append(new_bars, new_news, pipeline)
+    result = {'new_bars': added['bars'], 'new_news': added['news'], 'new_windows': 0,
+              'drift': [], 'buffer_size': 0, 'history': []}
+    if not added['bars'] and not added['news']:
+        return result
+
+    # A store without scores yet has all its articles scored once
+    unscored = store.news if store.scores is None else added['articles']
+    store.add_scores(model.sentiment_analyzer.score_articles(unscored) if unscored
+                     else empty_article_scores())
+    if not added['bars']:
+        store.save()
+        return result
+
+    # Indicator warm-up rows are NaN and would poison the loss
+    stock_data = store.stock_data(pipeline).dropna()
+    X, sentiment, y = model.prepare_data(stock_data, store.news, fit=False, articles=store.scores)
+
+    # Windows whose last target is one of the new bars
+    n_new = min(added['bars'], len(X))
+    new = slice(len(X) - n_new, len(X))
+    result['new_windows'] = n_new
+
+    result['drift'] = check_drift(model, stock_data, added['bars'], X[new], sentiment[new],
+                                  y[new], store.state, settings)
+    if result['drift']:
+        return result
+
+    buffer = replay_indices(len(X), n_new, settings['recent_windows'], settings['history_ratio'])
+    result['buffer_size'] = len(buffer['recent']) + len(buffer['history'])
+    result['history'] = fine_tune(model, X, sentiment, y, buffer, settings)
+
+    store.state['last_incremental_bar'] = str(store.last_bar)
+    store.save()
+    return result
+
+if __name__ == "__main__":
+    # Full training vs. a daily warm-start update on synthetic bars
+    import tempfile
+    import time
+
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range('2020-01-01', periods=1100)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+    bars = pd.DataFrame({'Open': close, 'High': close * 1.01, 'Low': close * 0.99,
+                         'Close': close, 'Volume': rng.integers(1e6, 2e6, len(dates)).astype(float)},
+                        index=dates)
+    history, today = bars.iloc[:-1], bars.iloc[-20:]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        store = DatasetStore(tmp_dir)
+        store.append(history, [])
+        stock_data = store.stock_data().dropna()
+
+        model = HybridModel(input_size=13, hidden_size=64, horizons=5)
+        X, sentiment, y = model.prepare_data(stock_data, [])
+        split = int(0.8 * len(X))
+        loader = DataLoader(TensorDataset(torch.FloatTensor(X[:split]), torch.FloatTensor(y[:split])),
+                            batch_size=32, shuffle=True)
+        val_loader = DataLoader(TensorDataset(torch.FloatTensor(X[split:]), torch.FloatTensor(y[split:])),
+                                batch_size=32)
+
+        start = time.perf_counter()
+        model.numerical_model.train(loader, val_loader, epochs=30)
+        val_losses = model.train((X[:split], sentiment[:split], y[:split]),
+                                 (X[split:], sentiment[split:], y[split:]), epochs=30)
+        full_time = time.perf_counter() - start
+        store.record_full_train(val_losses[-1])
+        store.save()
+        print(f"full training (30 epochs, {len(X)} windows): {full_time:.1f}s")
+
+        start = time.perf_counter()
+        result = incremental_update(model, DatasetStore(tmp_dir), today, [])
+        incremental_time = time.perf_counter() - start
+        print(f"incremental update: {incremental_time:.1f}s ({full_time / incremental_time:.0f}x faster), "
+              f"{result['new_bars']} new bar(s), buffer of {result['buffer_size']} windows, "
+              f"drift: {result['drift'] or 'none'}")
+
+        # The same fetch again: nothing new, so no fine-tuning and no write
+        result = incremental_update(model, DatasetStore(tmp_dir), today, [])
+        print(f"rerun with no new bars: {result['new_bars']} new bar(s), "
+              f"{len(result['history'])} fine-tuning epochs")
@@ -0,0 +1,302 @@
+import numpy as np
+import pandas as pd
+from functools import cached_property
+from scipy.signal import lfilter
+from typing import Callable, Dict, List
+
+# Raw price columns every feature set starts from
+BASE_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# The indicator set the models were built around, as declared in config.features
+DEFAULT_INDICATORS = [
+    {'name': 'MA5', 'kind': 'sma', 'window': 5},
+    {'name': 'MA20', 'kind': 'sma', 'window': 20},
+    {'name': 'RSI', 'kind': 'rsi', 'window': 14},
+    {'name': 'MACD', 'kind': 'macd', 'fast': 12, 'slow': 26},
+    {'name': 'Signal_Line', 'kind': 'macd_signal', 'fast': 12, 'slow': 26, 'signal': 9},
+    {'name': 'BB_middle', 'kind': 'sma', 'window': 20},
+    {'name': 'BB_upper', 'kind': 'bollinger_upper', 'window': 20, 'num_std': 2},
+    {'name': 'BB_lower', 'kind': 'bollinger_lower', 'window': 20, 'num_std': 2}
+]
+
+# Indicator columns produced by add_technical_indicators, in model order
+INDICATOR_COLUMNS = [spec['name'] for spec in DEFAULT_INDICATORS]
+
+# Indicator kind -> function(context, **params) returning one array
+INDICATORS: Dict[str, Callable] = {}
+
+# Indicator kind -> function(**params) returning its leading NaN bars
+WARMUPS: Dict[str, Callable] = {}
+
+def register_indicator(kind: str, warmup: Callable = None):
+    """
+    Make an indicator kind available to feature declarations.
+
+    Args:
+        kind (str): Name used as 'kind' in declarations
+        warmup (Callable): function(**params) giving the leading bars the
+            indicator leaves NaN (measured on a synthetic series if omitted)
+    """
+    def decorator(fn: Callable) -> Callable:
+        INDICATORS[kind] = fn
+        if warmup is not None:
+            WARMUPS[kind] = warmup
+        return fn
+    return decorator
+
+def _no_warmup(**params) -> int:
+    return 0
+
+class FeatureContext:
+    def __init__(self, columns):
+        """
+        Price columns plus every intermediate computed from them.
+
+        Intermediates are memoized by key, so indicators that need the same
+        rolling mean, standard deviation or EMA share one computation, and
+        all rolling windows of a column come from the same prefix sums.
+        Every operation runs along the last axis, so a column may be one
+        series or a (symbols x time) block of many.
+
+        Args:
+            columns: Price columns by name (a DataFrame or dict of arrays),
+                converted to contiguous float64 on first use
+        """
+        self._columns = columns
+        self._values = {}
+
+    def get(self, key, compute: Callable = None) -> np.ndarray:
+        """Price column or memoized intermediate (computed on first request)."""
+        if key not in self._values:
+            if compute is None:
+                compute = lambda: np.ascontiguousarray(self._columns[key], dtype=np.float64)
+            self._values[key] = compute()
+        return self._values[key]
+
+    def _prefix_sums(self, column: str):
+        """Prefix sums of a column, its square and its NaN count."""
+        def compute():
+            values = self.get(column)
+            missing = np.isnan(values)
+            # Shift by the first valid value to keep the squared sums well conditioned
+            if values.shape[-1] == 0:
+                # No bars (e.g. a delisted ticker): nothing to shift
+                shift = np.zeros(values.shape[:-1] + (1,))
+            else:
+                first = np.argmax(~missing, axis=-1)[..., np.newaxis]
+                shift = np.nan_to_num(np.take_along_axis(values, first, axis=-1))
+            centered = np.where(missing, 0.0, values - shift)
+
+            def prefix(x):
+                return np.concatenate([np.zeros(x.shape[:-1] + (1,)), np.cumsum(x, axis=-1)], axis=-1)
+
+            return prefix(centered), prefix(centered ** 2), prefix(missing), shift
+        return self.get(('prefix_sums', column), compute)
+
+    def _window_sums(self, column: str, window: int):
+        s1, s2, missing, shift = self._prefix_sums(column)
+        shape = s1.shape[:-1] + (s1.shape[-1] - 1,)
+        total = np.full(shape, np.nan)
+        total_sq = np.full(shape, np.nan)
+        if shape[-1] >= window:
+            # A window with any NaN is NaN, as in pandas rolling
+            complete = (missing[..., window:] - missing[..., :-window]) == 0
+            total[..., window - 1:] = np.where(complete, s1[..., window:] - s1[..., :-window], np.nan)
+            total_sq[..., window - 1:] = np.where(complete, s2[..., window:] - s2[..., :-window], np.nan)
+        return total, total_sq, shift
+
+    def rolling_mean(self, column: str, window: int) -> np.ndarray:
+        """Trailing mean over `window` bars (NaN until the window is full)."""
+        def compute():
+            total, _, shift = self._window_sums(column, window)
+            return total / window + shift
+        return self.get(('rolling_mean', column, window), compute)
+
+    def rolling_std(self, column: str, window: int) -> np.ndarray:
+        """Trailing sample standard deviation over `window` bars."""
+        def compute():
+            total, total_sq, _ = self._window_sums(column, window)
+            variance = (total_sq - total ** 2 / window) / (window - 1)
+            return np.sqrt(np.maximum(variance, 0))
+        return self.get(('rolling_std', column, window), compute)
+
+    def ema(self, column, span: int) -> np.ndarray:
+        """Exponential moving average, as pandas ewm(span=span, adjust=False)."""
+        def compute():
+            values = self.get(column)
+            alpha = 2 / (span + 1)
+            if not values.shape[-1]:
+                return values.copy()
+            if np.isnan(values).any():
+                # Gaps carry the average forward; leave that bookkeeping to pandas
+                rows = pd.DataFrame(values.reshape(-1, values.shape[-1]).T)
+                return rows.ewm(span=span, adjust=False).mean().to_numpy().T.reshape(values.shape)
+            # y[t] = alpha * x[t] + (1 - alpha) * y[t-1], started at y[0] = x[0]
+            result, _ = lfilter([alpha], [1, alpha - 1], values, axis=-1,
+                                zi=(1 - alpha) * values[..., :1])
+            return result
+        return self.get(('ema', column, span), compute)
+
+    def diff(self, column: str) -> np.ndarray:
+        """Bar-to-bar change (NaN on the first bar)."""
+        def compute():
+            return np.diff(self.get(column), axis=-1, prepend=np.nan)
+        return self.get(('diff', column), compute)
+
+@register_indicator('sma', warmup=lambda window, **params: window - 1)
+def _sma(context: FeatureContext, window: int, column: str = 'Close') -> np.ndarray:
+    return context.rolling_mean(column, window)
+
+@register_indicator('ema', warmup=_no_warmup)
+def _ema(context: FeatureContext, span: int, column: str = 'Close') -> np.ndarray:
+    return context.ema(column, span)
+
+@register_indicator('rsi', warmup=lambda window=14, **params: window - 1)
+def _rsi(context: FeatureContext, window: int = 14, column: str = 'Close') -> np.ndarray:
+    delta = context.diff(column)
+    # The first change is NaN, which counts as neither gain nor loss
+    context.get(('gain', column), lambda: np.where(delta > 0, delta, 0.0))
+    context.get(('loss', column), lambda: np.where(delta < 0, -delta, 0.0))
+    gain = context.rolling_mean(('gain', column), window)
+    loss = context.rolling_mean(('loss', column), window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return 100 - 100 / (1 + gain / loss)
+
+@register_indicator('macd', warmup=_no_warmup)
+def _macd(context: FeatureContext, fast: int = 12, slow: int = 26, column: str = 'Close') -> np.ndarray:
+    return context.get(('macd', column, fast, slow),
+                       lambda: context.ema(column, fast) - context.ema(column, slow))
+
+@register_indicator('macd_signal', warmup=_no_warmup)
+def _macd_signal(context: FeatureContext, fast: int = 12, slow: int = 26, signal: int = 9,
+                 column: str = 'Close') -> np.ndarray:
+    _macd(context, fast, slow, column)
+    return context.ema(('macd', column, fast, slow), signal)
+
+@register_indicator('bollinger_upper', warmup=lambda window=20, **params: window - 1)
+def _bollinger_upper(context: FeatureContext, window: int = 20, num_std: float = 2,
+                     column: str = 'Close') -> np.ndarray:
+    return context.rolling_mean(column, window) + num_std * context.rolling_std(column, window)
+
+@register_indicator('bollinger_lower', warmup=lambda window=20, **params: window - 1)
+def _bollinger_lower(context: FeatureContext, window: int = 20, num_std: float = 2,
+                     column: str = 'Close') -> np.ndarray:
+    return context.rolling_mean(column, window) - num_std * context.rolling_std(column, window)
+
+class FeaturePipeline:
+    def __init__(self, indicators: List[Dict] = None, base_columns: List[str] = None):
+        """
+        Declarative per-bar feature set.
+
+        Each indicator is a dict with a unique 'name', a registered 'kind'
+        and that kind's parameters. All indicators are evaluated against one
+        FeatureContext over contiguous float64 arrays, so shared
+        intermediates (the 20-bar mean behind MA20 and the Bollinger bands,
+        the EMAs behind MACD and its signal line) are computed once.
+
+        Args:
+            indicators (List[Dict]): Indicator declarations (default: DEFAULT_INDICATORS)
+            base_columns (List[str]): Raw columns fed to the model (default: OHLCV)
+        """
+        self.indicators = [dict(spec) for spec in (indicators or DEFAULT_INDICATORS)]
+        self.base_columns = list(base_columns or BASE_COLUMNS)
+
+        names = [spec.get('name') for spec in self.indicators]
+        if None in names or len(set(names)) != len(names):
+            raise ValueError("Every indicator needs a unique 'name'")
+        for spec in self.indicators:
+            if spec.get('kind') not in INDICATORS:
+                raise ValueError(f"Unknown indicator kind {spec.get('kind')!r} for {spec['name']}; "
+                                 f"registered kinds: {sorted(INDICATORS)}")
+
+    @classmethod
+    def from_config(cls, config: Dict) -> 'FeaturePipeline':
+        """Build the pipeline from the optional 'features' section of the config."""
+        features = config.get('features') or {}
+        return cls(features.get('indicators'), features.get('base_columns'))
+
+    @property
+    def feature_columns(self) -> List[str]:
+        """Model input columns, in order."""
+        return self.base_columns + [spec['name'] for spec in self.indicators]
+
+    @property
+    def input_size(self) -> int:
+        """Number of model input features."""
+        return len(self.feature_columns)
+
+    @cached_property
+    def warmup(self) -> int:
+        """
+        Leading bars with a NaN indicator, i.e. rows dropped before the first window.
+
+        Taken from each kind's registered warm-up; kinds registered without
+        one are measured once on a synthetic random walk.
+        """
+        return max([self._indicator_warmup(spec) for spec in self.indicators], default=0)
+
+    def _indicator_warmup(self, spec: Dict) -> int:
+        params = {key: value for key, value in spec.items() if key not in ('name', 'kind')}
+        if spec['kind'] in WARMUPS:
+            return int(WARMUPS[spec['kind']](**params))
+
+        rng = np.random.default_rng(0)
+        for length in (256, 1024, 4096, 16384):
+            close = 100 + np.cumsum(rng.choice([-1.0, 1.0], length))
+            close -= min(close.min() - 1, 0)
+            context = FeatureContext({column: close for column in self.base_columns})
+            complete = np.flatnonzero(~np.isnan(INDICATORS[spec['kind']](context, **params)))
+            if len(complete):
+                return int(complete[0])
+        raise ValueError(f"Indicator {spec['name']!r} is NaN on all of {length} synthetic bars; "
+                         f"register kind {spec['kind']!r} with a warmup")
+
+    def evaluate(self, context: FeatureContext) -> Dict[str, np.ndarray]:
+        """
+        Evaluate every declared indicator against one context.
+
+        Args:
+            context (FeatureContext): Price columns to compute from
+
+        Returns:
+            Dict[str, np.ndarray]: Indicator name to values, in declaration order
+        """
+        results = {}
+        for spec in self.indicators:
+            params = {key: value for key, value in spec.items() if key not in ('name', 'kind')}
+            results[spec['name']] = INDICATORS[spec['kind']](context, **params)
+        return results
+
+    def compute(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Add every declared indicator to a price frame.
+
+        Args:
+            df (pd.DataFrame): Stock price dataframe
+
+        Returns:
+            pd.DataFrame: The same frame with one column per indicator
+        """
+        results = self.evaluate(FeatureContext(df))
+
+        # Insert all indicators as one block instead of one column at a time
+        df[list(results)] = np.column_stack(list(results.values())) if len(df) else np.nan
+        return df
+
+DEFAULT_PIPELINE = FeaturePipeline()
+
+def add_technical_indicators(df: pd.DataFrame, pipeline: FeaturePipeline = None) -> pd.DataFrame:
+    """
+    Add technical indicators to the stock data.
+
+    Shared by the live DataCollector and the offline loaders so every data
+    source yields the same feature set.
+
+    Args:
+        df (pd.DataFrame): Stock price dataframe
+        pipeline (FeaturePipeline): Declared feature set (default: DEFAULT_INDICATORS)
+
+    Returns:
+        pd.DataFrame: DataFrame with additional technical indicators
+    """
+    return (pipeline or DEFAULT_PIPELINE).compute(df)
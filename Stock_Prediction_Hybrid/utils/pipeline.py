@@ -0,0 +1,283 @@
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from queue import Empty, Full, Queue
+from typing import Callable, Dict, Iterable, Iterator, List, Union
+
+# Marks the end of a stage's input
+_DONE = object()
+
+class Timeline:
+    def __init__(self):
+        """
+        Thread-safe record of what every pipeline stage was doing and when.
+
+        Each event is a span of one kind: 'busy' (running the stage's
+        function), 'starved' (waiting for input) or 'blocked' (waiting for
+        room in the next, full queue, i.e. backpressure).
+        """
+        self.origin = time.perf_counter()
+        self.events = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def span(self, stage: str, kind: str = 'busy', label: str = ''):
+        """Record the enclosed block as one event of a stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.events.append({
+                    'stage': stage, 'kind': kind, 'label': label,
+                    'thread': threading.current_thread().name,
+                    'start': start - self.origin, 'end': end - self.origin
+                })
+
+    @property
+    def stages(self) -> List[str]:
+        """Stage names in order of first appearance."""
+        return list(dict.fromkeys(event['stage'] for event in self.events))
+
+    def utilization(self) -> Dict[str, Dict[str, float]]:
+        """
+        Share of the wall time each stage spent busy, starved and blocked.
+
+        Shares are per worker thread averaged over the stage's workers, so a
+        stage whose workers were all busy the whole run reports 1.0.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Stage name to share of each kind
+        """
+        wall = max((event['end'] for event in self.events), default=0.0) or 1.0
+        result = {}
+        for stage in self.stages:
+            events = [event for event in self.events if event['stage'] == stage]
+            workers = len({event['thread'] for event in events})
+            result[stage] = {
+                kind: sum(e['end'] - e['start'] for e in events if e['kind'] == kind) / (wall * workers)
+                for kind in ('busy', 'starved', 'blocked')
+            }
+        return result
+
+    def render(self, width: int = 60) -> str:
+        """
+        Text timeline: one row per stage, '#' where a worker was busy.
+
+        Returns:
+            str: The timeline followed by each stage's busy share
+        """
+        wall = max((event['end'] for event in self.events), default=0.0) or 1.0
+        utilization = self.utilization()
+        name_width = max((len(stage) for stage in self.stages), default=5)
+
+        lines = [f"{'':<{name_width}} |{'0s':<{width // 2}}{wall:>{width - width // 2}.2f}s|"]
+        for stage in self.stages:
+            row = [' '] * width
+            for event in self.events:
+                if event['stage'] != stage:
+                    continue
+                marker = '#' if event['kind'] == 'busy' else '.'
+                first = min(int(event['start'] / wall * width), width - 1)
+                last = min(int(event['end'] / wall * width), width - 1)
+                for column in range(first, last + 1):
+                    # Busy wins over waiting when a column holds both
+                    if row[column] != '#':
+                        row[column] = marker
+            lines.append(f"{stage:<{name_width}} |{''.join(row)}| "
+                         f"busy {utilization[stage]['busy']:.0%}, "
+                         f"blocked {utilization[stage]['blocked']:.0%}")
+        return '\n'.join(lines)
+
+    def save_chrome_trace(self, path: Union[str, Path]):
+        """Write the events in Chrome trace format (chrome://tracing or ui.perfetto.dev)."""
+        trace = [{
+            'name': f"{event['stage']} {event['label']}".strip() if event['kind'] == 'busy'
+                    else event['kind'],
+            'cat': event['kind'], 'ph': 'X', 'pid': event['stage'], 'tid': event['thread'],
+            'ts': event['start'] * 1e6, 'dur': (event['end'] - event['start']) * 1e6
+        } for event in self.events]
+        with open(path, 'w') as f:
+            json.dump({'traceEvents': trace}, f)
+
+class Stage:
+    def __init__(self, name: str, fn: Callable[[object], Iterable], workers: int = 1,
+                 label: Callable[[object], str] = str):
+        """
+        One step of a StagedPipeline.
+
+        Args:
+            name (str): Stage name in the timeline
+            fn (Callable[[object], Iterable]): Maps one input item to any number
+                of output items (e.g. a generator yielding chunks)
+            workers (int): Threads running fn concurrently (several for I/O)
+            label (Callable[[object], str]): Short description of an input item
+        """
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.label = label
+
+class StagedPipeline:
+    def __init__(self, stages: List[Stage], queue_size: int = 4, timeline: Timeline = None):
+        """
+        Stages connected by bounded queues, each running on its own threads.
+
+        While one stage waits on the network another can score or build
+        features: I/O, torch and numpy release the GIL. A full queue blocks
+        the stage feeding it, so a fast producer never runs far ahead of a
+        slow consumer and memory stays bounded.
+
+        Args:
+            stages (List[Stage]): Stages in order
+            queue_size (int): Items each queue holds before backpressure
+            timeline (Timeline): Where stage activity is recorded (default: new)
+        """
+        self.stages = stages
+        self.queue_size = queue_size
+        self.timeline = timeline or Timeline()
+
+    def run(self, items: Iterable, consumer: str = 'consumer') -> Iterator:
+        """
+        Feed items through every stage and yield the last stage's outputs.
+
+        The caller consumes outputs as they arrive (e.g. trains on them),
+        overlapping with the stages still producing. An exception in any
+        stage stops the pipeline and is re-raised here.
+
+        Args:
+            items (Iterable): Inputs of the first stage
+            consumer (str): Timeline name of the caller, whose waits for
+                output are recorded as that stage starving
+
+        Yields:
+            Outputs of the last stage, in completion order
+        """
+        queues = [Queue(self.queue_size) for _ in range(len(self.stages) + 1)]
+        stop = threading.Event()
+        errors = []
+
+        def put(queue: Queue, item, stage: str = None):
+            # The input feed is not a stage and stays off the timeline
+            with self.timeline.span(stage, 'blocked') if stage else nullcontext():
+                while not stop.is_set():
+                    try:
+                        queue.put(item, timeout=0.1)
+                        return
+                    except Full:
+                        continue
+
+        def get(queue: Queue, stage: str):
+            with self.timeline.span(stage, 'starved'):
+                while not stop.is_set():
+                    try:
+                        return queue.get(timeout=0.1)
+                    except Empty:
+                        continue
+            return _DONE
+
+        def feed():
+            try:
+                for item in items:
+                    if stop.is_set():
+                        return
+                    put(queues[0], item)
+            except Exception as error:
+                errors.append(error)
+                stop.set()
+            finally:
+                for _ in range(self.stages[0].workers):
+                    put(queues[0], _DONE)
+
+        def work(index: int, stage: Stage, finished: List[int], lock: threading.Lock):
+            inbox, outbox = queues[index], queues[index + 1]
+            try:
+                while True:
+                    item = get(inbox, stage.name)
+                    if item is _DONE:
+                        break
+                    outputs = iter(stage.fn(item))
+                    while True:
+                        # Time producing each output, not the wait to hand it on
+                        with self.timeline.span(stage.name, 'busy', stage.label(item)):
+                            output = next(outputs, _DONE)
+                        if output is _DONE:
+                            break
+                        put(outbox, output, stage.name)
+            except Exception as error:
+                errors.append(error)
+                stop.set()
+            finally:
+                with lock:
+                    finished[0] += 1
+                    last = finished[0] == stage.workers
+                if last:
+                    # The next stage's workers (or the caller) each get an end marker
+                    downstream = self.stages[index + 1].workers if index + 1 < len(self.stages) else 1
+                    for _ in range(downstream):
+                        put(outbox, _DONE, stage.name)
+
+        threads = [threading.Thread(target=feed, name='source', daemon=True)]
+        for index, stage in enumerate(self.stages):
+            finished, lock = [0], threading.Lock()
+            threads.extend(
+                threading.Thread(target=work, args=(index, stage, finished, lock),
+                                 name=f'{stage.name}-{worker}', daemon=True)
+                for worker in range(stage.workers)
+            )
+        for thread in threads:
+            thread.start()
+
+        try:
+            while True:
+                output = get(queues[-1], consumer)
+                if output is _DONE:
+                    break
+                yield output
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+
+        if errors:
+            raise errors[0]
+
+if __name__ == "__main__":
+    # Sequential vs. overlapped: simulated downloads, CPU work and a consumer
+    import numpy as np
+
+    def fetch(symbol):
+        time.sleep(0.2)  # network round trip
+        yield symbol, np.random.randn(400, 400)
+
+    def features(item):
+        symbol, values = item
+        for chunk in np.array_split(values, 4):
+            yield symbol, np.linalg.svd(chunk @ chunk.T)[1]
+
+    symbols = [f"SYM{i}" for i in range(12)]
+
+    start = time.perf_counter()
+    for symbol in symbols:
+        for fetched in fetch(symbol):
+            for _ in features(fetched):
+                time.sleep(0.02)  # training step
+    sequential = time.perf_counter() - start
+
+    timeline = Timeline()
+    pipeline = StagedPipeline([
+        Stage('fetch', fetch, workers=4),
+        Stage('features', features, label=lambda item: item[0])
+    ], queue_size=4, timeline=timeline)
+
+    start = time.perf_counter()
+    for symbol, _ in pipeline.run(symbols, consumer='train'):
+        with timeline.span('train', label=symbol):
+            time.sleep(0.02)
+    overlapped = time.perf_counter() - start
+
+    print(f"sequential {sequential:.2f}s, pipelined {overlapped:.2f}s ({sequential / overlapped:.1f}x)")
+    print(timeline.render())
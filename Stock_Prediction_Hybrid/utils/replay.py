@@ -0,0 +1,278 @@
+import json
+import threading
+import time
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from queue import Queue
+from typing import Dict, List, Union
+
+from models.sentiment_aggregator import SentimentAggregator
+from utils.data_collector import DataCollector
+from utils.indicators import DEFAULT_PIPELINE, FeaturePipeline
+from utils.sensex import load_sensex
+
+def load_bars(path: Union[str, Path]) -> pd.DataFrame:
+    """
+    Load stored daily bars for replay.
+
+    Accepts a plain OHLCV CSV with a date index (as written by
+    DataFrame.to_csv on yfinance history) or the SENSEX two-line header layout.
+    """
+    with open(path, 'r') as f:
+        f.readline()
+        second_line = f.readline()
+
+    if second_line.startswith('Date,'):
+        return load_sensex(path).to_frame().astype(np.float64)
+
+    bars = pd.read_csv(path, index_col=0)
+    bars.index = pd.to_datetime(bars.index, utc=True).tz_convert(None)
+    return bars.sort_index()
+
+def load_news_fixture(path: Union[str, Path]) -> List[Dict]:
+    """Load articles in the get_news_data format from a local JSON file."""
+    with open(path, 'r') as f:
+        return json.load(f)
+
+class ReplayDataCollector(DataCollector):
+    def __init__(self, symbol: str, bars: pd.DataFrame, articles: List[Dict],
+                 lookback: int = None, feature_pipeline: FeaturePipeline = None):
+        """
+        DataCollector that serves stored bars and articles up to a replay clock.
+
+        Args:
+            symbol (str): Stock symbol being replayed
+            bars (pd.DataFrame): Stored OHLCV bars with a DatetimeIndex
+            articles (List[Dict]): Articles in the get_news_data format
+            lookback (int): Bars returned per request (default: every bar up to the
+                clock, so EMA-based indicators match the training features; a
+                short lookback re-seeds them from the first bar it returns)
+            feature_pipeline (FeaturePipeline): Declared indicators (default set if None)
+        """
+        super().__init__(symbol, feature_pipeline)
+        self.bars = bars.sort_index()
+        self.lookback = lookback
+        self.clock = self.bars.index[0]
+
+        self.articles = sorted(articles, key=lambda article: article['date'])
+        self.article_times = (pd.to_datetime([a['date'] for a in self.articles], utc=True)
+                              .tz_convert(None).to_numpy())
+
+    def advance(self, timestamp: pd.Timestamp):
+        """Move the replay clock forward."""
+        self.clock = timestamp
+
+    def get_stock_data(self, start_date: str = None, end_date: str = None) -> pd.DataFrame:
+        """Bars up to the replay clock (the last `lookback` if set), with fresh indicators."""
+        stop = self.bars.index.searchsorted(self.clock, side='right')
+        start = 0 if self.lookback is None else max(0, stop - self.lookback)
+        window = self.bars.iloc[start:stop].copy()
+        return self._add_technical_indicators(window)
+
+    def get_news_data(self, days: int = 7) -> List[Dict]:
+        """Articles published in the `days` before the replay clock."""
+        return self.articles_between(self.clock - pd.Timedelta(days=days), self.clock)
+
+    def articles_between(self, start: pd.Timestamp, end: pd.Timestamp) -> List[Dict]:
+        """Articles with start < publish time <= end."""
+        lo = np.searchsorted(self.article_times, np.datetime64(start), side='right')
+        hi = np.searchsorted(self.article_times, np.datetime64(end), side='right')
+        return self.articles[lo:hi]
+
+class ConstantSentimentAnalyzer:
+    """Sentiment stand-in that skips FinBERT to isolate the rest of the path."""
+
+    def analyze_batch(self, texts: List[str]) -> List[Dict[str, float]]:
+        return [{'positive': 0.0, 'negative': 0.0, 'neutral': 1.0} for _ in texts]
+
+class MarketReplay:
+    def __init__(self, collector: ReplayDataCollector, sentiment_analyzer, model,
+                 speedup: float = 1.0, bar_interval: float = 86400.0,
+                 aggregator: SentimentAggregator = None):
+        """
+        Stream stored bars through the live prediction path at a speed-up.
+
+        Args:
+            collector (ReplayDataCollector): Replay data source
+            sentiment_analyzer: Object with analyze_batch, e.g. SentimentAnalyzer
+                loaded from a local FinBERT directory
+            model (HybridModel): Model with fitted scalers (e.g. from load_checkpoint)
+            speedup (float): Replay speed relative to real time
+            bar_interval (float): Real-time seconds between bars (a day by default)
+            aggregator (SentimentAggregator): Time-decayed sentiment updated with
+                each tick's new articles (default: mean of the last day's articles)
+        """
+        self.collector = collector
+        self.sentiment_analyzer = sentiment_analyzer
+        self.model = model
+        self.speedup = speedup
+        self.bar_interval = bar_interval
+        self.sequence_length = model.numerical_model.preprocessor.sequence_length
+        # A capped request must still hold a full sequence once warm-up rows are dropped
+        required = self.sequence_length + (collector.feature_pipeline or DEFAULT_PIPELINE).warmup
+        if collector.lookback is not None and collector.lookback < required:
+            raise ValueError(
+                f"lookback={collector.lookback} never fills a {self.sequence_length}-bar sequence "
+                f"after indicator warm-up; use at least {required}"
+            )
+        self.aggregator = aggregator
+        self._last_tick = None
+
+    def _sentiment_for(self, timestamp: pd.Timestamp) -> float:
+        """Mean positive-minus-negative score of the last day's articles."""
+        if self.aggregator is not None:
+            return self._aggregated_sentiment_for(timestamp)
+        
+        articles = self.collector.articles_between(timestamp - pd.Timedelta(days=1), timestamp)
+        if not articles:
+            return 0.0
+        texts = [f"{a['title']} {a['description']}" for a in articles]
+        scores = self.sentiment_analyzer.analyze_batch(texts)
+        return float(np.mean([s['positive'] - s['negative'] for s in scores]))
+
+    def _aggregated_sentiment_for(self, timestamp: pd.Timestamp) -> float:
+        """Score only the articles since the previous tick and read the decayed aggregate."""
+        start = self._last_tick if self._last_tick is not None else pd.Timestamp.min
+        self._last_tick = timestamp
+        
+        articles = self.collector.articles_between(start, timestamp)
+        if articles:
+            scores = self.sentiment_analyzer.analyze_batch(
+                [f"{a['title']} {a['description']}" for a in articles]
+            )
+            self.aggregator.update(
+                [a['date'] for a in articles],
+                np.array([s['positive'] - s['negative'] for s in scores]),
+                [a.get('source', 'Unknown') for a in articles]
+            )
+        return float(self.aggregator.aggregate([timestamp])[0])
+    
+    def process_tick(self, timestamp: pd.Timestamp) -> np.ndarray:
+        """Fetch, update indicators, score news and predict for one bar."""
+        self.collector.advance(timestamp)
+        stock_data = self.collector.get_stock_data().dropna()
+        if len(stock_data) < self.sequence_length:
+            return None
+
+        preprocessor = self.model.numerical_model.preprocessor
+        X = preprocessor.transform(stock_data.tail(self.sequence_length))[np.newaxis]
+        sentiment = np.array([[self._sentiment_for(timestamp)]])
+
+        return self.model.predict(X, sentiment)
+
+    def run(self, max_ticks: int = None) -> Dict:
+        """
+        Replay bars on a paced producer thread and measure latency.
+
+        Latency runs from the moment a bar is due to the moment its prediction
+        is ready. Bars before the first full sequence produce no prediction;
+        they are counted as warm-up ticks and left out of the latency and
+        service-time statistics. A bar that finds earlier bars still queued
+        marks a backlog.
+
+        Args:
+            max_ticks (int): Stop after this many bars (default: all)
+
+        Returns:
+            Dict: Latency percentiles of the predicted bars, warm-up and backlog
+                counts and sustainable speed-up
+        """
+        timestamps = self.collector.bars.index[:max_ticks]
+        period = self.bar_interval / self.speedup
+        ticks = Queue()
+
+        def produce():
+            start = time.perf_counter()
+            for i, timestamp in enumerate(timestamps):
+                due = start + i * period
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                ticks.put((timestamp, due))
+            ticks.put(None)
+
+        producer = threading.Thread(target=produce, daemon=True)
+        producer.start()
+
+        latencies, service_times, backlog = [], [], []
+        warmup_ticks = 0
+        while True:
+            item = ticks.get()
+            if item is None:
+                break
+            timestamp, due = item
+            backlog.append(ticks.qsize())
+
+            started = time.perf_counter()
+            prediction = self.process_tick(timestamp)
+            finished = time.perf_counter()
+
+            if prediction is None:
+                warmup_ticks += 1
+                continue
+            service_times.append(finished - started)
+            latencies.append(finished - due)
+
+        producer.join()
+        if not latencies:
+            raise ValueError(f"None of the {warmup_ticks} replayed bars completed a "
+                             f"{self.sequence_length}-bar sequence")
+        latencies = np.array(latencies) * 1000
+        backlog = np.array(backlog)
+        mean_service = float(np.mean(service_times))
+
+        return {
+            'ticks': len(latencies),
+            'warmup_ticks': warmup_ticks,
+            'latency_p50_ms': float(np.percentile(latencies, 50)),
+            'latency_p95_ms': float(np.percentile(latencies, 95)),
+            'latency_p99_ms': float(np.percentile(latencies, 99)),
+            'latency_max_ms': float(latencies.max()),
+            'max_backlog': int(backlog.max()),
+            'backlogged_ticks': int((backlog > 0).sum()),
+            'falling_behind': bool(backlog[-max(1, len(backlog) // 10):].mean() > 1),
+            'max_sustainable_speedup': self.bar_interval / mean_service
+        }
+
+if __name__ == "__main__":
+    import argparse
+    import os
+
+    parser = argparse.ArgumentParser(description='Offline market replay load test')
+    parser.add_argument('--bars', type=str, required=True, help='Stored OHLCV CSV')
+    parser.add_argument('--news', type=str, default=None, help='Local JSON article fixture')
+    parser.add_argument('--checkpoint', type=str, required=True, help='Trained model checkpoint')
+    parser.add_argument('--finbert-path', type=str, default=None,
+                        help='Local FinBERT directory (omit to skip sentiment scoring)')
+    parser.add_argument('--symbol', type=str, default='REPLAY', help='Symbol label')
+    parser.add_argument('--speedup', type=float, nargs='+', default=[1e5, 1e6, 1e7],
+                        help='Speed-up factors to test')
+    parser.add_argument('--bar-interval', type=float, default=86400.0,
+                        help='Real-time seconds between stored bars')
+    parser.add_argument('--ticks', type=int, default=None, help='Bars to replay per run')
+    args = parser.parse_args()
+
+    # Never reach out to the Hugging Face hub during a replay
+    os.environ['HF_HUB_OFFLINE'] = '1'
+
+    from models.checkpoint import load_checkpoint
+
+    model = load_checkpoint(args.checkpoint)
+    if args.finbert_path:
+        from models.sentiment_model import SentimentAnalyzer
+        analyzer = SentimentAnalyzer(args.finbert_path)
+    else:
+        analyzer = ConstantSentimentAnalyzer()
+
+    bars = load_bars(args.bars)
+    articles = load_news_fixture(args.news) if args.news else []
+
+    for speedup in args.speedup:
+        collector = ReplayDataCollector(args.symbol, bars, articles)
+        stats = MarketReplay(collector, analyzer, model, speedup=speedup,
+                             bar_interval=args.bar_interval).run(args.ticks)
+        print(f"speed-up {speedup:g}x: " + ", ".join(
+            f"{name}={value:.2f}" if isinstance(value, float) else f"{name}={value}"
+            for name, value in stats.items()
+        ))
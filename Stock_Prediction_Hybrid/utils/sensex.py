@@ -0,0 +1,149 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from typing import Dict, List, Union
+
+from utils.indicators import FeaturePipeline, add_technical_indicators
+
+DEFAULT_SENSEX_PATH = Path(__file__).resolve().parents[2] / 'Stock Market Crash Analysis' / 'sensex.csv'
+
+class PriceHistory:
+    def __init__(self, dates: np.ndarray, columns: List[str], values: np.ndarray):
+        """
+        Date-indexed daily price history stored column by column.
+
+        Args:
+            dates (np.ndarray): Trading dates as datetime64[D], ascending
+            columns (List[str]): Column names, e.g. Close, High, Low, Open, Volume
+            values (np.ndarray): float32 array of shape (len(columns), len(dates))
+        """
+        self.dates = dates
+        self.columns = list(columns)
+        self.values = values
+        self._index = {name: i for i, name in enumerate(self.columns)}
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        """Contiguous float32 view of one column."""
+        return self.values[self._index[column]]
+
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame with a DatetimeIndex, as returned by yfinance."""
+        return pd.DataFrame(
+            {name: self[name] for name in self.columns},
+            index=pd.DatetimeIndex(self.dates.astype('datetime64[ns]'), name='Date')
+        )
+
+def _parse_sensex_csv(path: Path) -> PriceHistory:
+    """Parse the two-line multi-header layout (Price,... / Date,,,) directly."""
+    with open(path, 'r') as f:
+        header = f.readline().strip().split(',')
+    columns = header[1:]
+
+    raw = pd.read_csv(
+        path,
+        skiprows=2,
+        header=None,
+        names=['Date'] + columns,
+        dtype={name: np.float32 for name in columns},
+        engine='c'
+    )
+
+    dates = raw['Date'].to_numpy(dtype='datetime64[D]')
+    values = np.ascontiguousarray(raw[columns].to_numpy(dtype=np.float32).T)
+
+    # Drop rows without a close and keep dates ascending
+    valid = ~np.isnan(values[columns.index('Close')])
+    order = np.argsort(dates[valid], kind='stable')
+
+    return PriceHistory(dates[valid][order], columns, values[:, valid][:, order])
+
+def load_sensex(path: Union[str, Path] = DEFAULT_SENSEX_PATH,
+                cache_path: Union[str, Path] = None) -> PriceHistory:
+    """
+    Load the SENSEX history, using a binary cache after the first parse.
+
+    Args:
+        path (Union[str, Path]): sensex.csv with the two-line header
+        cache_path (Union[str, Path]): .npz cache (default: next to the CSV)
+
+    Returns:
+        PriceHistory: Typed, date-indexed columnar history
+    """
+    path = Path(path)
+    cache_path = Path(cache_path) if cache_path else path.with_suffix('.npz')
+    stat = path.stat()
+
+    if cache_path.exists():
+        cached = np.load(cache_path, allow_pickle=False)
+        # Only trust the cache if it was built from this exact file
+        if (int(cached['source_size']) == stat.st_size
+                and int(cached['source_mtime_ns']) == stat.st_mtime_ns):
+            return PriceHistory(cached['dates'], cached['columns'].tolist(), cached['values'])
+
+    history = _parse_sensex_csv(path)
+    np.savez(
+        cache_path,
+        dates=history.dates,
+        columns=np.array(history.columns),
+        values=history.values,
+        source_size=stat.st_size,
+        source_mtime_ns=stat.st_mtime_ns
+    )
+
+    return history
+
+class SensexDataCollector:
+    def __init__(self, path: Union[str, Path] = DEFAULT_SENSEX_PATH,
+                 feature_pipeline: FeaturePipeline = None):
+        """
+        Offline stand-in for DataCollector backed by the stored SENSEX history.
+
+        Args:
+            path (Union[str, Path]): sensex.csv with the two-line header
+            feature_pipeline (FeaturePipeline): Declared indicators (default set if None)
+        """
+        self.symbol = '^BSESN'
+        self.path = path
+        self.feature_pipeline = feature_pipeline
+
+    def get_stock_data(self, start_date: str, end_date: str = None) -> pd.DataFrame:
+        """
+        Price history with the same technical indicators as DataCollector.
+
+        Args:
+            start_date (str): Start date in 'YYYY-MM-DD' format
+            end_date (str): End date in 'YYYY-MM-DD' format (default: last row)
+
+        Returns:
+            pd.DataFrame: Historical data with technical indicators
+        """
+        history = load_sensex(self.path)
+
+        start = np.searchsorted(history.dates, np.datetime64(start_date, 'D'))
+        stop = (len(history) if end_date is None
+                else np.searchsorted(history.dates, np.datetime64(end_date, 'D')))
+
+        window = PriceHistory(history.dates[start:stop], history.columns,
+                              history.values[:, start:stop])
+        df = window.to_frame().astype(np.float64)
+
+        return add_technical_indicators(df, self.feature_pipeline)
+
+    def get_news_data(self, days: int = 7) -> List[Dict]:
+        """No news is stored offline; sentiment falls back to neutral."""
+        return []
+
+if __name__ == "__main__":
+    # Example usage
+    import time
+
+    start = time.perf_counter()
+    history = load_sensex()
+    print(f"Loaded {len(history)} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+    print(f"{history.dates[0]} -> {history.dates[-1]}, close {history['Close'][-1]:.2f}")
+
+    stock_data = SensexDataCollector().get_stock_data('2020-01-01')
+    print(stock_data.tail())
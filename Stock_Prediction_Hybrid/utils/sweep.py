@@ -0,0 +1,297 @@
+import os
+import time
+import numpy as np
+import pandas as pd
+import torch
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import Manager
+from pathlib import Path
+from torch.utils.data import DataLoader, TensorDataset
+from typing import Dict, List
+
+from models.numerical_model import PricePredictionModel, TimeSeriesPreprocessor
+
+# Used when the config has no sweep.search_space section
+DEFAULT_SEARCH_SPACE = {
+    'hidden_size': {'values': [32, 64, 128, 256]},
+    'sequence_length': {'values': [10, 20, 30, 60]},
+    'learning_rate': {'low': 1e-4, 'high': 1e-2, 'log': True},
+    'batch_size': {'values': [32, 64, 128]}
+}
+
+def sample_trials(search_space: Dict, n_trials: int, seed: int = 0) -> List[Dict]:
+    """
+    Draw random hyperparameter combinations from a search space.
+
+    Each parameter is either {'values': [...]} for a categorical choice or
+    {'low': a, 'high': b, 'log': bool} for a continuous range.
+
+    Args:
+        search_space (Dict): Parameter name to distribution
+        n_trials (int): Number of combinations to draw
+        seed (int): Random seed
+
+    Returns:
+        List[Dict]: One parameter dict per trial
+    """
+    rng = np.random.default_rng(seed)
+    trials = []
+
+    for _ in range(n_trials):
+        params = {}
+        for name, spec in search_space.items():
+            if 'values' in spec:
+                params[name] = spec['values'][rng.integers(len(spec['values']))]
+            elif spec.get('log', False):
+                params[name] = float(np.exp(rng.uniform(np.log(spec['low']), np.log(spec['high']))))
+            else:
+                params[name] = float(rng.uniform(spec['low'], spec['high']))
+            # Keep plain Python types for the leaderboard and YAML output
+            if isinstance(params[name], np.generic):
+                params[name] = params[name].item()
+        trials.append(params)
+
+    return trials
+
+def build_feature_cache(stock_data: pd.DataFrame, sequence_lengths: List[int],
+                        cache_dir: Path, feature_columns: List[str] = None,
+                        horizons: int = 1) -> Dict[int, Dict[str, str]]:
+    """
+    Scale the features once and write one sequence array per sequence length.
+
+    Trials that share a sequence_length memory-map the same files instead
+    of rebuilding their windows.
+
+    Args:
+        stock_data (pd.DataFrame): Historical stock data with indicators
+        sequence_lengths (List[int]): Distinct sequence lengths in the sweep
+        cache_dir (Path): Directory for the cached arrays
+        feature_columns (List[str]): Columns used as model input
+        horizons (int): Future steps in each target row, as in the trained model
+
+    Returns:
+        Dict[int, Dict[str, str]]: Paths of the X and y arrays per length
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    preprocessor = TimeSeriesPreprocessor(feature_columns=feature_columns, horizons=horizons)
+    features, targets = preprocessor.prepare_data(stock_data.dropna())
+
+    paths = {}
+    for sequence_length in sorted(set(sequence_lengths)):
+        preprocessor.sequence_length = sequence_length
+        X, y = preprocessor.create_sequences(features, targets)
+
+        x_path = cache_dir / f'seq{sequence_length}_X.npy'
+        y_path = cache_dir / f'seq{sequence_length}_y.npy'
+        np.save(x_path, X.astype(np.float32))
+        np.save(y_path, y.astype(np.float32))
+        paths[sequence_length] = {'X': str(x_path), 'y': str(y_path)}
+
+    return paths
+
+class MedianPruner:
+    def __init__(self, history, lock, warmup_epochs: int = 5, min_trials: int = 3):
+        """
+        Stop trials whose validation loss is worse than the median of the
+        other trials at the same epoch.
+
+        The history is a Manager dict shared by every worker process.
+
+        Args:
+            history: Shared dict mapping epoch to reported validation losses
+            lock: Shared lock guarding the history
+            warmup_epochs (int): Epochs to run before a trial can be pruned
+            min_trials (int): Reports needed at an epoch before comparing
+        """
+        self.history = history
+        self.lock = lock
+        self.warmup_epochs = warmup_epochs
+        self.min_trials = min_trials
+
+    def should_prune(self, epoch: int, val_loss: float) -> bool:
+        """
+        Record an intermediate validation loss and decide whether to stop.
+
+        Args:
+            epoch (int): Zero-based epoch index
+            val_loss (float): Validation loss after that epoch
+
+        Returns:
+            bool: True if the trial should be stopped
+        """
+        with self.lock:
+            others = list(self.history.get(epoch, []))
+            self.history[epoch] = others + [val_loss]
+
+        if epoch + 1 < self.warmup_epochs or len(others) < self.min_trials:
+            return False
+        return val_loss > float(np.median(others))
+
+def _init_worker(num_threads: int):
+    torch.set_num_threads(num_threads)
+
+def run_trial(trial_id: int, params: Dict, cache_paths: Dict[str, str],
+              input_size: int, epochs: int, validation_size: float,
+              pruner: MedianPruner, model_options: Dict = None) -> Dict:
+    """
+    Train one PricePredictionModel and report its result.
+
+    Args:
+        trial_id (int): Index of the trial
+        params (Dict): Hyperparameters for this trial
+        cache_paths (Dict[str, str]): Cached X and y arrays for its sequence length
+        input_size (int): Number of numerical features
+        epochs (int): Maximum number of epochs
+        validation_size (float): Trailing fraction of windows held out
+        pruner (MedianPruner): Shared early-stopping rule
+        model_options (Dict): Fixed PricePredictionModel settings from the config
+            (horizons and the long-context mode), so trials tune the trained model
+
+    Returns:
+        Dict: Parameters, best validation loss, epochs run and pruning state
+    """
+    start = time.perf_counter()
+    torch.manual_seed(trial_id)
+
+    X = np.load(cache_paths['X'], mmap_mode='r')
+    y = np.load(cache_paths['y'], mmap_mode='r')
+    split = int((1 - validation_size) * len(X))
+
+    train_loader = DataLoader(
+        TensorDataset(torch.from_numpy(np.array(X[:split])), torch.from_numpy(np.array(y[:split]))),
+        batch_size=params['batch_size'], shuffle=True
+    )
+    val_loader = DataLoader(
+        TensorDataset(torch.from_numpy(np.array(X[split:])), torch.from_numpy(np.array(y[split:]))),
+        batch_size=params['batch_size']
+    )
+
+    model = PricePredictionModel(
+        input_size=input_size,
+        hidden_size=params['hidden_size'],
+        sequence_length=params['sequence_length'],
+        learning_rate=params['learning_rate'],
+        **(model_options or {})
+    )
+
+    pruned = []
+
+    def report(epoch: int, val_loss: float) -> bool:
+        if pruner.should_prune(epoch, val_loss):
+            pruned.append(epoch)
+            return True
+        return False
+
+    history = model.train(train_loader, val_loader, epochs=epochs, epoch_callback=report)
+
+    return {
+        'trial': trial_id,
+        **params,
+        'best_val_loss': float(np.min(history)),
+        'final_val_loss': float(history[-1]),
+        'epochs_run': len(history),
+        'pruned': bool(pruned),
+        'seconds': time.perf_counter() - start
+    }
+
+def run_sweep(stock_data: pd.DataFrame, config: Dict, output_dir: Path,
+              n_trials: int = 20, max_workers: int = None, seed: int = 0) -> pd.DataFrame:
+    """
+    Run a pruned random search in a process pool and write a leaderboard.
+
+    Args:
+        stock_data (pd.DataFrame): Historical stock data with indicators
+        config (Dict): Training configuration (uses the optional 'sweep' section)
+        output_dir (Path): Directory for the feature cache and leaderboard
+        n_trials (int): Number of trials to run
+        max_workers (int): Number of worker processes (default: CPU count)
+        seed (int): Random seed for sampling trials
+
+    Returns:
+        pd.DataFrame: Leaderboard sorted by best validation loss
+    """
+    sweep_config = config.get('sweep', {})
+    search_space = sweep_config.get('search_space', DEFAULT_SEARCH_SPACE)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    trials = sample_trials(search_space, n_trials, seed)
+    # Parameters missing from the search space fall back to the base config
+    for params in trials:
+        params.setdefault('hidden_size', config['model']['hidden_size'])
+        params.setdefault('sequence_length', config['model']['sequence_length'])
+        params.setdefault('learning_rate', config['training']['learning_rate'])
+        params.setdefault('batch_size', config['training']['batch_size'])
+
+    model_options = {
+        'horizons': config['model'].get('horizons', 1),
+        'long_context': config['model'].get('long_context', False),
+        'attention_window': config['model'].get('attention_window'),
+        'checkpoint_segment': config['model'].get('checkpoint_segment', 0)
+    }
+
+    cache_paths = build_feature_cache(
+        stock_data,
+        [params['sequence_length'] for params in trials],
+        output_dir / 'sweep_cache',
+        config['model'].get('feature_columns'),
+        model_options['horizons']
+    )
+
+    results = []
+    with Manager() as manager:
+        pruner = MedianPruner(
+            manager.dict(), manager.Lock(),
+            warmup_epochs=sweep_config.get('warmup_epochs', 5),
+            min_trials=sweep_config.get('min_trials', 3)
+        )
+        threads_per_worker = max(1, (os.cpu_count() or 1) // max_workers)
+
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(threads_per_worker,)) as executor:
+            futures = [
+                executor.submit(
+                    run_trial, trial_id, params,
+                    cache_paths[params['sequence_length']],
+                    config['model']['input_size'],
+                    config['training']['epochs'],
+                    config['preprocessing']['validation_size'],
+                    pruner,
+                    model_options
+                )
+                for trial_id, params in enumerate(trials)
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                status = 'pruned' if result['pruned'] else 'done'
+                print(f"Trial {result['trial']} {status} after {result['epochs_run']} epochs, "
+                      f"best validation loss {result['best_val_loss']:.4f}")
+                results.append(result)
+
+    leaderboard = pd.DataFrame(results).sort_values('best_val_loss').reset_index(drop=True)
+    leaderboard.to_csv(output_dir / 'leaderboard.csv', index=False)
+
+    return leaderboard
+
+if __name__ == "__main__":
+    # Example usage on a synthetic random walk
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    close = 100 + np.cumsum(rng.normal(size=600))
+    columns = TimeSeriesPreprocessor().feature_columns
+    stock_data = pd.DataFrame(
+        {column: close + rng.normal(scale=0.5, size=len(close)) for column in columns}
+    )
+    stock_data['Close'] = close
+
+    config = {
+        'model': {'input_size': len(columns), 'hidden_size': 64, 'sequence_length': 10, 'horizons': 5},
+        'training': {'batch_size': 32, 'epochs': 8, 'learning_rate': 0.001},
+        'preprocessing': {'validation_size': 0.2},
+        'sweep': {'warmup_epochs': 2, 'min_trials': 2}
+    }
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        leaderboard = run_sweep(stock_data, config, Path(tmp_dir), n_trials=6, max_workers=2)
+        print(leaderboard.head())
@@ -0,0 +1,191 @@
+import hashlib
+import json
+import os
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Union
+
+INDEX_DTYPE = np.dtype([('key', '<u8'), ('offset', '<i8'), ('length', '<i4')])
+
+def article_key(text: str) -> int:
+    """Stable 64-bit hash of an article's text."""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+class TokenStore:
+    def __init__(self, path: Union[str, Path], tokenizer_name: str, vocab_size: int = 30522,
+                 max_length: int = 512):
+        """
+        Pre-tokenized news text as a memory-mapped ragged array.
+
+        Token ids of all articles are concatenated in tokens.bin (uint16 when
+        the vocabulary fits, int32 otherwise); index.npy holds one
+        (key, offset, length) record per article, sorted by key so lookups
+        are a searchsorted. meta.json records the tokenizer the ids belong
+        to, and a store built with another tokenizer or max_length is
+        rejected instead of silently reused.
+
+        Args:
+            path (Union[str, Path]): Store directory (created if missing)
+            tokenizer_name (str): Name or path of the tokenizer
+            vocab_size (int): Tokenizer vocabulary size
+            max_length (int): Truncation length the ids were produced with
+        """
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.meta = {
+            'tokenizer': str(tokenizer_name),
+            'max_length': max_length,
+            'dtype': 'uint16' if vocab_size <= np.iinfo(np.uint16).max + 1 else 'int32'
+        }
+
+        meta_path = self.path / 'meta.json'
+        if meta_path.exists():
+            with open(meta_path, 'r') as f:
+                stored = json.load(f)
+            if stored != self.meta:
+                raise ValueError(f"Token store at {self.path} was built with {stored}, not {self.meta}")
+        else:
+            with open(meta_path, 'w') as f:
+                json.dump(self.meta, f)
+
+        self.dtype = np.dtype(self.meta['dtype'])
+        index_path = self.path / 'index.npy'
+        self.index = np.load(index_path) if index_path.exists() else np.empty(0, dtype=INDEX_DTYPE)
+        self._tokens = None
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    @property
+    def tokens(self) -> np.ndarray:
+        """Memory-mapped view of all stored token ids."""
+        if self._tokens is None:
+            tokens_path = self.path / 'tokens.bin'
+            if not tokens_path.exists() or tokens_path.stat().st_size == 0:
+                return np.empty(0, dtype=self.dtype)
+            self._tokens = np.memmap(tokens_path, dtype=self.dtype, mode='r')
+        return self._tokens
+
+    def _positions(self, keys: np.ndarray) -> np.ndarray:
+        """Index rows of the given keys (-1 where missing)."""
+        if not len(self.index):
+            return np.full(len(keys), -1, dtype=np.int64)
+        positions = np.minimum(np.searchsorted(self.index['key'], keys), len(self.index) - 1)
+        return np.where(self.index['key'][positions] == keys, positions, -1)
+
+    def missing(self, texts: List[str]) -> List[str]:
+        """Texts that are not in the store yet (first occurrence of each)."""
+        keys = np.array([article_key(text) for text in texts], dtype=np.uint64)
+        _, first = np.unique(keys, return_index=True)
+        first = np.sort(first)
+        absent = first[self._positions(keys[first]) < 0]
+        return [texts[i] for i in absent]
+
+    def add(self, texts: List[str], tokenizer) -> int:
+        """
+        Tokenize and append the texts that are not stored yet.
+
+        Args:
+            texts (List[str]): Article texts
+            tokenizer: Hugging Face tokenizer matching the store's metadata
+
+        Returns:
+            int: Number of newly stored articles
+        """
+        new_texts = self.missing(texts)
+        if not new_texts:
+            return 0
+
+        encoded = tokenizer(new_texts, truncation=True, max_length=self.meta['max_length'])['input_ids']
+        lengths = np.array([len(ids) for ids in encoded], dtype=np.int32)
+        flat = np.fromiter((token for ids in encoded for token in ids), dtype=self.dtype,
+                           count=int(lengths.sum()))
+
+        tokens_path = self.path / 'tokens.bin'
+        start = tokens_path.stat().st_size // self.dtype.itemsize if tokens_path.exists() else 0
+        with open(tokens_path, 'ab') as f:
+            f.write(flat.tobytes())
+
+        records = np.empty(len(new_texts), dtype=INDEX_DTYPE)
+        records['key'] = [article_key(text) for text in new_texts]
+        records['offset'] = start + np.concatenate([[0], np.cumsum(lengths)[:-1]])
+        records['length'] = lengths
+
+        self.index = np.sort(np.concatenate([self.index, records]), order='key')
+        # Write the index atomically so readers never see a partial file
+        tmp_path = self.path / 'index.tmp.npy'
+        np.save(tmp_path, self.index)
+        os.replace(tmp_path, self.path / 'index.npy')
+        self._tokens = None
+
+        return len(new_texts)
+
+    def get(self, text: str) -> np.ndarray:
+        """Stored token ids of one article."""
+        position = self._positions(np.array([article_key(text)], dtype=np.uint64))[0]
+        if position < 0:
+            raise KeyError(f"Article not in token store: {text[:50]!r}")
+        record = self.index[position]
+        return self.tokens[record['offset']:record['offset'] + record['length']]
+
+    def collate(self, texts: List[str], pad_token_id: int = 0) -> Dict[str, np.ndarray]:
+        """
+        Padded model inputs for stored articles, as tokenizer(..., padding=True) returns them.
+
+        Args:
+            texts (List[str]): Article texts (all must be stored)
+            pad_token_id (int): Id used for padding
+
+        Returns:
+            Dict[str, np.ndarray]: int64 input_ids and attention_mask of shape
+                (len(texts), longest article)
+        """
+        positions = self._positions(np.array([article_key(text) for text in texts], dtype=np.uint64))
+        if (positions < 0).any():
+            raise KeyError(f"{int((positions < 0).sum())} articles are not in the token store")
+
+        offsets = self.index['offset'][positions]
+        lengths = self.index['length'][positions].astype(np.int64)
+        width = int(lengths.max()) if len(lengths) else 0
+
+        # Gather every article's ids into its row with one fancy index
+        columns = np.arange(width)
+        attention_mask = columns < lengths[:, np.newaxis]
+        source = np.where(attention_mask, offsets[:, np.newaxis] + columns, 0)
+        input_ids = np.where(attention_mask, self.tokens[source], pad_token_id)
+
+        return {
+            'input_ids': input_ids.astype(np.int64),
+            'attention_mask': attention_mask.astype(np.int64)
+        }
+
+if __name__ == "__main__":
+    # Pre-tokenize a local article fixture for scoring and fine-tuning jobs
+    import argparse
+    import time
+
+    from transformers import AutoTokenizer
+
+    parser = argparse.ArgumentParser(description='Pre-tokenize news articles')
+    parser.add_argument('--news', type=str, required=True, help='JSON article fixture')
+    parser.add_argument('--store', type=str, default='token_store', help='Store directory')
+    parser.add_argument('--tokenizer', type=str, default='ProsusAI/finbert', help='Tokenizer name or path')
+    parser.add_argument('--max-length', type=int, default=512, help='Truncation length')
+    args = parser.parse_args()
+
+    with open(args.news, 'r') as f:
+        articles = json.load(f)
+    texts = [f"{a['title']} {a['description']}" for a in articles]
+
+    tokenizer = AutoTokenizer.from_pretrained(args.tokenizer)
+    store = TokenStore(args.store, args.tokenizer, len(tokenizer), args.max_length)
+
+    start = time.perf_counter()
+    added = store.add(texts, tokenizer)
+    print(f"Tokenized {added} new articles in {time.perf_counter() - start:.2f}s "
+          f"({len(store)} stored)")
+
+    start = time.perf_counter()
+    batch = store.collate(texts[:256], tokenizer.pad_token_id)
+    print(f"Collated {len(batch['input_ids'])} articles from the store in "
+          f"{(time.perf_counter() - start) * 1000:.2f} ms")
@@ -0,0 +1,459 @@
+# Reusable analysis of NCRB violent crime tables
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
+from typing import Dict, Iterator, List
+
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+from crime_analysis.correlation import stream_correlation, top_correlated_pairs
+from crime_analysis.loader import (DROPPED_COLUMNS, IDENTIFIER_COLUMNS, IDENTIFIERS, STATE_COLUMN,
+                                   TOTAL_COLUMN, TOTAL_ROWS, load_ncrb_table, read_ncrb_chunks)
+
+# Columns added by the analysis itself, never treated as crime types
+DERIVED_COLUMNS = ['Population', 'Crime Rate', 'Economic Index', 'Cultural Index',
+                   'Women Safety Index']
+
+SPECIFIC_CRIMES = ['Rape (Sec.376 IPC)', 'Dowry Deaths (Sec.304B IPC)', 'Murder (Sec.302 IPC)']
+GENDER_CRIMES = ['Rape (Sec.376 IPC)', 'Dowry Deaths (Sec.304B IPC)', 'Infanticide (Sec.315 IPC)']
+ATTEMPT_PAIRS = [('Attempt to Commit Murder (Sec.307 IPC)', 'Murder (Sec.302 IPC)'),
+                 ('Attempt to Commit Rape (Sec.376 r/w 511 IPC)', 'Rape (Sec.376 IPC)')]
+
+def iter_ncrb_chunks(paths: List[str], chunksize: int = 100000) -> Iterator[pd.DataFrame]:
+    """Cleaned, typed rows of many NCRB tables (e.g. year or district files), chunk by chunk."""
+    for path in paths:
+        yield from read_ncrb_chunks(path, chunksize)
+
+def ncrb_crime_columns(paths: List[str]) -> List[str]:
+    """Crime type columns found in any of the tables, in order of first appearance."""
+    columns = {}
+    for path in paths:
+        header = pd.read_csv(path, nrows=0).columns
+        columns.update(dict.fromkeys(header))
+    excluded = {*IDENTIFIER_COLUMNS, *DROPPED_COLUMNS, TOTAL_COLUMN, *DERIVED_COLUMNS}
+    return [column for column in columns if column not in excluded]
+
+def add_crime_rate(df: pd.DataFrame, population: pd.Series = None, seed: int = 0) -> pd.DataFrame:
+    """
+    Add population and crime rate per 100,000 people.
+
+    Without real population data a hypothetical, seeded population is used
+    so repeated runs over the same table give the same numbers.
+    """
+    df = df.copy()
+    if population is None:
+        rng = np.random.default_rng(seed)
+        population = rng.integers(1000000, 100000000, size=len(df))
+    df['Population'] = population
+    df['Crime Rate'] = df[TOTAL_COLUMN] / df['Population'] * 100000
+    return df
+
+def aggregate_states(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per state of a table that may span years and districts.
+
+    Counts and population are summed, the crime rate is recomputed from
+    the sums and the hypothetical indices are averaged. A state-wise table
+    of one year keeps its values and row order.
+
+    Args:
+        df (pd.DataFrame): Cleaned table with a 'State' column
+
+    Returns:
+        pd.DataFrame: Aggregates indexed by state
+    """
+    groups = df.groupby(STATE_COLUMN, observed=True, sort=False)
+    summed = [column for column in df.columns if column not in (*IDENTIFIERS, *DERIVED_COLUMNS)]
+    if 'Population' in df.columns:
+        summed.append('Population')
+    states = groups[summed].sum()
+
+    averaged = [column for column in DERIVED_COLUMNS
+                if column in df.columns and column not in ('Population', 'Crime Rate')]
+    if averaged:
+        states[averaged] = groups[averaged].mean()
+    if 'Crime Rate' in df.columns:
+        states['Crime Rate'] = (states[TOTAL_COLUMN] / states['Population'] * 100000
+                                if 'Population' in states.columns else groups['Crime Rate'].mean())
+    return states
+
+class CrimeTableAnalysis:
+    def __init__(self, df: pd.DataFrame, top_k: int = 5):
+        """
+        Aggregates of one crime table, each computed once on first use.
+
+        Args:
+            df (pd.DataFrame): Cleaned table with a 'State' column (several
+                rows per state for multi-year or district tables)
+            top_k (int): Number of leading states kept per crime type
+        """
+        self.df = df
+        self.top_k = top_k
+
+    @cached_property
+    def crime_types(self) -> List[str]:
+        """Individual crime columns (no identifier, total or derived columns)."""
+        excluded = {*IDENTIFIERS, TOTAL_COLUMN, *DERIVED_COLUMNS}
+        return [column for column in self.df.columns if column not in excluded]
+
+    @cached_property
+    def states(self) -> pd.DataFrame:
+        """The table aggregated to one row per state (over years and districts)."""
+        return aggregate_states(self.df)
+
+    @cached_property
+    def matrix(self) -> pd.DataFrame:
+        """State × crime type counts."""
+        return self.states[self.crime_types]
+
+    @cached_property
+    def crime_rates(self) -> pd.Series:
+        """Crime rate per state, highest first."""
+        return self.states['Crime Rate'].sort_values(ascending=False)
+
+    @cached_property
+    def totals(self) -> pd.Series:
+        """Total cases per crime type, most common first."""
+        return self.matrix.sum().sort_values(ascending=False)
+
+    @cached_property
+    def proportions(self) -> pd.Series:
+        """Share of each crime type in all violent crimes, in percent."""
+        return self.totals / self.totals.sum() * 100
+
+    @cached_property
+    def top_crime_by_state(self) -> pd.Series:
+        """Most frequent crime type of every state."""
+        return self.matrix.idxmax(axis=1)
+
+    @cached_property
+    def top_states(self) -> Dict[str, pd.Series]:
+        """
+        Leading states per crime type from one selection over the matrix.
+
+        argpartition selects the top_k rows of every column at once; only
+        those k rows are then ordered.
+        """
+        # Counts are unsigned; negating them for a descending selection needs a signed type
+        values = self.matrix.to_numpy(dtype=np.float64)
+        states = self.matrix.index.to_numpy()
+        k = min(self.top_k, len(values))
+
+        top_rows = np.argpartition(-values, k - 1, axis=0)[:k]
+        top_values = np.take_along_axis(values, top_rows, axis=0)
+        order = np.argsort(-top_values, axis=0, kind='stable')
+        top_rows = np.take_along_axis(top_rows, order, axis=0)
+        top_values = np.take_along_axis(top_values, order, axis=0)
+
+        return {
+            crime: pd.Series(top_values[:, i], index=states[top_rows[:, i]], name=crime)
+            for i, crime in enumerate(self.crime_types)
+        }
+
+    @cached_property
+    def correlation(self) -> pd.DataFrame:
+        """Pairwise Pearson correlation between crime types."""
+        return stream_correlation(lambda: [self.matrix], self.crime_types).correlation()
+
+    @cached_property
+    def rank_correlation(self) -> pd.DataFrame:
+        """Pairwise Spearman (rank) correlation between crime types."""
+        return stream_correlation(lambda: [self.matrix], self.crime_types, 'spearman').correlation()
+
+    @cached_property
+    def top_correlations(self) -> pd.Series:
+        """The ten most correlated distinct crime pairs (partial selection, no full sort)."""
+        return top_correlated_pairs(self.correlation, 10)
+
+    @cached_property
+    def top_rank_correlations(self) -> pd.Series:
+        """The ten distinct crime pairs with the highest rank correlation."""
+        return top_correlated_pairs(self.rank_correlation, 10)
+
+    @cached_property
+    def women_safety_index(self) -> pd.Series:
+        """Rape plus dowry deaths per state, highest first."""
+        # Widen before adding so compact count types cannot overflow
+        index = (self.matrix['Rape (Sec.376 IPC)'].astype(np.int64)
+                 + self.matrix['Dowry Deaths (Sec.304B IPC)'].astype(np.int64))
+        return index.sort_values(ascending=False).rename('Women Safety Index')
+
+    @cached_property
+    def recommendations(self) -> Dict[str, pd.Series]:
+        """Three most frequent crime types for the five highest-rate states."""
+        high_crime_states = self.crime_rates.index[:5]
+        return {state: self.matrix.loc[state].nlargest(3) for state in high_crime_states}
+
+    def summary(self) -> Dict:
+        """All aggregates as plain pandas objects (picklable across processes)."""
+        return {
+            'crime_rates': self.crime_rates,
+            'totals': self.totals,
+            'proportions': self.proportions,
+            'top_crime_by_state': self.top_crime_by_state,
+            'top_states': self.top_states,
+            'top_correlations': self.top_correlations,
+            'top_rank_correlations': self.top_rank_correlations,
+            'women_safety_index': self.women_safety_index,
+            'recommendations': self.recommendations
+        }
+
+def summarize_table(path: str, top_k: int = 5, seed: int = 0) -> Dict:
+    """Load one NCRB table and compute all its aggregates."""
+    df = add_crime_rate(load_ncrb_table(path), seed=seed)
+    return CrimeTableAnalysis(df, top_k=top_k).summary()
+
+def analyze_tables(paths: List[str], top_k: int = 5, max_workers: int = None) -> Dict[str, Dict]:
+    """
+    Summarize many NCRB tables (e.g. one per year) in parallel.
+
+    Args:
+        paths (List[str]): CSV files to analyse
+        top_k (int): Number of leading states kept per crime type
+        max_workers (int): Worker processes (default: CPU count)
+
+    Returns:
+        Dict[str, Dict]: Summary per input path
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        summaries = executor.map(summarize_table, paths, [top_k] * len(paths))
+        return dict(zip(paths, summaries))
+
+def correlate_tables(paths: List[str], k: int = 10, method: str = 'pearson',
+                     chunksize: int = 100000) -> pd.Series:
+    """
+    Most correlated crime pairs over the rows of many NCRB tables.
+
+    Rows are streamed chunk by chunk into pairwise sufficient statistics,
+    so the tables are never concatenated; memory depends on the number of
+    crime columns, not rows. Columns missing from a table count as missing
+    values for its rows.
+
+    Args:
+        paths (List[str]): CSV files (e.g. one per year or district)
+        k (int): Number of pairs to return
+        method (str): 'pearson' or 'spearman'
+        chunksize (int): Rows read at a time
+
+    Returns:
+        pd.Series: Correlation of the top k pairs, highest first
+    """
+    accumulator = stream_correlation(lambda: iter_ncrb_chunks(paths, chunksize),
+                                     ncrb_crime_columns(paths), method)
+    return accumulator.top_pairs(k)
+
+# 1. Crime Rate by State/Region
+def analyze_crime_rates(analysis: CrimeTableAnalysis):
+    print("1. Crime Rate Analysis")
+    print("\nTop 5 States with Highest Crime Rates:")
+    print(analysis.crime_rates.head())
+
+    print("\nTop 5 States with Lowest Crime Rates:")
+    print(analysis.crime_rates.tail().iloc[::-1])
+
+def plot_crime_rates(analysis: CrimeTableAnalysis) -> plt.Figure:
+    fig = plt.figure(figsize=(12, 6))
+    top_rates = analysis.crime_rates.head(10)
+    sns.barplot(x=top_rates.values, y=top_rates.index)
+    plt.title('Top 10 States by Crime Rate')
+    plt.xlabel('Crime Rate')
+    plt.tight_layout()
+    return fig
+
+# 2. Violent Crime Trend Analysis
+def analyze_violent_crime_trends(analysis: CrimeTableAnalysis):
+    print("\n2. Violent Crime Trend Analysis")
+
+    print("\nMost Common Violent Crimes in India:")
+    print(analysis.totals.head())
+
+    # Analysis of specific crimes across regions
+    for crime in SPECIFIC_CRIMES:
+        print(f"\nTop 5 States with Highest {crime}:")
+        print(analysis.top_states[crime].head())
+
+def plot_violent_crime_trends(analysis: CrimeTableAnalysis) -> plt.Figure:
+    fig = plt.figure(figsize=(12, 6))
+    top_totals = analysis.totals.head(10)
+    sns.barplot(x=top_totals.values, y=top_totals.index)
+    plt.title('Top 10 Most Common Violent Crimes in India')
+    plt.xlabel('Number of Cases')
+    plt.tight_layout()
+    return fig
+
+# 3. Correlation Analysis of Crimes
+def correlation_analysis(analysis: CrimeTableAnalysis):
+    print("\n3. Correlation Analysis of Crimes")
+
+    print("\nHighest Correlations:")
+    print(analysis.top_correlations)
+
+    print("\nHighest Rank (Spearman) Correlations:")
+    print(analysis.top_rank_correlations)
+
+    # Analysis of attempts vs. successful crimes
+    for attempt, actual in ATTEMPT_PAIRS:
+        correlation = analysis.correlation.loc[attempt, actual]
+        print(f"\nCorrelation between {attempt} and {actual}: {correlation:.2f}")
+
+def plot_correlation_heatmap(analysis: CrimeTableAnalysis) -> plt.Figure:
+    fig = plt.figure(figsize=(12, 10))
+    sns.heatmap(analysis.correlation, annot=False, cmap='coolwarm')
+    plt.title('Correlation Heatmap of Violent Crimes')
+    plt.tight_layout()
+    return fig
+
+# 4. Impact of Gender-Related Crimes
+def analyze_gender_related_crimes(analysis: CrimeTableAnalysis):
+    print("\n4. Impact of Gender-Related Crimes")
+
+    for crime in GENDER_CRIMES:
+        print(f"\nTop 5 States with Highest {crime}:")
+        print(analysis.top_states[crime].head())
+
+    # Correlation with overall crime rate
+    rates = analysis.states['Crime Rate']
+    correlations = analysis.matrix[GENDER_CRIMES].corrwith(rates)
+    for crime, correlation in correlations.items():
+        print(f"\nCorrelation between {crime} and overall Crime Rate: {correlation:.2f}")
+
+def plot_gender_related_crimes(analysis: CrimeTableAnalysis) -> plt.Figure:
+    fig = plt.figure(figsize=(12, 6))
+    df_melted = analysis.states.reset_index().melt(id_vars=STATE_COLUMN, value_vars=GENDER_CRIMES,
+                                                   var_name='Crime Type', value_name='Count')
+    sns.barplot(x=STATE_COLUMN, y='Count', hue='Crime Type', data=df_melted)
+    plt.xticks(rotation=90)
+    plt.title('Gender-Related Crimes by State')
+    plt.tight_layout()
+    return fig
+
+# 5. Crime Prevention Prioritization
+def crime_prevention_prioritization(analysis: CrimeTableAnalysis):
+    print("\n5. Crime Prevention Prioritization")
+
+    for crime, top_states in analysis.top_states.items():
+        print(f"\nTop 3 States to Prioritize for {crime}:")
+        print(top_states.head(3))
+
+def plot_crime_distribution(analysis: CrimeTableAnalysis) -> plt.Figure:
+    fig = plt.figure(figsize=(12, 8))
+    df_melted = analysis.states.reset_index().melt(id_vars=STATE_COLUMN,
+                                                   value_vars=analysis.crime_types,
+                                                   var_name='Crime Type', value_name='Count')
+    sns.boxplot(x='Crime Type', y='Count', data=df_melted)
+    plt.xticks(rotation=90)
+    plt.title('Distribution of Crimes Across States')
+    plt.tight_layout()
+    return fig
+
+# 6. Crime Severity and Category Analysis
+def crime_severity_analysis(analysis: CrimeTableAnalysis):
+    print("\n6. Crime Severity and Category Analysis")
+
+    print("\nProportion of Each Crime Type in Total Violent Crimes:")
+    print(analysis.proportions)
+
+    # Regional analysis
+    print("\nTop Contributing Crime Type for Each State:")
+    print(analysis.top_crime_by_state.to_string())
+
+def plot_crime_proportions(analysis: CrimeTableAnalysis) -> plt.Figure:
+    fig = plt.figure(figsize=(12, 8))
+    analysis.proportions.plot(kind='bar')
+    plt.title('Proportion of Each Crime Type in Total Violent Crimes')
+    plt.ylabel('Percentage')
+    plt.xticks(rotation=90)
+    plt.tight_layout()
+    return fig
+
+# 7. Cultural and Economic Influences on Crime (Hypothetical Analysis)
+def add_hypothetical_indices(df: pd.DataFrame, seed: int = 0) -> pd.DataFrame:
+    """Add random economic and cultural indices (placeholders for real data)."""
+    rng = np.random.default_rng(seed)
+    df = df.copy()
+    df['Economic Index'] = rng.random(len(df))
+    df['Cultural Index'] = rng.random(len(df))
+    return df
+
+def cultural_economic_analysis(analysis: CrimeTableAnalysis):
+    print("\n7. Cultural and Economic Influences on Crime (Hypothetical Analysis)")
+
+    df = analysis.states
+    economic_corr = df['Economic Index'].corr(df['Crime Rate'])
+    cultural_corr = df['Cultural Index'].corr(df['Crime Rate'])
+
+    print(f"\nHypothetical correlation between Economic Index and Crime Rate: {economic_corr:.2f}")
+    print(f"Hypothetical correlation between Cultural Index and Crime Rate: {cultural_corr:.2f}")
+
+def plot_cultural_economic(analysis: CrimeTableAnalysis) -> plt.Figure:
+    df = analysis.states
+    fig = plt.figure(figsize=(12, 5))
+    plt.subplot(1, 2, 1)
+    plt.scatter(df['Economic Index'], df['Crime Rate'])
+    plt.title('Crime Rate vs Economic Index')
+    plt.xlabel('Economic Index')
+    plt.ylabel('Crime Rate')
+
+    plt.subplot(1, 2, 2)
+    plt.scatter(df['Cultural Index'], df['Crime Rate'])
+    plt.title('Crime Rate vs Cultural Index')
+    plt.xlabel('Cultural Index')
+    plt.ylabel('Crime Rate')
+
+    plt.tight_layout()
+    return fig
+
+# 8. State-Specific Crime Control Recommendations
+def crime_control_recommendations(analysis: CrimeTableAnalysis):
+    print("\n8. State-Specific Crime Control Recommendations")
+
+    print("\nStates Needing Focus on Women's Safety:")
+    print(analysis.women_safety_index.head())
+
+    for state, top_crimes in analysis.recommendations.items():
+        print(f"\nRecommendations for {state}:")
+        for crime, value in top_crimes.items():
+            print(f"- Focus on reducing {crime}: {value:.0f} cases")
+
+# Heatmap Visualization on India Map
+def plot_india_heatmap(df: pd.DataFrame, shapefile: str = 'Indian_States.shp',
+                       tolerance: float = 0.01) -> plt.Figure:
+    # geopandas is only needed for the map
+    from crime_analysis.geometry import join_crime_data, load_geometry
+
+    # Simplified shapes, centroids and name keys come from the geometry cache
+    merged_data = join_crime_data(load_geometry(shapefile, tolerance=tolerance),
+                                  aggregate_states(df).reset_index())
+
+    # Create the map
+    fig, ax = plt.subplots(1, 1, figsize=(15, 10))
+    merged_data.plot(column='Crime Rate', cmap='YlOrRd', linewidth=0.8, edgecolor='0.8', ax=ax, legend=True)
+
+    # Customize the map
+    ax.axis('off')
+    ax.set_title('Crime Rate Heatmap of India', fontdict={'fontsize': '25', 'fontweight': '3'})
+
+    # Add annotations at the precomputed centroids
+    labelled = merged_data[merged_data[STATE_COLUMN].notna()]
+    for state, x, y in zip(labelled[STATE_COLUMN], labelled['centroid_x'], labelled['centroid_y']):
+        ax.annotate(text=state, xy=(x, y), xytext=(3, 3), textcoords="offset points", fontsize=8)
+
+    plt.tight_layout()
+    return fig
+
+# Text section and figure builders in notebook order
+ANALYSES = [
+    (analyze_crime_rates, [plot_crime_rates]),
+    (analyze_violent_crime_trends, [plot_violent_crime_trends]),
+    (correlation_analysis, [plot_correlation_heatmap]),
+    (analyze_gender_related_crimes, [plot_gender_related_crimes]),
+    (crime_prevention_prioritization, [plot_crime_distribution]),
+    (crime_severity_analysis, [plot_crime_proportions]),
+    (cultural_economic_analysis, [plot_cultural_economic]),
+    (crime_control_recommendations, [])
+]
@@ -0,0 +1,276 @@
+# Streaming pairwise correlation over chunks of crime tables
+
+import warnings
+from typing import Callable, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+class CorrelationAccumulator:
+    def __init__(self, columns: List[str]):
+        """
+        Pairwise Pearson correlation from sufficient statistics, one chunk at a time.
+
+        For every pair of columns it keeps the count, sums, sums of squares
+        and cross products over the rows where both are present, so missing
+        values are handled pairwise like DataFrame.corr. Memory is a few
+        k × k matrices however many rows stream through. Values are shifted
+        by the first chunk's column means before accumulating, which keeps
+        the raw-moment formula well conditioned.
+
+        Args:
+            columns (List[str]): Columns to correlate; absent ones count as missing
+        """
+        self.columns = list(columns)
+        k = len(self.columns)
+        self.shift = None
+        self.count = np.zeros((k, k))
+        self.sums = np.zeros((k, k))       # [i, j]: sum of column i where i and j are present
+        self.squares = np.zeros((k, k))    # [i, j]: sum of column i squared, same rows
+        self.products = np.zeros((k, k))   # [i, j]: sum of column i times column j
+
+    @property
+    def rows(self) -> int:
+        """Rows accumulated so far."""
+        return int(self.count.diagonal().max()) if len(self.columns) else 0
+
+    def update(self, chunk: pd.DataFrame) -> 'CorrelationAccumulator':
+        """
+        Add the rows of one chunk.
+
+        Args:
+            chunk (pd.DataFrame): Rows with (some of) the accumulator's columns
+
+        Returns:
+            CorrelationAccumulator: self, for chaining
+        """
+        values = chunk.reindex(columns=self.columns).to_numpy(dtype=np.float64)
+        if not len(values):
+            return self
+        if self.shift is None:
+            # An all-missing column has no mean yet; any shift is exact
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                self.shift = np.nan_to_num(np.nanmean(values, axis=0))
+        values = values - self.shift
+
+        present = ~np.isnan(values)
+        if present.all():
+            # Dense chunk: every pair sees every row, so the masks need no matmul
+            self.count += len(values)
+            self.sums += values.sum(axis=0)[:, None]
+            self.squares += (values ** 2).sum(axis=0)[:, None]
+        else:
+            mask = present.astype(np.float64)
+            values = np.where(present, values, 0.0)
+            self.count += mask.T @ mask
+            self.sums += values.T @ mask
+            self.squares += (values ** 2).T @ mask
+        self.products += values.T @ values
+        return self
+
+    def merge(self, other: 'CorrelationAccumulator') -> 'CorrelationAccumulator':
+        """
+        Fold in an accumulator filled elsewhere (e.g. by another process).
+
+        Its statistics are re-centred on this accumulator's shift, so the
+        result equals one accumulator fed both streams.
+        """
+        if other.columns != self.columns:
+            raise ValueError("Accumulators must cover the same columns in the same order")
+        if other.shift is None:
+            return self
+        if self.shift is None:
+            self.shift = other.shift
+        # x - a = (x - b) + (b - a) per column
+        delta = other.shift - self.shift
+        sums = other.sums + delta[:, None] * other.count
+        self.squares += other.squares + 2 * delta[:, None] * other.sums + delta[:, None] ** 2 * other.count
+        self.products += (other.products + delta[:, None] * other.sums.T + other.sums * delta[None, :]
+                          + np.outer(delta, delta) * other.count)
+        self.sums += sums
+        self.count += other.count
+        return self
+
+    def correlation(self, min_periods: int = 1) -> pd.DataFrame:
+        """
+        Pearson correlation matrix, as DataFrame.corr on all streamed rows.
+
+        Args:
+            min_periods (int): Pairs with fewer shared rows are NaN
+
+        Returns:
+            pd.DataFrame: k × k correlation matrix
+        """
+        n = self.count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            covariance = n * self.products - self.sums * self.sums.T
+            variance = n * self.squares - self.sums ** 2
+            result = covariance / np.sqrt(variance * variance.T)
+        result[(n < max(min_periods, 2)) | ~np.isfinite(result)] = np.nan
+        np.clip(result, -1, 1, out=result)
+        return pd.DataFrame(result, index=self.columns, columns=self.columns)
+
+    def top_pairs(self, k: int = 10, min_periods: int = 1) -> pd.Series:
+        """
+        The k most correlated distinct pairs, highest first.
+
+        argpartition selects the k largest of the upper triangle in linear
+        time; only those k are sorted.
+
+        Returns:
+            pd.Series: Correlation indexed by (column, column)
+        """
+        return top_correlated_pairs(self.correlation(min_periods), k)
+
+class RankTable:
+    def __init__(self, columns: List[str]):
+        """
+        Distinct values and their counts per column, for exact streaming ranks.
+
+        Spearman correlation is Pearson correlation of ranks, but a value's
+        rank depends on the whole column. A first pass over the chunks
+        collects each column's value counts; a second pass maps every value
+        to its average rank (ties as in DataFrame.rank) and streams the
+        ranks into a CorrelationAccumulator. Memory grows with the number
+        of distinct values per column, which is small for crime counts.
+
+        Each column is ranked once over all its present values; with missing
+        values DataFrame.corr re-ranks every pair over their shared rows, so
+        the two then differ slightly.
+
+        Args:
+            columns (List[str]): Columns to rank
+        """
+        self.columns = list(columns)
+        self.counts = {column: pd.Series(dtype=np.float64) for column in self.columns}
+        self._ranks = None
+
+    def update(self, chunk: pd.DataFrame) -> 'RankTable':
+        """Add one chunk's values (first pass)."""
+        chunk = chunk.reindex(columns=self.columns)
+        for column in self.columns:
+            values, counts = np.unique(chunk[column].dropna().to_numpy(dtype=np.float64), return_counts=True)
+            self.counts[column] = self.counts[column].add(pd.Series(counts, index=values), fill_value=0)
+        self._ranks = None
+        return self
+
+    def ranks(self, chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Average ranks of a chunk's values within their whole columns (second pass).
+
+        Returns:
+            pd.DataFrame: Ranks starting at 1, NaN where the value is missing
+        """
+        if self._ranks is None:
+            self._ranks = {}
+            for column, counts in self.counts.items():
+                counts = counts.sort_index()
+                before = counts.cumsum().to_numpy() - counts.to_numpy()
+                self._ranks[column] = (counts.index.to_numpy(), before + (counts.to_numpy() + 1) / 2)
+
+        chunk = chunk.reindex(columns=self.columns)
+        ranked = {}
+        for column in self.columns:
+            values = chunk[column].to_numpy(dtype=np.float64)
+            distinct, ranks = self._ranks[column]
+            positions = np.minimum(np.searchsorted(distinct, values), max(len(distinct) - 1, 0))
+            ranked[column] = (np.where(np.isnan(values), np.nan, ranks[positions])
+                              if len(distinct) else np.full(len(values), np.nan))
+        return pd.DataFrame(ranked, index=chunk.index)
+
+def top_correlated_pairs(correlation: pd.DataFrame, k: int = 10) -> pd.Series:
+    """
+    The k largest correlations among distinct pairs of a correlation matrix.
+
+    Args:
+        correlation (pd.DataFrame): Symmetric correlation matrix
+        k (int): Pairs to return
+
+    Returns:
+        pd.Series: Correlation indexed by (column, column), highest first
+    """
+    values = correlation.to_numpy()
+    rows, cols = np.triu_indices_from(values, k=1)
+    upper = values[rows, cols]
+    valid = np.flatnonzero(~np.isnan(upper))
+    k = min(k, len(valid))
+    if k == 0:
+        return pd.Series(dtype=np.float64, index=pd.MultiIndex.from_arrays([[], []]))
+
+    top = valid[np.argpartition(-upper[valid], k - 1)[:k]]
+    top = top[np.argsort(-upper[top], kind='stable')]
+    return pd.Series(
+        upper[top],
+        index=pd.MultiIndex.from_arrays([correlation.index[rows[top]], correlation.columns[cols[top]]])
+    )
+
+def stream_correlation(chunks: Callable[[], Iterable[pd.DataFrame]], columns: List[str],
+                       method: str = 'pearson') -> CorrelationAccumulator:
+    """
+    Correlate columns over a stream of chunks without holding the stream in memory.
+
+    Args:
+        chunks (Callable[[], Iterable[pd.DataFrame]]): Returns a fresh iterator
+            over the chunks (called twice for Spearman)
+        columns (List[str]): Columns to correlate
+        method (str): 'pearson' or 'spearman'
+
+    Returns:
+        CorrelationAccumulator: Filled accumulator (of ranks for Spearman)
+    """
+    if method not in ('pearson', 'spearman'):
+        raise ValueError(f"Unknown method {method!r}; use 'pearson' or 'spearman'")
+
+    accumulator = CorrelationAccumulator(columns)
+    if method == 'pearson':
+        for chunk in chunks():
+            accumulator.update(chunk)
+        return accumulator
+
+    table = RankTable(columns)
+    for chunk in chunks():
+        table.update(chunk)
+    for chunk in chunks():
+        accumulator.update(table.ranks(chunk))
+    return accumulator
+
+if __name__ == "__main__":
+    # Benchmark: 1,000 columns x 200,000 rows in chunks against DataFrame.corr
+    import sys
+    import time
+
+    n_columns = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    n_rows, chunk_rows = 200_000, 20_000
+    rng = np.random.default_rng(0)
+    columns = [f'crime_{i}' for i in range(n_columns)]
+    # Counts driven by a few shared factors, so some pairs correlate strongly
+    loadings = rng.random((8, n_columns)) ** 4
+
+    def chunks():
+        chunk_rng = np.random.default_rng(1)
+        for _ in range(n_rows // chunk_rows):
+            rates = np.exp(chunk_rng.normal(size=(chunk_rows, 8)) @ loadings)
+            yield pd.DataFrame(chunk_rng.poisson(rates).astype(np.float32), columns=columns)
+
+    start = time.perf_counter()
+    accumulator = stream_correlation(chunks, columns)
+    top = accumulator.top_pairs(10)
+    print(f"streamed pearson, {n_columns} columns x {n_rows:,} rows: {time.perf_counter() - start:.1f}s")
+    print(top.head(3))
+
+    # Reference on a column subset small enough to materialize; chunks are
+    # generated once so only the correlation itself is timed
+    subset = columns[:200]
+    parts = [chunk[subset] for chunk in chunks()]
+    sample = pd.concat(parts)
+    for method in ('pearson', 'spearman'):
+        start = time.perf_counter()
+        reference = sample.corr(method=method)
+        pandas_time = time.perf_counter() - start
+        start = time.perf_counter()
+        streamed = stream_correlation(lambda: iter(parts), subset, method).correlation()
+        streamed_time = time.perf_counter() - start
+        print(f"{method}, 200 columns: pandas {pandas_time:.2f}s on the materialized table, "
+              f"streamed {streamed_time:.2f}s, max difference "
+              f"{np.nanmax(np.abs(streamed.to_numpy() - reference.to_numpy())):.1e}")
@@ -0,0 +1,142 @@
+# Preprocessed, cached India state geometry for choropleths
+
+import hashlib
+import os
+import re
+from pathlib import Path
+from typing import Union
+
+import pandas as pd
+
+# Columns that hold the state name in common India shapefiles
+NAME_COLUMNS = ['st_nm', 'ST_NM', 'NAME_1', 'State', 'STATE']
+
+# Equal-area-friendly projection for India, used only to place centroids
+INDIA_PROJECTED_CRS = 'EPSG:7755'
+
+# Spellings used by shapefiles and older NCRB tables, mapped to current names
+STATE_ALIASES = {
+    'andaman and nicobar island': 'andaman and nicobar islands',
+    'arunanchal pradesh': 'arunachal pradesh',
+    'dadara and nagar havelli': 'dadra and nagar haveli and daman and diu',
+    'dadra and nagar haveli': 'dadra and nagar haveli and daman and diu',
+    'daman and diu': 'dadra and nagar haveli and daman and diu',
+    'nct of delhi': 'delhi',
+    'delhi ut': 'delhi',
+    'orissa': 'odisha',
+    'uttaranchal': 'uttarakhand',
+    'pondicherry': 'puducherry',
+}
+
+def normalize_state_name(name: str) -> str:
+    """Canonical join key for a state or UT name."""
+    if not isinstance(name, str):
+        return ''
+    key = name.lower().replace('&', ' and ')
+    key = re.sub(r'[^a-z ]', ' ', key)
+    key = re.sub(r'\s+', ' ', key).strip()
+    return STATE_ALIASES.get(key, key)
+
+def _cache_path(shapefile: Path, cache_dir: Path, tolerance: float) -> Path:
+    """Cache file name tied to the source file's identity and the tolerance."""
+    stat = shapefile.stat()
+    key = f'{shapefile.resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{tolerance}'
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return cache_dir / f'{shapefile.stem}-{digest}.feather'
+
+def build_geometry(shapefile: Union[str, Path], tolerance: float = 0.01):
+    """
+    Read a shapefile once and reduce it to what a choropleth needs.
+
+    Args:
+        shapefile (Union[str, Path]): Source shapefile
+        tolerance (float): Simplification tolerance in the layer's units
+            (degrees for WGS84); 0 keeps full resolution
+
+    Returns:
+        GeoDataFrame: state_key, name, centroid_x, centroid_y and geometry
+    """
+    import geopandas as gpd
+
+    shapes = gpd.read_file(shapefile)
+    name_column = next((column for column in NAME_COLUMNS if column in shapes.columns), None)
+    if name_column is None:
+        raise ValueError(f"No state name column found in {shapefile}; expected one of {NAME_COLUMNS}")
+
+    geometry = shapes.geometry
+    if tolerance > 0:
+        geometry = geometry.simplify(tolerance, preserve_topology=True)
+
+    # Centroids are computed in a projected CRS, then mapped back
+    centroids = geometry.to_crs(INDIA_PROJECTED_CRS).centroid.to_crs(shapes.crs)
+
+    return gpd.GeoDataFrame({
+        'state_key': shapes[name_column].map(normalize_state_name),
+        'name': shapes[name_column],
+        'centroid_x': centroids.x.to_numpy(),
+        'centroid_y': centroids.y.to_numpy(),
+    }, geometry=geometry.to_numpy(), crs=shapes.crs)
+
+def load_geometry(shapefile: Union[str, Path] = 'Indian_States.shp',
+                  cache_dir: Union[str, Path] = '.geometry_cache',
+                  tolerance: float = 0.01):
+    """
+    Load simplified state geometry, building the binary cache on first use.
+
+    The cache is an Arrow/Feather file keyed by the shapefile's path, size,
+    modification time and the tolerance, so edits to the source or a new
+    tolerance rebuild it automatically.
+
+    Args:
+        shapefile (Union[str, Path]): Source shapefile
+        cache_dir (Union[str, Path]): Directory for cached geometry
+        tolerance (float): Simplification tolerance
+
+    Returns:
+        GeoDataFrame: Cached geometry layer
+    """
+    import geopandas as gpd
+
+    shapefile = Path(shapefile)
+    cache_dir = Path(cache_dir)
+    cache_path = _cache_path(shapefile, cache_dir, tolerance)
+
+    if cache_path.exists():
+        return gpd.read_feather(cache_path)
+
+    geometry = build_geometry(shapefile, tolerance)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+    geometry.to_feather(tmp_path)
+    os.replace(tmp_path, cache_path)
+
+    return geometry
+
+def join_crime_data(geometry, df: pd.DataFrame, state_column: str = 'State'):
+    """
+    Attach crime figures to the geometry layer by normalized state name.
+
+    Args:
+        geometry (GeoDataFrame): Layer from load_geometry
+        df (pd.DataFrame): Crime table with a state column
+        state_column (str): Name of the state column in df
+
+    Returns:
+        GeoDataFrame: Geometry with the crime columns joined on
+    """
+    keyed = df.assign(state_key=df[state_column].map(normalize_state_name))
+    return geometry.merge(keyed, how='left', on='state_key')
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    shapefile = sys.argv[1] if len(sys.argv) > 1 else 'Indian_States.shp'
+
+    start = time.perf_counter()
+    layer = load_geometry(shapefile)
+    print(f"Loaded {len(layer)} shapes in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    start = time.perf_counter()
+    load_geometry(shapefile)
+    print(f"Cached reload in {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,198 @@
+# Typed, chunked loading of NCRB tables with a binary cache
+
+import hashlib
+import os
+from pathlib import Path
+from typing import Dict, Iterator, List, Union
+
+import numpy as np
+import pandas as pd
+
+STATE_COLUMN = 'State'
+TOTAL_COLUMN = 'Total Violent Crimes (Cols.3 to 17)'
+TOTAL_ROWS = ['Total State (S)', 'Total UT (S)', 'Total All India']
+
+# Declared schema: identifier columns (renamed) and their types; every other
+# column except the dropped ones is a non-negative case count
+IDENTIFIER_COLUMNS = {
+    'State/UT': (STATE_COLUMN, 'category'),
+    'District': ('District', 'category'),
+    'Year': ('Year', 'int16')
+}
+IDENTIFIERS = [name for name, _ in IDENTIFIER_COLUMNS.values()]
+DROPPED_COLUMNS = ['Sl. No.', 'Category']
+COUNT_DTYPE = 'uint32'
+
+# Bump to invalidate every cached table after changing the schema or cleaning
+SCHEMA_VERSION = 1
+
+def _schema(path: Union[str, Path]) -> Dict[str, str]:
+    """read_csv dtypes for the columns present in one table."""
+    header = pd.read_csv(path, nrows=0).columns
+    return {
+        column: IDENTIFIER_COLUMNS[column][1] if column in IDENTIFIER_COLUMNS else 'float64'
+        for column in header if column not in DROPPED_COLUMNS
+    }
+
+def read_ncrb_chunks(path: Union[str, Path], chunksize: int = 100000) -> Iterator[pd.DataFrame]:
+    """
+    Cleaned, typed rows of one NCRB table, chunk by chunk.
+
+    Only the declared columns are parsed. Blank and total rows are dropped
+    with one mask per chunk, identifiers become categoricals and counts
+    uint32 (nullable UInt32 where a count is missing).
+
+    Args:
+        path (Union[str, Path]): NCRB table CSV
+        chunksize (int): Rows parsed at a time
+
+    Yields:
+        pd.DataFrame: Cleaned chunk with a 'State' column
+    """
+    dtypes = _schema(path)
+    renames = {column: IDENTIFIER_COLUMNS[column][0] for column in dtypes if column in IDENTIFIER_COLUMNS}
+    counts = [column for column in dtypes if column not in IDENTIFIER_COLUMNS]
+
+    for chunk in pd.read_csv(path, usecols=list(dtypes), dtype=dtypes, chunksize=chunksize):
+        chunk = chunk.rename(columns=renames)
+        states = chunk[STATE_COLUMN]
+        chunk = chunk[states.notna() & ~states.isin(TOTAL_ROWS)]
+        chunk[STATE_COLUMN] = chunk[STATE_COLUMN].cat.remove_unused_categories()
+
+        values = chunk[counts]
+        chunk[counts] = (values.astype(COUNT_DTYPE) if not values.isna().to_numpy().any()
+                         else values.astype(COUNT_DTYPE.replace('uint', 'UInt')))
+        yield chunk
+
+def _downcast_counts(chunk: pd.DataFrame) -> pd.DataFrame:
+    """Shrink every count column to the smallest unsigned type holding its maximum."""
+    for column, dtype in chunk.dtypes.items():
+        if pd.api.types.is_unsigned_integer_dtype(dtype):
+            values = chunk[column]
+            compact = np.min_scalar_type(int(values.max()) if values.notna().any() else 0)
+            if not isinstance(dtype, np.dtype):
+                compact = compact.name.replace('uint', 'UInt')
+            chunk[column] = values.astype(compact)
+    return chunk
+
+def _concat_chunks(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate compact chunks; each count column takes the widest type among them."""
+    if not chunks:
+        raise ValueError("Table has no rows after removing blank and total rows")
+    # Chunks have their own categories; unify so concat keeps the categorical dtype
+    for column, dtype in chunks[0].dtypes.items():
+        if isinstance(dtype, pd.CategoricalDtype):
+            categories = pd.api.types.union_categoricals([chunk[column] for chunk in chunks]).categories
+            for chunk in chunks:
+                chunk[column] = chunk[column].cat.set_categories(categories)
+    return pd.concat(chunks, ignore_index=True)
+
+def _cache_path(path: Path, cache_dir: Path) -> Path:
+    """Cache file name tied to the source file's identity and the schema version."""
+    stat = path.stat()
+    key = f'{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{SCHEMA_VERSION}'
+    digest = hashlib.sha256(key.encode()).hexdigest()[:16]
+    return cache_dir / f'{path.stem}-{digest}.feather'
+
+def load_ncrb_table(path: Union[str, Path], cache_dir: Union[str, Path] = '.ncrb_cache',
+                    chunksize: int = 100000) -> pd.DataFrame:
+    """
+    Load an NCRB table and drop blank and total rows, using a binary cache.
+
+    The first load parses the CSV in typed chunks and writes the tidy frame
+    as a Feather file keyed by the CSV's path, size and modification time;
+    later loads (every analysis, report and worker process) read that file
+    directly. Counts are the smallest unsigned integer type that holds them
+    and State is categorical.
+
+    Args:
+        path (Union[str, Path]): NCRB table CSV
+        cache_dir (Union[str, Path]): Directory for cached tables (None disables caching)
+        chunksize (int): Rows parsed at a time on a cache miss
+
+    Returns:
+        pd.DataFrame: Cleaned table with a categorical 'State' column
+    """
+    path = Path(path)
+    cache_path = _cache_path(path, Path(cache_dir)) if cache_dir is not None else None
+
+    if cache_path is not None and cache_path.exists():
+        return pd.read_feather(cache_path)
+
+    # Only compact chunks are held until the final concatenation
+    df = _concat_chunks([_downcast_counts(chunk) for chunk in read_ncrb_chunks(path, chunksize)])
+
+    if cache_path is not None:
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_suffix(f'.{os.getpid()}.tmp')
+            df.to_feather(tmp_path)
+            os.replace(tmp_path, cache_path)
+        except ImportError:
+            # Feather needs pyarrow; without it every load parses the CSV
+            pass
+
+    return df
+
+if __name__ == "__main__":
+    # Benchmark: a synthetic multi-year district table against the untyped load
+    import sys
+    import tempfile
+    import time
+    import tracemalloc
+
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    source = pd.read_csv('NCRB_Table_1C.2 (1).csv')
+    crimes = [column for column in source.columns if column not in ('Sl. No.', 'Category', 'State/UT')]
+    states = source['State/UT'].dropna().unique()
+
+    rng = np.random.default_rng(0)
+    table = pd.DataFrame({
+        'Sl. No.': np.arange(n_rows),
+        'Category': rng.choice(['States', 'UTs'], n_rows),
+        'Year': rng.integers(2001, 2023, n_rows),
+        'State/UT': rng.choice(states, n_rows),
+        'District': rng.choice([f'District {i}' for i in range(700)], n_rows),
+        **{crime: rng.poisson(rng.choice([2, 50, 900]), n_rows) for crime in crimes}
+    })
+
+    def untyped_load(path):
+        """The notebook's original load: default dtypes, three filters, float64 counts."""
+        df = pd.read_csv(path)
+        df = df.drop(columns=['Sl. No.', 'Category'])
+        df = df.rename(columns={'State/UT': STATE_COLUMN})
+        df = df[df[STATE_COLUMN].notna()]
+        df = df[~df[STATE_COLUMN].isin(['Total State (S)', 'Total UT (S)'])]
+        df = df[df[STATE_COLUMN] != 'Total All India']
+        numeric_columns = df.columns[3:]
+        df[numeric_columns] = df[numeric_columns].astype(float)
+        return df.reset_index(drop=True)
+
+    def measure(label, load):
+        # Timed first, then peak traced separately (tracing slows allocation)
+        start = time.perf_counter()
+        load()
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        df = load()
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        size = df.memory_usage(index=True, deep=True).sum()
+        print(f"{label:<18} {elapsed:6.2f}s, peak {peak / 2**20:7.1f} MB, frame {size / 2**20:6.1f} MB")
+        return df
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'district_table.csv'
+        table.to_csv(path, index=False)
+        print(f"{n_rows:,} rows x {len(table.columns)} columns, "
+              f"{path.stat().st_size / 2**20:.0f} MB CSV")
+
+        reference = measure('untyped load', lambda: untyped_load(path))
+        typed = measure('typed, chunked', lambda: load_ncrb_table(path, cache_dir=None))
+        cache_dir = Path(tmp_dir) / 'cache'
+        load_ncrb_table(path, cache_dir=cache_dir)
+        measure('cached (feather)', lambda: load_ncrb_table(path, cache_dir=cache_dir))
+
+        same = all(np.array_equal(reference[column].to_numpy(), typed[column].to_numpy(dtype=np.float64))
+                   for column in crimes)
+        print("counts identical:", same, "| dtypes:", dict(typed.dtypes.astype(str).value_counts()))
@@ -0,0 +1,153 @@
+# Headless HTML/PNG report for NCRB crime tables
+
+import argparse
+import contextlib
+import hashlib
+import html
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+from urllib.parse import quote
+
+import matplotlib
+matplotlib.use('Agg')  # Render off-screen; must run before pyplot is imported
+import matplotlib.pyplot as plt
+import pandas as pd
+
+from crime_analysis import analysis as crime
+
+# Bump to invalidate every cached figure after changing how charts are drawn
+RENDER_VERSION = 1
+
+def data_hash(df: pd.DataFrame) -> str:
+    """Stable content hash of a frame (values, index and column names)."""
+    digest = hashlib.sha256()
+    digest.update('\x1f'.join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+def figure_key(plot_name: str, input_hash: str) -> str:
+    """File name of a figure for a given chart and input data."""
+    key = hashlib.sha256(f'{RENDER_VERSION}:{plot_name}:{input_hash}'.encode()).hexdigest()
+    return f'{plot_name}-{key[:16]}.png'
+
+def _render_figure(plot_name: str, df: pd.DataFrame, out_path: str, shapefile: str = None) -> str:
+    """Draw one chart in a worker process and save it as PNG."""
+    if plot_name == 'plot_india_heatmap':
+        fig = crime.plot_india_heatmap(df, shapefile)
+    else:
+        fig = getattr(crime, plot_name)(crime.CrimeTableAnalysis(df))
+    fig.savefig(out_path, dpi=100)
+    plt.close(fig)
+    return out_path
+
+def _prepare_table(path: str, seed: int = 0) -> pd.DataFrame:
+    df = crime.load_ncrb_table(path)
+    df = crime.add_crime_rate(df, seed=seed)
+    return crime.add_hypothetical_indices(df, seed=seed)
+
+def _text_sections(analysis: crime.CrimeTableAnalysis) -> List[str]:
+    """Capture the printed output of every analysis section."""
+    sections = []
+    for analyze, _ in crime.ANALYSES:
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            analyze(analysis)
+        sections.append(buffer.getvalue())
+    return sections
+
+def _table_page(title: str, sections: List[str], figures: List[List[str]]) -> str:
+    parts = [f'<html><head><meta charset="utf-8"><title>{html.escape(title)}</title></head><body>',
+             f'<h1>{html.escape(title)}</h1>']
+    for text, images in zip(sections, figures):
+        parts.append(f'<pre>{html.escape(text)}</pre>')
+        parts.extend(f'<img src="figures/{name}" style="max-width:100%">' for name in images)
+    parts.append('</body></html>')
+    return '\n'.join(parts)
+
+def render_report(paths: List[str], output_dir: str, max_workers: int = None,
+                  shapefile: str = None) -> Dict[str, int]:
+    """
+    Render an HTML page with PNG figures for every table.
+
+    Figures are named by a hash of the chart and its input data, so charts
+    whose data did not change are reused instead of re-rendered. Missing
+    charts are drawn in a process pool.
+
+    Args:
+        paths (List[str]): NCRB table CSV files
+        output_dir (str): Destination for the HTML pages and figures
+        max_workers (int): Worker processes (default: CPU count)
+        shapefile (str): Optional India shapefile for the choropleth
+
+    Returns:
+        Dict[str, int]: Number of rendered and reused figures
+    """
+    output_dir = Path(output_dir)
+    figure_dir = output_dir / 'figures'
+    figure_dir.mkdir(parents=True, exist_ok=True)
+
+    pages = {}
+    tasks = []
+    reused = 0
+
+    for path in paths:
+        df = _prepare_table(path)
+        input_hash = data_hash(df)
+
+        figures = []
+        for _, plots in crime.ANALYSES:
+            names = []
+            for plot in plots:
+                name = figure_key(plot.__name__, input_hash)
+                names.append(name)
+                if (figure_dir / name).exists():
+                    reused += 1
+                else:
+                    tasks.append((plot.__name__, df, str(figure_dir / name), None))
+            figures.append(names)
+
+        if shapefile is not None:
+            # The map also depends on the geometry file
+            stat = os.stat(shapefile)
+            map_hash = f'{input_hash}:{stat.st_size}:{stat.st_mtime_ns}'
+            name = figure_key('plot_india_heatmap', map_hash)
+            figures[-1] = figures[-1] + [name]
+            if (figure_dir / name).exists():
+                reused += 1
+            else:
+                tasks.append(('plot_india_heatmap', df, str(figure_dir / name), shapefile))
+
+        page_name = f'{Path(path).stem}.html'
+        sections = _text_sections(crime.CrimeTableAnalysis(df))
+        (output_dir / page_name).write_text(_table_page(Path(path).stem, sections, figures),
+                                            encoding='utf-8')
+        pages[Path(path).stem] = page_name
+
+    if tasks:
+        max_workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(_render_figure, *zip(*tasks)))
+
+    index = ['<html><head><meta charset="utf-8"><title>Crime Reports</title></head><body>',
+             '<h1>Crime Reports</h1><ul>']
+    index.extend(f'<li><a href="{quote(page)}">{html.escape(title)}</a></li>'
+                 for title, page in pages.items())
+    index.append('</ul></body></html>')
+    (output_dir / 'index.html').write_text('\n'.join(index), encoding='utf-8')
+
+    return {'rendered': len(tasks), 'reused': reused}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Render headless crime analysis reports')
+    parser.add_argument('tables', nargs='+', help='NCRB table CSV files')
+    parser.add_argument('--output', type=str, default='reports', help='Output directory')
+    parser.add_argument('--workers', type=int, default=None, help='Render processes')
+    parser.add_argument('--shapefile', type=str, default=None, help='India states shapefile')
+    args = parser.parse_args()
+
+    counts = render_report(args.tables, args.output, args.workers, args.shapefile)
+    print(f"Rendered {counts['rendered']} figures, reused {counts['reused']} cached figures")
+    print(f"Report written to {Path(args.output) / 'index.html'}")